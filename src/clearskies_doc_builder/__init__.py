@@ -1,14 +1,34 @@
 import json
+import os
 import pathlib
 import sys
+from typing import TYPE_CHECKING, Any
 
-import clearskies
-
-from clearskies_doc_builder import backends, models
 from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.lazy_exports import lazy_exports
 
+if TYPE_CHECKING:
+    # the redundant aliases mark these as re-exports, so type checkers see the lazy exports below
+    from clearskies_doc_builder import backends as backends
+    from clearskies_doc_builder import models as models
 
-def build(build_file_string: str) -> None:
+# Importing clearskies (and everything built on it) is most of our startup time, so the models and backends aren't
+# imported until they're actually used.
+(__getattr__, __dir__) = lazy_exports(
+    __name__,
+    {
+        "backends": "clearskies_doc_builder.backends",
+        "models": "clearskies_doc_builder.models",
+    },
+)
+
+
+# settings (as JSON) that take precedence over `config.json`.  The batch builder uses this to pass its command line
+# flags along to projects that it has to build with their own build script.
+CONFIG_OVERRIDES_VARIABLE = "CLEARSKIES_DOC_BUILDER_CONFIG_OVERRIDES"
+
+
+def load_build_config(build_file_string: str) -> tuple[dict[str, Any], pathlib.Path]:
     # We assume a folder structure here where the repo root contains a `src/` folder and a `docs/python` folder.
     # `build_file_string` should contain the absolute path to the file that kicked this off, which should
     # live in the `docs/python` folder.  This comes in as a string, which we convert to a path.
@@ -23,7 +43,96 @@ def build(build_file_string: str) -> None:
     config_file = open(str(doc_python_path / "config.json"), "r")
     config = json.loads(config_file.read())
     config_file.close()
+    config = {**config, **json.loads(os.environ.get(CONFIG_OVERRIDES_VARIABLE) or "{}")}
+
+    return (apply_command_line_flags(config), project_root)
+
+
+def apply_command_line_flags(config: dict[str, Any]) -> dict[str, Any]:
+    """
+    Apply our own command line flags to the config.
+
+    The flags are removed from `sys.argv` as we go, since the clearskies CLI context only understands key/value pairs.
+    """
+    if "--profile" in sys.argv[1:]:
+        sys.argv.remove("--profile")
+        config = {**config, "profile": config.get("profile") or True}
+    if "--trace" in sys.argv[1:]:
+        sys.argv.remove("--trace")
+        config = {**config, "trace": config.get("trace") or True}
+    if "--changed-files" in sys.argv[1:]:
+        # the changed files can be listed one after the other and/or separated by commas
+        changed_files = [path for value in take_flag_values("--changed-files") for path in value.split(",") if path]
+        config = {**config, "changed_files": [os.path.abspath(path) for path in changed_files]}
+    if "--since" in sys.argv[1:]:
+        since = take_flag_values("--since", limit=1)
+        if not since:
+            raise ValueError("--since needs a git ref, e.g. '--since origin/main'")
+        config = {**config, "since": since[0]}
+    return config
+
+
+def take_flag_values(flag: str, limit: int | None = None) -> list[str]:
+    """Remove a flag from `sys.argv`, along with the values that follow it (up to the next flag), and return them."""
+    start = sys.argv.index(flag, 1)
+    end = start + 1
+    while end < len(sys.argv) and not sys.argv[end].startswith("--") and (limit is None or end - start <= limit):
+        end += 1
+    values = sys.argv[start + 1 : end]
+    del sys.argv[start:end]
+    return values
+
+
+def pages_showing(build_file_string: str, source_file: str, line: int | None = None) -> list[str]:
+    """
+    Return the pages (relative to `build/docs`) that show the given line of a source file.
+
+    Without a line, this returns every page that shows anything from the file.  This uses the dependency graph
+    from the last build, so the build needs `"dependency_graph": true` in its config.
+    """
+    from clearskies_doc_builder.dependency_graph import DependencyGraph
+
+    project_root = pathlib.Path(build_file_string).parents[2]
+    graph = DependencyGraph.load(project_root, project_root / "docs" / "build")
+    if not graph:
+        raise ValueError(
+            "There's no dependency graph from a previous build: set 'dependency_graph' to true in your config.json "
+            "and build the docs first"
+        )
+    return graph.pages_showing(source_file, line)
+
+
+def run_command_line_query(build_file_string: str) -> bool:
+    """
+    Answer a question about the docs (rather than building them), if the command line asked one.
+
+    `--pages-showing path/to/file.py:123` prints the pages that show line 123 of the file (or that show anything
+    from the file, without the line number).
+    """
+    if "--pages-showing" not in sys.argv[1:]:
+        return False
+    values = take_flag_values("--pages-showing", limit=1)
+    if not values:
+        raise ValueError("--pages-showing needs a source file, optionally with a line number: 'path/to/file.py:123'")
+    (source_file, separator, line) = values[0].rpartition(":")
+    if not separator or not line.isdigit():
+        (source_file, line) = (values[0], "")
+    pages = pages_showing(build_file_string, os.path.abspath(source_file), int(line) if line else None)
+    print(json.dumps(pages, indent=2))
+    return True
+
+
+def build(build_file_string: str) -> None:
+    if "--watch" in sys.argv[1:]:
+        return watch(build_file_string)
+    if run_command_line_query(build_file_string):
+        return
+
+    import clearskies
 
+    from clearskies_doc_builder import backends, models
+
+    (config, project_root) = load_build_config(build_file_string)
     cli = clearskies.contexts.Cli(
         build_callable,
         modules=[models, backends],
@@ -33,3 +142,73 @@ def build(build_file_string: str) -> None:
         },
     )
     cli()
+
+
+def build_direct(build_file_string: str) -> None:
+    """
+    Build the docs without going through a clearskies context.
+
+    This is the same as `build()`, but calls the build straight from a dependency injection container.  The CLI context
+    doesn't add anything to a doc build, but it does cost startup time, and it reads from stdin.
+    """
+    if "--watch" in sys.argv[1:]:
+        return watch(build_file_string)
+    if run_command_line_query(build_file_string):
+        return
+
+    import clearskies
+
+    from clearskies_doc_builder import backends, models
+
+    (config, project_root) = load_build_config(build_file_string)
+    di = clearskies.di.Di(
+        modules=[models, backends],
+        bindings={
+            "config": config,
+            "project_root": project_root / "docs",
+        },
+    )
+    di.call_function(build_callable)
+
+
+def watch(build_file_string: str, polling: bool = False) -> None:
+    """
+    Build the docs, and then rebuild them whenever the documented source files (or `config.json`) change.
+
+    This is what `build()` and `build_direct()` do when the build script is run with `--watch`.  Only the parts of
+    the tree that depend on the changed files are rebuilt.  Stop it with Ctrl+C.
+    """
+    import clearskies
+
+    from clearskies_doc_builder import backends, models
+    from clearskies_doc_builder.watch import Watch, make_watcher
+
+    # if we have to restart, we want the same flags as this time around.
+    restart_argv = list(sys.argv)
+    if "--watch" in sys.argv[1:]:
+        sys.argv.remove("--watch")
+    # the flags still apply when config.json is reloaded
+    flags = apply_command_line_flags({})
+    (_, project_root) = load_build_config(build_file_string)
+    di = clearskies.di.Di(modules=[models, backends])
+    Watch(
+        di.build_from_name("modules"),
+        di.build_from_name("classes"),
+        pathlib.Path(build_file_string).parent / "config.json",
+        project_root / "docs",
+        watcher=make_watcher(polling=polling),
+        apply_flags=lambda config: {**config, **{key: config.get(key) or flags[key] for key in flags}},
+        restart_argv=restart_argv,
+    ).run()
+
+
+def build_batch(project_roots: list[str], workers: int | str | None = None) -> dict[str, dict[str, Any]]:
+    """
+    Build the docs for many projects in one go, importing clearskies (and parsing its base classes) only once.
+
+    Each project root should contain a `src/` folder and a `docs/python/config.json` file.  See
+    `clearskies_doc_builder.batch.build_batch()` for the details.
+    """
+    from clearskies_doc_builder import batch
+
+    return batch.build_batch(project_roots, workers=workers)
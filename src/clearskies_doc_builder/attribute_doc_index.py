@@ -0,0 +1,184 @@
+import ast
+
+from clearskies_doc_builder import build_profile
+from clearskies_doc_builder.introspection_cache import IntrospectionCache
+
+
+class AttributeDocIndex:
+    """
+    A build-wide index of the docblocks attached to class attributes.
+
+    Every builder needs attribute docs for the classes it documents and, since we also walk up through all the base
+    classes, the same handful of files (e.g. the source of `clearskies.Column` or `clearskies.Model`) get asked for
+    over and over again.  The index parses each source file at most once and keeps every documented attribute of
+    every class in it, so lookups for any list of argument names can be answered from memory.
+
+    Call `invalidate()` when a source file changes (e.g. when watching for changes) so it gets parsed again.
+
+    If an `introspection_cache` is set then the docs are also persisted between builds, and files that haven't
+    changed since a previous build don't get parsed at all.
+    """
+
+    introspection_cache: IntrospectionCache | None = None
+
+    def __init__(self):
+        self._file_docs: dict[str, dict[str, dict[str, str]]] = {}
+        self._class_docs: dict[tuple[str, str], dict[str, str]] = {}
+        self.files_parsed = 0
+
+    @build_profile.timed(
+        "doc_extraction", lambda index, source_class, *args, **kwargs: {"class": source_class.import_path}
+    )
+    def extract_attribute_docs(self, source_class, argument_names, additional_attribute_sources=[]):
+        """
+        Return the docblocks for the given argument names of a class.
+
+        Docs found on the class itself win, followed by docs from the base classes (in order), followed by any
+        additional attribute sources.
+        """
+        # built in classes (which we will reach with our iterative approach) don't have a source file.
+        if not source_class.source_file:
+            return {}
+
+        class_docs = self.class_docs(source_class.source_file, source_class.qualname)
+        doc_strings = {name: class_docs[name] for name in argument_names if name in class_docs}
+
+        # and let's repeat this for any base classes just to make sure we don't miss anything.  Often attributes are
+        # defined in bases and we want to use those docs if we don't have them.
+        for base_class in source_class.base_classes:
+            doc_strings = {
+                **self.extract_attribute_docs(base_class, argument_names),
+                **doc_strings,
+            }
+
+        for additional_source_class in additional_attribute_sources:
+            doc_strings = {
+                **self.extract_attribute_docs(additional_source_class, argument_names),
+                **doc_strings,
+            }
+
+        return doc_strings
+
+    def class_docs(self, source_file: str, qualname: str) -> dict[str, str]:
+        """Return all documented attributes of a class, parsing its source file if we haven't seen it yet."""
+        if not self.introspection_cache:
+            return self.file_docs(source_file).get(qualname, {})
+
+        cache_key = (source_file, qualname)
+        if cache_key not in self._class_docs:
+            class_docs = self.introspection_cache.attribute_docs(source_file, qualname)
+            if class_docs is None:
+                class_docs = self.file_docs(source_file).get(qualname, {})
+            self._class_docs[cache_key] = class_docs
+        return self._class_docs[cache_key]
+
+    def file_docs(self, source_file: str) -> dict[str, dict[str, str]]:
+        """Return the documented attributes of every class in a source file, keyed by class qualname."""
+        if source_file not in self._file_docs:
+            self._file_docs[source_file] = self.parse_file(source_file)
+            self.files_parsed += 1
+            build_profile.count("files_parsed")
+            if self.introspection_cache:
+                self.introspection_cache.store_attribute_docs(source_file, self._file_docs[source_file])
+        return self._file_docs[source_file]
+
+    @build_profile.timed("source_parsing", lambda index, source_file: {"file": source_file})
+    def parse_file(self, source_file: str) -> dict[str, dict[str, str]]:
+        """
+        Fetch the docblocks for class arguments.
+
+        Sadly, python doesn't support docblocks on class arguments.  I only discovered this after writing all
+        the docblocs this way.  Still, I don't want to move my docblocs, because puttig them on arguments is
+        legitimately the place where they make the most sense.  So, we have to use the python parsing capabilities
+        built into python in order to extract them ourselves.  Very exciting... :cry:
+
+        We substantially simplify this process (in a way that hopefully works) by setting stringent requirements
+        for how our docblocks need to be defined.  The docblock must be a bare string in the body of the class,
+        and it must sit on the line directly above the assignment of the attribute that it documents:
+
+        ```text
+        class Column:
+            '''
+            The default value for the column.
+            '''
+            default = configs.String()
+        ```
+
+        We only look at the statements in class bodies (never inside methods), so docblocks are always matched to
+        the class that they belong to.  The docblock is returned exactly as it appears in the source code (quotes
+        and all), which is what the builders expect.
+        """
+        with open(source_file, "r") as fp:
+            source = fp.read()
+
+        class_docs: dict[str, dict[str, str]] = {}
+        self._find_classes(source.split("\n"), ast.parse(source, filename=source_file).body, "", class_docs)
+        return class_docs
+
+    def invalidate(self, source_files: list[str] | None = None) -> None:
+        """Forget the given source files (or everything, if no files are given) so they are parsed again."""
+        if source_files is None:
+            self._file_docs = {}
+            self._class_docs = {}
+            return
+        for source_file in source_files:
+            self._file_docs.pop(source_file, None)
+        self._class_docs = {key: docs for (key, docs) in self._class_docs.items() if key[0] not in source_files}
+
+    def _find_classes(
+        self, lines: list[str], statements: list[ast.stmt], prefix: str, class_docs: dict[str, dict[str, str]]
+    ) -> None:
+        for statement in statements:
+            if isinstance(statement, ast.ClassDef):
+                qualname = prefix + statement.name
+                class_docs[qualname] = self._attribute_docs(lines, statement)
+                self._find_classes(lines, statement.body, qualname + ".", class_docs)
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._find_classes(lines, statement.body, f"{prefix}{statement.name}.<locals>.", class_docs)
+            elif isinstance(statement, (ast.If, ast.Try, ast.With)):
+                # e.g. `if TYPE_CHECKING:` - these don't change the qualname of the classes defined inside of them
+                for block in ["body", "orelse", "finalbody", "handlers"]:
+                    self._find_classes(lines, getattr(statement, block, []), prefix, class_docs)
+            elif isinstance(statement, ast.ExceptHandler):
+                self._find_classes(lines, statement.body, prefix, class_docs)
+
+    def _attribute_docs(self, lines: list[str], class_node: ast.ClassDef) -> dict[str, str]:
+        doc_strings = {}
+        body = class_node.body
+        # the first string in the class body is the docblock for the class itself, not for an attribute.
+        for index in range(1, len(body) - 1):
+            docblock = body[index]
+            if not isinstance(docblock, ast.Expr) or not isinstance(docblock.value, ast.Constant):
+                continue
+            if not isinstance(docblock.value.value, str):
+                continue
+
+            attribute = body[index + 1]
+            if attribute.lineno != (docblock.end_lineno or docblock.lineno) + 1:
+                continue
+            if isinstance(attribute, ast.Assign):
+                target = attribute.targets[0]
+            elif isinstance(attribute, ast.AnnAssign):
+                target = attribute.target
+            else:
+                continue
+            if not isinstance(target, ast.Name):
+                continue
+
+            doc_strings[target.id] = self._source_segment(lines, docblock.value)
+        return doc_strings
+
+    def _source_segment(self, lines: list[str], node: ast.expr) -> str:
+        # like `ast.get_source_segment()`, but without re-splitting the whole file for every docblock.  Note that
+        # column offsets are in bytes, not characters.
+        start_line = lines[node.lineno - 1].encode("utf-8")
+        if node.lineno == node.end_lineno:
+            return start_line[node.col_offset : node.end_col_offset].decode("utf-8")
+        end_line = lines[node.end_lineno - 1].encode("utf-8")  # type: ignore
+        return "\n".join(
+            [
+                start_line[node.col_offset :].decode("utf-8"),
+                *lines[node.lineno : node.end_lineno - 1],  # type: ignore
+                end_line[: node.end_col_offset].decode("utf-8"),
+            ]
+        )
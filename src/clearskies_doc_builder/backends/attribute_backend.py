@@ -7,7 +7,10 @@ import clearskies.model
 import clearskies.query
 from clearskies.query.result import RecordsQueryResult
 
-from clearskies_doc_builder.backends.module_backend import ModuleBackend
+from clearskies_doc_builder import build_profile
+from clearskies_doc_builder.backends.lazy_record import LazyRecord
+from clearskies_doc_builder.backends.module_backend import ModuleBackend, query_details
+from clearskies_doc_builder.introspection_cache import IntrospectionCache
 
 
 class AttributeBackend(ModuleBackend):
@@ -17,6 +20,10 @@ class AttributeBackend(ModuleBackend):
         "type": lambda attribute, name, value: attribute.__class__ == value,
     }
 
+    # shared by every AttributeBackend instance.  Set for the build by `build_session.start()`.
+    introspection_cache: IntrospectionCache | None = None
+
+    @build_profile.timed("attribute_scans", query_details)
     def records(
         self, query: clearskies.query.Query, next_page_data: dict[str, str | int] | None = None
     ) -> RecordsQueryResult:
@@ -40,8 +47,16 @@ class AttributeBackend(ModuleBackend):
             raise ValueError("When searching for attributes you must include a condition on 'parent_class'")
 
         parent_class = query.conditions_by_column["parent_class"][0].values[0]
+        if "name" in query.conditions_by_column:
+            # no need to look at everything when we're searching for one attribute by name
+            name = query.conditions_by_column["name"][0].values[0]
+            names = [name] if self.has_attribute(parent_class, name) else []
+        else:
+            names = dir(parent_class)
+
+        limit = query.limit if not query.pagination else None
         matching_attributes = []
-        for name in dir(parent_class):
+        for name in names:
             attribute = getattr(parent_class, name)
             matches = True
             for condition in query.conditions:
@@ -49,14 +64,64 @@ class AttributeBackend(ModuleBackend):
                     continue
                 if not self._search_functions[condition.column_name](attribute, name, condition.values[0]):
                     matches = False
+                    break
 
             if not matches:
                 continue
             matching_attributes.append(self.unpack(attribute, name, parent_class))
+            if limit and len(matching_attributes) >= limit:
+                break
 
         return self.paginate(matching_attributes, query)
 
+    def has_attribute(self, parent_class: type, name: str) -> bool:
+        """Check if a class has an attribute, using the same rules as `dir()` (i.e. ignoring the metaclass)."""
+        return any(name in Class.__dict__ for Class in inspect.getmro(parent_class))
+
     def unpack(self, attribute: Any, name: str, parent_class: type) -> dict[str, Any]:  # type: ignore
+        # the argument details are only needed for methods, so they aren't calculated until someone asks for them.
+        build_profile.count("attributes_unpacked")
+        load_arguments = lambda: self.unpack_arguments(attribute, name, parent_class)
+        return LazyRecord(
+            {
+                "id": id(attribute),
+                "name": name,
+                "type": attribute.__class__,
+                "doc": attribute.__doc__,
+                "parent_class": parent_class,
+                "attribute": attribute,
+            },
+            {key: load_arguments for key in ["all_args", "args", "kwargs", "defaults"]},
+        )
+
+    @build_profile.timed(
+        "argument_introspection",
+        lambda backend, attribute, name, parent_class: {"attribute": f"{parent_class.__qualname__}.{name}"},
+    )
+    def unpack_arguments(self, attribute: Any, name: str, parent_class: type) -> dict[str, Any]:
+        all_args: list[str] = []
+        args: list[str] = []
+        kwargs: list[str] = []
+        defaults: dict[str, Any] | None = {}
+
+        cached_arguments = self.introspection_cache.arguments(parent_class, name) if self.introspection_cache else None
+        if cached_arguments is not None:
+            (all_args, args, kwargs) = cached_arguments
+            defaults = self.cached_defaults(attribute, kwargs)
+
+        if cached_arguments is None or defaults is None:
+            (all_args, args, kwargs, defaults) = self.arguments(attribute)
+            if self.introspection_cache:
+                self.introspection_cache.store_arguments(parent_class, name, all_args, args, kwargs, defaults)
+
+        return {
+            "all_args": all_args,
+            "args": args,
+            "kwargs": kwargs,
+            "defaults": defaults,
+        }
+
+    def arguments(self, attribute: Any) -> tuple[list[str], list[str], list[str], dict[str, Any]]:
         all_args = []
         args = []
         kwargs = []
@@ -78,15 +143,22 @@ class AttributeBackend(ModuleBackend):
             if argdata.defaults:
                 defaults = {argdata.args[index + npargs]: default for (index, default) in enumerate(argdata.defaults)}
 
-        return {
-            "id": id(attribute),
-            "name": name,
-            "type": attribute.__class__,
-            "doc": attribute.__doc__,
-            "parent_class": parent_class,
-            "attribute": attribute,
-            "all_args": all_args,
-            "args": args,
-            "kwargs": kwargs,
-            "defaults": defaults,
-        }
+        return (all_args, args, kwargs, defaults)
+
+    def cached_defaults(self, attribute: Any, kwargs: list[str]) -> dict[str, Any] | None:
+        """
+        Recover the default values for cached arguments without calling `inspect.getfullargspec`.
+
+        The cache only knows the names of the arguments with defaults, but (for functions) the values themselves are
+        sitting in `__defaults__`, in the same order.  If they don't line up then we return None and the caller falls
+        back to the full argspec.
+        """
+        if not kwargs:
+            return {}
+        try:
+            default_values = attribute.__defaults__
+        except AttributeError:
+            return None
+        if not isinstance(default_values, tuple) or len(default_values) != len(kwargs):
+            return None
+        return dict(zip(kwargs, default_values))
@@ -1,4 +1,3 @@
-import importlib
 import inspect
 from types import ModuleType
 from typing import Any
@@ -9,7 +8,8 @@ import clearskies.model
 import clearskies.query
 from clearskies.query.result import RecordsQueryResult
 
-from clearskies_doc_builder.backends.module_backend import ModuleBackend
+from clearskies_doc_builder import build_profile, static_analysis
+from clearskies_doc_builder.backends.module_backend import ModuleBackend, query_details
 
 
 class ClassBackend(ModuleBackend):
@@ -18,6 +18,11 @@ class ClassBackend(ModuleBackend):
         "source_file": lambda module, value: (module.__file__ if hasattr(module, "__file__") else "") == value,
     }
 
+    resolution_cache: dict[str, dict[str, Any]] = {}
+    resolution_cache_hits = 0
+    resolution_cache_misses = 0
+
+    @build_profile.timed("class_queries", query_details)
     def records(
         self, query: clearskies.query.Query, next_page_data: dict[str, str | int] | None = None
     ) -> RecordsQueryResult:
@@ -39,22 +44,7 @@ class ClassBackend(ModuleBackend):
 
         if "import_path" in query.conditions_by_column:
             import_path = query.conditions_by_column["import_path"][0].values[0]
-            path_parts = import_path.split(".")
-            if len(path_parts) < 2:
-                raise ValueError(
-                    'In order to search for classes by import path you must provide the module and class name, e.g. `classes.find("import_path=clearskies.Endpoint")`'
-                )
-            class_name = path_parts[-1]
-            module_path = ".".join(path_parts[0:-1])
-            module = importlib.import_module(module_path)
-            if not hasattr(module, class_name):
-                raise ValueError(f"Module {import_path} has no class named {class_name}")
-            Class = getattr(module, class_name)
-            if not inspect.isclass(Class):
-                raise ValueError(
-                    f"I was asked to import the class named '{import_path}' but this doesn't actually reference a class"
-                )
-            return RecordsQueryResult(records=[self.unpack(Class, module)])
+            return RecordsQueryResult(records=[self.resolve(import_path)])
 
         if "module" not in query.conditions_by_column:
             raise ValueError(
@@ -81,11 +71,61 @@ class ClassBackend(ModuleBackend):
 
         return self.paginate(matching_classes, query)
 
+    def resolve(self, import_path: str) -> dict[str, Any]:
+        """
+        Import a class by its import path and return its record.
+
+        The same classes get looked up over and over again during a build (builders, base classes, additional
+        attribute sources, etc...) so the records are cached by import path.  The cache is shared by every
+        ClassBackend and is reset at the start of each build (except in batch builds, which only drop the classes of
+        the project that was just built).
+        """
+        if import_path in self.resolution_cache:
+            ClassBackend.resolution_cache_hits += 1
+            build_profile.count("class_resolution_cache_hits")
+            return self.resolution_cache[import_path]
+        ClassBackend.resolution_cache_misses += 1
+        build_profile.count("class_resolution_cache_misses")
+
+        path_parts = import_path.split(".")
+        if len(path_parts) < 2:
+            raise ValueError(
+                'In order to search for classes by import path you must provide the module and class name, e.g. `classes.find("import_path=clearskies.Endpoint")`'
+            )
+        class_name = path_parts[-1]
+        module_path = ".".join(path_parts[0:-1])
+        module = self.import_module(module_path)
+        if not hasattr(module, class_name):
+            raise ValueError(f"Module {import_path} has no class named {class_name}")
+        Class = getattr(module, class_name)
+        if not inspect.isclass(Class):
+            raise ValueError(
+                f"I was asked to import the class named '{import_path}' but this doesn't actually reference a class"
+            )
+        self.resolution_cache[import_path] = self.unpack(Class, module)
+        return self.resolution_cache[import_path]
+
+    @classmethod
+    def reset_resolution_cache(cls, keep_records: bool = False) -> None:
+        if not keep_records:
+            cls.resolution_cache = {}
+        cls.resolution_cache_hits = 0
+        cls.resolution_cache_misses = 0
+
+    @classmethod
+    def forget_modules(cls, module_names: set[str]) -> None:
+        """Drop the classes that were resolved from (or defined in) the given modules, e.g. after unloading them."""
+        cls.resolution_cache = {
+            import_path: record
+            for (import_path, record) in cls.resolution_cache.items()
+            if record["module"].__name__ not in module_names and record["type"].__module__ not in module_names
+        }
+
     def unpack(self, Class: type, module: ModuleType) -> dict[str, Any]:  # type: ignore
         source_file = ""
         try:
             # this fails for built ins
-            source_file = inspect.getfile(Class)
+            source_file = static_analysis.getfile(Class)
         except TypeError:
             pass
 
@@ -93,6 +133,7 @@ class ClassBackend(ModuleBackend):
             "id": id(Class),
             "import_path": Class.__module__ + "." + Class.__name__,
             "name": Class.__name__,
+            "qualname": Class.__qualname__,
             "source_file": source_file,
             "doc": Class.__doc__,
             "module": module,
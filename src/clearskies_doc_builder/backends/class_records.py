@@ -0,0 +1,196 @@
+from types import ModuleType
+from typing import Any
+
+from clearskies_doc_builder import build_profile
+from clearskies_doc_builder.backends.attribute_backend import AttributeBackend
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+
+
+class MethodRecord:
+    """
+    A read-only stand-in for a `models.Method`, with the same fields.
+
+    The argument details (`all_args`, `args`, `kwargs` and `defaults`) are still only worked out when they are first
+    read, just like for the model.
+    """
+
+    __slots__ = ("id", "name", "type", "doc", "attribute", "parent_class", "_data")
+
+    def __init__(self, data: dict[str, Any]):
+        set_field = object.__setattr__
+        set_field(self, "id", data["id"])
+        set_field(self, "name", data["name"])
+        set_field(self, "type", data["type"])
+        set_field(self, "doc", data["doc"])
+        set_field(self, "attribute", data["attribute"])
+        set_field(self, "parent_class", data["parent_class"])
+        set_field(self, "_data", data)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Method records are read-only, so '{name}' can't be changed")
+
+    @property
+    def all_args(self) -> list[str]:
+        return self._data["all_args"]
+
+    @property
+    def args(self) -> list[str]:
+        return self._data["args"]
+
+    @property
+    def kwargs(self) -> list[str]:
+        return self._data["kwargs"]
+
+    @property
+    def defaults(self) -> dict[str, Any]:
+        return self._data["defaults"]
+
+
+class ClassRecord:
+    """
+    A read-only stand-in for a `models.Class`, with the same fields.
+
+    Builders read a handful of fields from every class they document, and a clearskies model is a lot of machinery
+    for that: building one sets up its columns, and every read goes through the column descriptors.  A record keeps
+    the fields in slots instead.  `base_classes` and `init` are worked out the same way as for the model (and
+    remembered), and anything else (e.g. `attributes` or `methods`) is handed off to a real model, which is only built
+    if someone asks for it.
+    """
+
+    __slots__ = (
+        "id",
+        "type",
+        "source_file",
+        "import_path",
+        "name",
+        "qualname",
+        "doc",
+        "module",
+        "_data",
+        "_records",
+        "_base_classes",
+        "_init",
+        "_model",
+    )
+
+    _base_classes: list["ClassRecord"] | None
+    _init: MethodRecord | None
+
+    def __init__(self, data: dict[str, Any], records: "ClassRecords"):
+        set_field = object.__setattr__
+        set_field(self, "id", data["id"])
+        set_field(self, "type", data["type"])
+        set_field(self, "source_file", data["source_file"])
+        set_field(self, "import_path", data["import_path"])
+        set_field(self, "name", data["name"])
+        set_field(self, "qualname", data["qualname"])
+        set_field(self, "doc", data["doc"])
+        set_field(self, "module", data["module"])
+        set_field(self, "_data", data)
+        set_field(self, "_records", records)
+        set_field(self, "_base_classes", None)
+        set_field(self, "_init", None)
+        set_field(self, "_model", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Class records are read-only, so '{name}' can't be changed")
+
+    @property
+    def base_classes(self) -> list["ClassRecord"]:
+        base_classes = self._base_classes
+        if base_classes is None:
+            # like the model, the bases are unpacked with the module of the class that we started from.
+            base_classes = [self._records.unpacked(base_class, self.module) for base_class in self.type.__bases__]
+            object.__setattr__(self, "_base_classes", base_classes)
+        return base_classes
+
+    @property
+    def init(self) -> MethodRecord:
+        init = self._init
+        if init is None:
+            init = self._records.find_init(self.type)
+            object.__setattr__(self, "_init", init)
+        return init
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for names that aren't slots or properties
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._model is None:
+            object.__setattr__(self, "_model", self._records.classes.model(self._data))
+        return getattr(self._model, name)
+
+    def __repr__(self) -> str:
+        return f"<ClassRecord {self.import_path}>"
+
+
+class ClassRecords:
+    """
+    Looks up classes for the builders, returning `ClassRecord`s instead of `models.Class`.
+
+    `find("import_path=...")` (which is how builders look up classes) returns a record, and anything else goes to the
+    `classes` model that we wrap, so builders can't tell the difference.  Records are kept for as long as the class
+    resolution cache keeps the classes they came from (see `ClassBackend.resolve()`), so each class gets one record per
+    build (or for the whole batch, in batch builds) and the base classes and `__init__` that it found are reused by
+    every page that shows it.
+
+    Set for the build by `build_session.start()`.
+    """
+
+    enabled = True
+
+    _resolution_cache: dict[str, dict[str, Any]] | None = None
+    _by_import_path: dict[str, ClassRecord] = {}
+    _unpacked: dict[tuple[type, ModuleType], ClassRecord] = {}
+
+    def __init__(self, classes: Any):
+        self.classes = classes
+        self.class_backend: ClassBackend = classes.backend
+        self.attribute_backend = AttributeBackend()
+
+    @classmethod
+    def wrap(cls, classes: Any) -> Any:
+        """Return records for the given classes model, if records are enabled for the build."""
+        if not cls.enabled or not isinstance(getattr(classes, "backend", None), ClassBackend):
+            return classes
+        return cls(classes)
+
+    @classmethod
+    def _check_cache(cls) -> None:
+        # resetting the resolution cache (or forgetting some of its modules) replaces it, so that's our cue to follow
+        if cls._resolution_cache is not ClassBackend.resolution_cache:
+            cls._resolution_cache = ClassBackend.resolution_cache
+            cls._by_import_path = {}
+            cls._unpacked = {}
+
+    @build_profile.timed("class_queries", lambda records, where: {"backend": "ClassRecords", "conditions": [where]})
+    def find(self, where: str) -> Any:
+        (column_name, operator, import_path) = where.partition("=")
+        if column_name != "import_path" or not operator:
+            return self.classes.find(where)
+
+        self._check_cache()
+        record = self._by_import_path.get(import_path)
+        if record is None:
+            record = ClassRecord(self.class_backend.resolve(import_path), self)
+            self._by_import_path[import_path] = record
+        return record
+
+    def unpacked(self, Class: type, module: ModuleType) -> ClassRecord:
+        self._check_cache()
+        key = (Class, module)
+        record = self._unpacked.get(key)
+        if record is None:
+            record = ClassRecord(self.class_backend.unpack(Class, module), self)
+            self._unpacked[key] = record
+        return record
+
+    @build_profile.timed(
+        "attribute_scans",
+        lambda records, Class: {"backend": "ClassRecords", "conditions": [f"parent_class={Class.__qualname__}"]},
+    )
+    def find_init(self, Class: type) -> MethodRecord:
+        return MethodRecord(self.attribute_backend.unpack(getattr(Class, "__init__"), "__init__", Class))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.classes, name)
@@ -0,0 +1,68 @@
+from typing import Any, Callable
+
+
+class LazyRecord(dict):
+    """
+    A record where some of the values aren't calculated until they are first read.
+
+    `loaders` maps each lazy key to a function that returns a dictionary of values.  A single loader can (and usually
+    will) fill in more than one key, so several keys can point at the same loader, and it will only be called once.
+    Anything that needs to see the whole record (iterating over it, comparing it, copying it, etc...) loads
+    everything first, so the laziness is invisible to callers.
+    """
+
+    def __init__(self, data: dict[str, Any], loaders: dict[str, Callable[[], dict[str, Any]]]):
+        super().__init__(data)
+        self.loaders = loaders
+
+    def __missing__(self, key: str) -> Any:
+        if key not in self.loaders:
+            raise KeyError(key)
+        values = self.loaders[key]()
+        self.update(values)
+        for loaded_key in values:
+            self.loaders.pop(loaded_key, None)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self.loaders
+
+    def get(self, key: Any, default: Any = None, /) -> Any:
+        return self[key] if key in self else default
+
+    def load(self) -> None:
+        while self.loaders:
+            self[next(iter(self.loaders))]
+
+    def __iter__(self):
+        self.load()
+        return dict.__iter__(self)
+
+    def __len__(self) -> int:
+        self.load()
+        return dict.__len__(self)
+
+    def __eq__(self, other: object) -> bool:
+        self.load()
+        if isinstance(other, LazyRecord):
+            other.load()
+        return dict.__eq__(self, other)
+
+    def keys(self):
+        self.load()
+        return dict.keys(self)
+
+    def values(self):
+        self.load()
+        return dict.values(self)
+
+    def items(self):
+        self.load()
+        return dict.items(self)
+
+    def copy(self) -> dict[str, Any]:
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        self.load()
+        return dict.__repr__(self)
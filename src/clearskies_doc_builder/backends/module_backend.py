@@ -1,5 +1,4 @@
 import importlib
-import sys
 from types import ModuleType
 from typing import Any, Callable
 
@@ -12,6 +11,18 @@ from clearskies.autodoc.schema import Schema as AutoDocSchema
 from clearskies.configs import Boolean
 from clearskies.query.result import CountQueryResult, RecordQueryResult, RecordsQueryResult, SuccessQueryResult
 
+from clearskies_doc_builder import build_profile
+from clearskies_doc_builder.backends.lazy_record import LazyRecord
+from clearskies_doc_builder.module_inventory import ModuleInventory
+
+
+def query_details(backend: Any, query: clearskies.query.Query, next_page_data: Any = None) -> dict[str, Any]:
+    """Describe a query for the build trace."""
+    return {
+        "backend": backend.__class__.__name__,
+        "conditions": [f"{condition.column_name}={condition.values[0]!r}" for condition in query.conditions],
+    }
+
 
 class ModuleBackend(clearskies.backends.Backend):
     _search_functions = {
@@ -26,6 +37,11 @@ class ModuleBackend(clearskies.backends.Backend):
     can_delete = Boolean(default=False)
     can_query = Boolean(default=True)
 
+    # shared by every ModuleBackend instance.  Set for the build by `build_session.start()`.
+    inventory: ModuleInventory = ModuleInventory()
+    # anything with an `import_module` function: `importlib` or a `StaticImporter` for builds that don't import code
+    importer: Any = importlib
+
     def update(self, id: int | str, data: dict[str, Any], model: clearskies.model.Model) -> RecordQueryResult:
         """Update the record with the given id with the information from the data dictionary."""
         raise NotImplementedError(f"The {self.__class__.__name__} only supports read operations: update is not allowed")
@@ -42,6 +58,7 @@ class ModuleBackend(clearskies.backends.Backend):
         """Return the number of records which match the given query configuration."""
         return CountQueryResult(count=len(self.records(query).records))
 
+    @build_profile.timed("module_queries", query_details)
     def records(
         self, query: clearskies.query.Query, next_page_data: dict[str, str | int] | None = None
     ) -> RecordsQueryResult:
@@ -64,30 +81,50 @@ class ModuleBackend(clearskies.backends.Backend):
         module_name_condition = query.conditions_by_column.get("import_path", query.conditions_by_column.get("name"))
         if module_name_condition:
             module_name = module_name_condition[0].values[0]
-            module = importlib.import_module(module_name)
+            module = self.import_module(module_name)
             return RecordsQueryResult(records=[self.unpack(module)])
 
-        matching_modules = []
-        module_names = set(sys.modules) & set(globals())
-        for module_name in module_names:
-            if module_name not in sys.modules:
-                continue
+        # the inventory tells us everything but the module itself, so only import when a condition needs the module
+        static_search_functions = {
+            "is_builtin": lambda entry, value: int(entry["is_builtin"]) == int(value),
+            "source_file": lambda entry, value: entry["source_file"] == value,
+        }
+        if "source_file" in query.conditions_by_column:
+            entries = self.inventory.find_by_source_file(query.conditions_by_column["source_file"][0].values[0])
+        else:
+            entries = self.inventory.entries()
 
-            module = sys.modules[module_name]
+        matching_modules = []
+        for entry in entries:
             matches = True
             for condition in query.conditions:
-                if condition.column_name not in self._search_functions:
-                    continue
-                if not self._search_functions[condition.column_name](module, condition.values[0]):
-                    matches = False
+                if condition.column_name in static_search_functions:
+                    matches = static_search_functions[condition.column_name](entry, condition.values[0])
+                elif condition.column_name in self._search_functions:
+                    module = self.import_module(entry["import_path"])
+                    matches = self._search_functions[condition.column_name](module, condition.values[0])
+                if not matches:
+                    break
 
             if not matches:
                 continue
 
-            matching_modules.append(self.unpack(module))
+            matching_modules.append(self.unpack_entry(entry))
 
         return self.paginate(matching_modules, query)
 
+    @build_profile.timed("imports", lambda backend, import_path: {"module": import_path})
+    def import_module(self, import_path: str) -> ModuleType:
+        return self.importer.import_module(import_path)
+
+    def unpack_entry(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """Unpack an inventory entry, waiting to import the module until something needs it."""
+        load_module = lambda: self.unpack(self.import_module(entry["import_path"]))
+        return LazyRecord(
+            {key: entry[key] for key in ["import_path", "name", "is_builtin", "source_file"]},
+            {key: load_module for key in ["id", "doc", "module"]},
+        )
+
     def unpack(self, module: ModuleType) -> dict[str, Any]:
         return {
             "id": id(module),
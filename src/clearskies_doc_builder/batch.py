@@ -0,0 +1,208 @@
+import contextlib
+import importlib
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Generator, Iterable
+
+from clearskies_doc_builder import CONFIG_OVERRIDES_VARIABLE, build_session
+from clearskies_doc_builder.workers import resolve_worker_count, worker_models
+
+# the modules that the build itself depends on (clearskies, the backends, etc...).  These are shared by every project
+# in the batch, so a project can't be built in-process if it would replace any of them.
+_protected_modules: set[str] | None = None
+
+
+class SharedModuleConflict(Exception):
+    """Raised when a project's packages have the same name as modules that the build itself depends on."""
+
+
+def protected_modules() -> set[str]:
+    """Import everything the build needs, and return the (top level) names of every module loaded at that point."""
+    global _protected_modules
+    if _protected_modules is None:
+        from clearskies_doc_builder import backends, builders, models  # noqa: F401
+
+        _protected_modules = {name.partition(".")[0] for name in sys.modules}
+    return _protected_modules
+
+
+def project_packages(source_path: pathlib.Path) -> set[str]:
+    """Return the names of the top level packages and modules in a project's source folder."""
+    if not source_path.is_dir():
+        return set()
+    packages = set()
+    for entry in source_path.iterdir():
+        if entry.is_dir() and entry.name.isidentifier() and any(entry.glob("**/*.py")):
+            packages.add(entry.name)
+        elif entry.suffix == ".py" and entry.stem.isidentifier():
+            packages.add(entry.stem)
+    return packages
+
+
+@contextlib.contextmanager
+def isolated_project(project_root: str | pathlib.Path) -> Generator[None, None, None]:
+    """
+    Make a project importable for the duration of its build, and then unload it again.
+
+    The project's `src/` folder goes at the front of `sys.path` (so it wins over any installed copy of the same
+    package) and is removed afterwards.  Modules with the same name as the project's packages are unloaded before
+    the build, since they come from somewhere else (another project in the batch, or an installed copy), and the
+    project's own modules are unloaded after the build, along with anything we cached about them.  Everything else
+    (clearskies, the attribute docs of its base classes, etc...) stays loaded for the next project.
+    """
+    from clearskies_doc_builder.backends.class_backend import ClassBackend
+    from clearskies_doc_builder.builders.builder import Builder
+
+    source_path = pathlib.Path(project_root) / "src"
+    packages = project_packages(source_path)
+    conflicts = packages & protected_modules()
+    if conflicts:
+        raise SharedModuleConflict(
+            f"The packages {', '.join(sorted(conflicts))} from {project_root} are already used by the build itself"
+        )
+
+    def from_project(name: str, module: Any) -> bool:
+        module_file = getattr(module, "__file__", None)
+        return name.partition(".")[0] in packages or (
+            isinstance(module_file, str) and _is_relative_to(module_file, source_path)
+        )
+
+    (module_names, source_files) = _unload_modules(from_project)
+    source_path_string = str(source_path)
+    sys.path.insert(0, source_path_string)
+    importlib.invalidate_caches()
+    try:
+        yield
+    finally:
+        if source_path_string in sys.path:
+            sys.path.remove(source_path_string)
+        sys.path_importer_cache.pop(source_path_string, None)
+        (unloaded_names, unloaded_files) = _unload_modules(from_project)
+        module_names.update(unloaded_names)
+        source_files.extend(unloaded_files)
+        ClassBackend.forget_modules(module_names)
+        Builder.attribute_doc_index.invalidate(source_files)
+
+
+def _unload_modules(should_unload: Callable[[str, Any], bool]) -> tuple[set[str], list[str]]:
+    module_names = {name for (name, module) in list(sys.modules.items()) if should_unload(name, module)}
+    source_files = []
+    for name in module_names:
+        module_file = getattr(sys.modules.pop(name), "__file__", None)
+        if isinstance(module_file, str):
+            source_files.extend([module_file, os.path.realpath(module_file)])
+    return (module_names, source_files)
+
+
+def _is_relative_to(path: str, folder: pathlib.Path) -> bool:
+    return pathlib.Path(os.path.realpath(path)).is_relative_to(os.path.realpath(folder))
+
+
+def load_project_config(project_root: str | pathlib.Path) -> dict[str, Any]:
+    with open(pathlib.Path(project_root) / "docs" / "python" / "config.json", "r") as config_file:
+        return json.loads(config_file.read())
+
+
+def build_project(project_root: str | pathlib.Path, overrides: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Build the docs for one project of a batch, in this process (if we can) and with the caches left warm.
+
+    Projects whose packages clash with the build's own dependencies (e.g. the docs for clearskies itself) are built
+    with their own build script in a separate process instead.  Any failure is returned as an "error" (rather than
+    raised) so that one broken project doesn't stop the rest of the batch.
+    """
+    from clearskies_doc_builder.build_callable import build_callable
+
+    project_root = pathlib.Path(project_root).resolve()
+    try:
+        config = {**load_project_config(project_root), **(overrides or {})}
+        with isolated_project(project_root):
+            build_session.shared_caches = True
+            try:
+                (modules, classes) = worker_models()
+                return build_callable(modules, classes, config, str(project_root / "docs"))
+            finally:
+                build_session.shared_caches = False
+    except SharedModuleConflict:
+        return build_project_in_subprocess(project_root, overrides)
+    except Exception:
+        return {"error": traceback.format_exc()}
+
+
+def build_project_in_subprocess(project_root: pathlib.Path, overrides: dict[str, Any] | None = None) -> dict[str, Any]:
+    # the build script reads its config with `load_build_config()`, which applies the overrides on top of it
+    result = subprocess.run(
+        [sys.executable, str(project_root / "docs" / "python" / "build.py")],
+        cwd=str(project_root),
+        env={**os.environ, CONFIG_OVERRIDES_VARIABLE: json.dumps(overrides or {})},
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        return {"error": result.stderr or f"The build exited with status {result.returncode}"}
+    # `build()` prints the results through the CLI context, but `build_direct()` doesn't print anything.
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return {}
+
+
+def build_batch(
+    project_roots: Iterable[str | pathlib.Path],
+    workers: int | str | None = None,
+    overrides: dict[str, Any] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Build the docs for many projects, sharing one warm build session between them.
+
+    Each project root should contain a `src/` folder and a `docs/python/config.json` file.  Clearskies is imported
+    once, and classes that many projects document (e.g. the base classes from clearskies) are only resolved and
+    parsed once, rather than once per project.  The results are returned by project root: either the page counts
+    from the build, or an "error" with the traceback.
+
+    With more than one worker the projects are spread over a process pool.  Each worker keeps its own warm session
+    and builds whole projects, one at a time and serially (i.e. `workers` in a project's config is ignored), so that
+    the pool isn't oversubscribed.
+    """
+    roots = [str(pathlib.Path(project_root).resolve()) for project_root in project_roots]
+    worker_count = min(resolve_worker_count(workers), len(roots))
+    if worker_count <= 1:
+        return {project_root: build_project(project_root, overrides) for project_root in roots}
+
+    # import everything up front, so workers started with "fork" inherit a warm interpreter
+    protected_modules()
+    worker_models()
+    with ProcessPoolExecutor(max_workers=worker_count) as pool:
+        serial = {**(overrides or {}), "workers": 1}
+        results = pool.map(build_project, roots, [serial] * len(roots))
+        return dict(zip(roots, results))
+
+
+def main() -> int:
+    """
+    Build a batch of projects from the command line.
+
+    ```
+    python -m clearskies_doc_builder.batch path/to/project-a path/to/project-b --workers 4
+    ```
+
+    The same flags as a normal build (e.g. `--profile`) apply to every project.  The results are printed as JSON,
+    and the exit code is 1 if any of the projects failed to build.
+    """
+    from clearskies_doc_builder import apply_command_line_flags, take_flag_values
+
+    worker_setting = take_flag_values("--workers", limit=1) if "--workers" in sys.argv[1:] else None
+    overrides = apply_command_line_flags({})
+    results = build_batch(sys.argv[1:], workers=worker_setting[0] if worker_setting else None, overrides=overrides)
+    print(json.dumps(results, indent=2))
+    return 1 if any("error" in result for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,25 @@
-from typing import Any
+from __future__ import annotations
 
-from clearskies_doc_builder import models
+import pathlib
+import time
+from typing import TYPE_CHECKING, Any
+
+from clearskies_doc_builder import (
+    build_manifest,
+    build_profile,
+    build_session,
+    build_trace,
+    dependency_graph,
+    workers,
+)
 from clearskies_doc_builder.prepare_doc_space import prepare_doc_space
 
+if TYPE_CHECKING:
+    from clearskies_doc_builder import models
+
+# in parallel builds, `Module` branches with more classes than this are split up between the workers.
+DEFAULT_MODULE_SHARD_SIZE = 50
+
 
 def _infer_entry_type(entry: dict[str, Any]) -> str:
     """
@@ -101,28 +118,270 @@ def _compute_nav_orders_and_child_counts(
     return nav_orders, child_counts
 
 
-def build_callable(modules: models.Module, classes: models.Class, config: dict[str, Any], project_root: str):
-    doc_root = prepare_doc_space(project_root)
+def _build_branch(
+    branch: dict[str, Any],
+    modules,
+    classes,
+    doc_root: str,
+    nav_order: int,
+    pages_to_build: set[str] | None = None,
+    shard: tuple[int, int] | None = None,
+) -> list[str]:
+    """
+    Build a single branch of the config tree and return the pages it wrote, relative to the doc root.
+
+    `pages_to_build` limits a targeted build to the pages that need to be rebuilt, and `shard` (this part, number of
+    parts) limits it to one part of a branch that was split over several workers.
+    """
+    from clearskies_doc_builder.backends.class_records import ClassRecords
+
+    started_at = time.perf_counter()
+    classes = ClassRecords.wrap(classes)
+    title = f"{branch['title']} (part {shard[0] + 1} of {shard[1]})" if shard else branch["title"]
+    with build_trace.span("branch", title=title):
+        builder_class = classes.find("import_path=" + branch["builder"]).type
+        builder = builder_class(
+            branch,
+            modules,
+            classes,
+            doc_root,
+            nav_order=nav_order,
+        )
+        if pages_to_build is not None:
+            builder.pages_to_build = pages_to_build
+        if shard:
+            builder.shard = shard
+        with build_profile.phase("rendering", builder=builder_class.__name__):
+            builder.build()
+    pages = [str(pathlib.Path(page).relative_to(doc_root)) for page in getattr(builder, "written_pages", [])]
+    if build_profile.active:
+        build_profile.active.record_branch(title, time.perf_counter() - started_at, len(pages))
+    if dependency_graph.active:
+        page_classes = {
+            str(pathlib.Path(page).relative_to(doc_root)): class_import_path
+            for (page, class_import_path) in getattr(builder, "page_classes", {}).items()
+        }
+        # the first part of a split branch replaces the branch in the graph, and the other parts add to it.
+        dependency_graph.active.record_branch(
+            branch, nav_order, page_classes, classes, partial=pages_to_build is not None or bool(shard and shard[0])
+        )
+    return pages
+
+
+def _build_branch_in_worker(
+    branch: dict[str, Any],
+    doc_root: str,
+    nav_order: int,
+    pages_to_build: set[str] | None,
+    shard: tuple[int, int] | None = None,
+) -> tuple[list[str], dict]:
+    modules, classes = workers.worker_models()
+    pages = _build_branch(branch, modules, classes, doc_root, nav_order, pages_to_build, shard)
+    build_session.flush()
+    return (pages, build_session.worker_report())
+
+
+def _shard_count(
+    branch: dict[str, Any], pages_to_build: set[str] | None, classes, worker_count: int, shard_size: int
+) -> int:
+    """
+    Decide how many parts to split a branch into, so a big module doesn't keep one worker busy while the rest wait.
+
+    Only the stock `Module` builder knows how to build part of a branch, and the page order (and nav_order) doesn't
+    depend on how it was split, so the output is the same either way.
+    """
+    from clearskies_doc_builder.builders.module import Module
+
+    page_count = len(pages_to_build) if pages_to_build is not None else len(branch.get("classes", []))
+    if worker_count < 2 or shard_size < 1 or page_count <= shard_size:
+        return 1
+    builder_class = classes.find("import_path=" + branch["builder"]).type
+    if not issubclass(builder_class, Module) or builder_class.build is not Module.build:
+        return 1
+    return min(-(-page_count // shard_size), worker_count)
+
+
+def _build_branches(
+    branches: list[tuple[dict[str, Any], int, set[str] | None]],
+    modules,
+    classes,
+    doc_root: str,
+    worker_count: int,
+    config: dict[str, Any],
+    project_root: str,
+) -> list[list[str]]:
+    """Build branches given as (branch, nav_order, pages_to_build), where `pages_to_build` is None for all pages."""
+    shard_size = int(config.get("module_shard_size", DEFAULT_MODULE_SHARD_SIZE))
+    tasks = []
+    for index, (branch, nav_order, pages_to_build) in enumerate(branches):
+        shard_count = _shard_count(branch, pages_to_build, classes, worker_count, shard_size)
+        for shard_index in range(shard_count):
+            shard = (shard_index, shard_count) if shard_count > 1 else None
+            tasks.append((index, branch, nav_order, pages_to_build, shard))
+
+    if worker_count == 1 or len(tasks) < 2:
+        return [
+            _build_branch(branch, modules, classes, doc_root, nav_order, pages_to_build)
+            for (branch, nav_order, pages_to_build) in branches
+        ]
+
+    # Every branch (or part of a branch) writes to its own pages, and all directories are created with
+    # `parents=True, exist_ok=True`, so they can be built in any order (and at the same time) and still produce the
+    # same output.
+    with workers.make_process_pool(min(worker_count, len(tasks)), config, project_root) as pool:
+        futures = [
+            (index, pool.submit(_build_branch_in_worker, branch, doc_root, nav_order, pages_to_build, shard))
+            for (index, branch, nav_order, pages_to_build, shard) in tasks
+        ]
+        # collect results in tree order so that, if anything fails, we report the same error as the serial build.
+        pages_by_branch: list[list[str]] = [[] for branch in branches]
+        for index, future in futures:
+            (pages, report) = future.result()
+            build_session.merge_worker_report(report)
+            pages_by_branch[index].extend(pages)
+        return pages_by_branch
+
+
+def _build_affected_pages(
+    branches: list[tuple[dict[str, Any], int]],
+    previous_graph: dependency_graph.DependencyGraph,
+    modules,
+    classes,
+    doc_root: str,
+    worker_count: int,
+    config: dict[str, Any],
+    project_root: str,
+) -> int:
+    """
+    Rebuild only the pages that depend on the changed files, and return the number of stale pages that were removed.
+
+    The dependency graph from the previous build tells us which pages depend on which files.  Branches that are new,
+    or whose config entry changed, are rebuilt completely, and pages from branches that are gone are deleted.
+    """
+    changed_files = list(config.get("changed_files", []))
+    if config.get("since"):
+        changed_files.extend(dependency_graph.changed_files_since(config["since"], project_root))
+    affected = previous_graph.affected_pages(changed_files)
+
+    to_build: list[tuple[dict[str, Any], int, set[str] | None]] = []
+    keys = set()
+    for branch, nav_order in branches:
+        key = build_manifest.branch_key(branch)
+        keys.add(key)
+        entry = previous_graph.entries.get(key)
+        if not entry or entry["inputs"] != build_manifest.branch_inputs_hash(branch, nav_order):
+            to_build.append((branch, nav_order, None))
+        elif key in affected:
+            to_build.append((branch, nav_order, affected[key]))
+
+    previous_pages = set(previous_graph.pages)
+    previous_graph.remove_entries(set(previous_graph.entries) - keys)
+    _build_branches(to_build, modules, classes, doc_root, worker_count, config, project_root)
+    previous_graph.merge(dependency_graph.active.take())  # type: ignore
+    previous_graph.save(pathlib.Path(doc_root).parent)
+
+    stale_pages = sorted(previous_pages - set(previous_graph.pages))
+    for page in stale_pages:
+        (pathlib.Path(doc_root) / page).unlink(missing_ok=True)
+    return len(stale_pages)
+
+
+def _save_dependency_graph(
+    build_path: pathlib.Path, previous_graph: dependency_graph.DependencyGraph | None = None, unchanged_keys=()
+) -> None:
+    if not dependency_graph.active:
+        return
+    if previous_graph:
+        dependency_graph.active.carry_forward(previous_graph, unchanged_keys)
+    dependency_graph.active.save(build_path)
+
+
+def build_callable(
+    modules: models.Module, classes: models.Class, config: dict[str, Any], project_root: str
+) -> dict[str, int]:
+    """Build the docs, and return the number of pages that were written (or left alone because they didn't change)."""
+    build_session.start(config, project_root)
+    incremental = config.get("incremental", False)
+    sync = config.get("sync", False)
+    targeted = build_session.is_targeted(config)
+    # incremental and synced builds keep the pages from the last build around, so we have to track which pages
+    # each branch writes in order to clean up after branches that go away.
+    track_pages = incremental or sync
+    with build_profile.phase("prepare_doc_space"):
+        if track_pages or targeted:
+            doc_root = prepare_doc_space(project_root, clean=False, sync=sync)
+        else:
+            doc_root = prepare_doc_space(project_root)
 
     # Pre-compute nav_orders and child counts based on sorting rules
     nav_orders, child_counts = _compute_nav_orders_and_child_counts(config["tree"])
 
+    branches = []
     for index, branch in enumerate(config["tree"]):
-        nav_order = nav_orders[index]
-
         # Add child_entry_count to branch so Module builder can offset its class nav_orders
         # This ensures child entries (submodules) appear first in navigation
         branch_with_child_count = {
             **branch,
             "child_entry_count": child_counts.get(branch["title"], 0),
         }
+        branches.append((branch_with_child_count, nav_orders[index]))
 
-        builder_class = classes.find("import_path=" + branch["builder"]).type
-        builder = builder_class(
-            branch_with_child_count,
+    worker_count = workers.resolve_worker_count(config.get("workers"))
+    build_path = pathlib.Path(doc_root).parent
+    previous_graph = (
+        dependency_graph.DependencyGraph.load(pathlib.Path(project_root).parent, build_path)
+        if dependency_graph.active
+        else None
+    )
+    # without a graph from a previous build we don't know what depends on what, so targeted builds build everything.
+    if targeted and previous_graph:
+        pages_removed = _build_affected_pages(
+            branches, previous_graph, modules, classes, doc_root, worker_count, config, project_root
+        )
+        return {**build_session.finish(build_path), "pages_removed": pages_removed}
+
+    if not track_pages:
+        _build_branches(
+            [(branch, nav_order, None) for (branch, nav_order) in branches],
             modules,
             classes,
             doc_root,
-            nav_order=nav_order,
+            worker_count,
+            config,
+            project_root,
         )
-        builder.build()
+        _save_dependency_graph(build_path)
+        return build_session.finish(build_path)
+
+    manifest = build_manifest.BuildManifest(build_path)
+    keys = []
+    for index, (branch, nav_order) in enumerate(branches):
+        key = build_manifest.branch_key(branch)
+        keys.append(key if key not in keys else f"{key}#{index}")
+
+    changed = []
+    for key, (branch, nav_order) in zip(keys, branches):
+        inputs_hash = build_manifest.branch_inputs_hash(branch, nav_order)
+        if not incremental or not manifest.is_unchanged(key, inputs_hash, doc_root):
+            changed.append((key, inputs_hash, branch, nav_order))
+
+    pages_by_branch = _build_branches(
+        [(branch, nav_order, None) for (key, inputs_hash, branch, nav_order) in changed],
+        modules,
+        classes,
+        doc_root,
+        worker_count,
+        config,
+        project_root,
+    )
+    for (key, inputs_hash, branch, nav_order), pages in zip(changed, pages_by_branch):
+        manifest.record(key, inputs_hash, build_manifest.branch_source_files(branch, classes), pages)
+
+    stale_pages = manifest.remove_stale_pages(doc_root)
+    manifest.save()
+    changed_keys = {key for (key, inputs_hash, branch, nav_order) in changed}
+    unchanged_branches = [branch for (key, (branch, nav_order)) in zip(keys, branches) if key not in changed_keys]
+    _save_dependency_graph(
+        build_path, previous_graph, [build_manifest.branch_key(branch) for branch in unchanged_branches]
+    )
+    return {**build_session.finish(build_path), "pages_removed": len(stale_pages)}
@@ -0,0 +1,152 @@
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+from typing import Any
+
+from clearskies_doc_builder import static_analysis
+
+MANIFEST_FILENAME = ".doc-builder-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def branch_key(branch: dict[str, Any]) -> str:
+    """Return a stable name for a branch in the manifest, matching the folder hierarchy that it builds into."""
+    return "/".join(filter(None, [branch.get("grand_parent"), branch.get("parent"), branch["title"]]))
+
+
+def branch_inputs_hash(branch: dict[str, Any], nav_order: int) -> str:
+    """Hash the parts of a branch that come from the config file (rather than from source code)."""
+    return _hash_string(json.dumps({"branch": branch, "nav_order": nav_order}, sort_keys=True, default=str))
+
+
+def branch_class_paths(branch: dict[str, Any]) -> list[str]:
+    """
+    Return the import paths of every class that the output of a branch depends on.
+
+    This includes the builder itself, since changing the builder changes the output.  Base classes aren't listed
+    here: they are picked up when we walk the MRO of each class in `branch_source_files`.
+    """
+    class_paths = [branch["builder"], branch.get("source", "")]
+    class_paths.extend(branch.get("classes", []))
+    class_paths.extend(branch.get("additional_attribute_sources", []))
+    for target in branch.get("args_to_additional_attributes_map", {}).values():
+        class_paths.append(target.rsplit(".", 1)[0])
+    return [class_path for class_path in class_paths if class_path]
+
+
+def branch_source_files(branch: dict[str, Any], classes) -> list[str]:
+    """Find the source files of every class (and all of their base classes) that a branch depends on."""
+    source_files = set()
+    for class_path in branch_class_paths(branch):
+        for Class in inspect.getmro(classes.find(f"import_path={class_path}").type):
+            try:
+                source_files.add(static_analysis.getfile(Class))
+            except TypeError:
+                # built-ins don't have a source file, and they also don't change between builds
+                pass
+    return sorted(source_files)
+
+
+def hash_file(path: str) -> str:
+    with open(path, "rb") as fp:
+        return hashlib.file_digest(fp, "sha256").hexdigest()
+
+
+def file_signature(path: str, previous: list[Any] | None = None) -> list[Any]:
+    """
+    Return [mtime_ns, size, sha256] for a file.
+
+    If the file has the same mtime and size as the previous signature then we trust the previous content hash
+    rather than reading the file again.  This keeps a no-op rebuild down to a handful of `stat` calls.
+    """
+    stat = os.stat(path)
+    if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+        return previous
+    return [stat.st_mtime_ns, stat.st_size, hash_file(path)]
+
+
+class BuildManifest:
+    """
+    Track the inputs and outputs of every branch in the config tree between builds.
+
+    For each branch we record a hash of its config entry, the signature of every source file that it was built from,
+    and the pages it wrote.  A branch can be skipped if its config entry hasn't changed, none of its source files
+    have changed, and all of its pages still exist.
+    """
+
+    def __init__(self, build_path: str | pathlib.Path):
+        self.path = pathlib.Path(build_path) / MANIFEST_FILENAME
+        self.branches: dict[str, dict[str, Any]] = {}
+        self._previous_branches: dict[str, dict[str, Any]] = {}
+        if self.path.is_file():
+            try:
+                data = json.loads(self.path.read_text())
+            except ValueError:
+                data = {}
+            if data.get("version") == MANIFEST_VERSION:
+                self._previous_branches = data.get("branches", {})
+
+    def is_unchanged(self, key: str, inputs_hash: str, doc_root: str | pathlib.Path) -> bool:
+        previous = self._previous_branches.get(key)
+        if not previous or previous["inputs"] != inputs_hash:
+            return False
+
+        doc_root = pathlib.Path(doc_root)
+        if not all((doc_root / page).is_file() for page in previous["pages"]):
+            return False
+
+        files = {}
+        for path, previous_signature in previous["files"].items():
+            try:
+                signature = file_signature(path, previous_signature)
+            except OSError:
+                return False
+            if signature[2] != previous_signature[2]:
+                return False
+            files[path] = signature
+
+        # carry the branch forward, with any refreshed stat data, so the next build can skip it too.
+        self.branches[key] = {**previous, "files": files}
+        return True
+
+    def source_files(self) -> set[str]:
+        """Return every source file that the previous build depended on."""
+        return {path for branch in self._previous_branches.values() for path in branch["files"]}
+
+    def branches_depending_on(self, source_files: set[str] | list[str]) -> dict[str, list[str]]:
+        """Return the branches (and their pages) from the previous build that depend on any of the given files."""
+        source_files = set(source_files)
+        return {
+            key: branch["pages"]
+            for (key, branch) in self._previous_branches.items()
+            if source_files.intersection(branch["files"])
+        }
+
+    def record(self, key: str, inputs_hash: str, source_files: list[str], pages: list[str]) -> None:
+        previous_files = self._previous_branches.get(key, {}).get("files", {})
+        self.branches[key] = {
+            "inputs": inputs_hash,
+            "files": {path: file_signature(path, previous_files.get(path)) for path in source_files},
+            "pages": sorted(pages),
+        }
+
+    def remove_stale_pages(self, doc_root: str | pathlib.Path) -> list[str]:
+        """Delete pages from the previous build that no branch wrote this time around."""
+        doc_root = pathlib.Path(doc_root)
+        current_pages = {page for branch in self.branches.values() for page in branch["pages"]}
+        stale_pages = sorted(
+            {page for branch in self._previous_branches.values() for page in branch["pages"]} - current_pages
+        )
+        for page in stale_pages:
+            (doc_root / page).unlink(missing_ok=True)
+        return stale_pages
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"version": MANIFEST_VERSION, "branches": self.branches}, sort_keys=True))
+
+
+def _hash_string(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
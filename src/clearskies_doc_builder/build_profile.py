@@ -0,0 +1,184 @@
+import contextlib
+import functools
+import json
+import os
+import pathlib
+import time
+from typing import Any, Callable, Generator
+
+from clearskies_doc_builder import build_trace
+
+REPORT_FILENAME = ".doc-builder-profile.json"
+DEFAULT_SLOWEST = 10
+
+# the profile for the current build, or None when profiling is off.  Set by `build_session.start()`.
+active: "BuildProfile | None" = None
+
+
+class BuildProfile:
+    """
+    Collect timings and counters over the course of a build.
+
+    The build is split into phases (imports, attribute scans, writing pages, etc...).  Phases nest: e.g. building
+    a branch asks the backends for classes, which imports modules.  Each phase only gets the time spent in it
+    directly, so the phase times add up to (at most) the total build time.
+
+    Parallel builds have a profile in every worker.  Workers hand their numbers over with `take()` and the main
+    process adds them to its own with `merge()`.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.slowest = slowest
+        self.started_at = time.perf_counter()
+        self.reset()
+
+    def reset(self) -> None:
+        self.phases: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+        self.branches: list[dict[str, Any]] = []
+        self.pages: dict[str, float] = {}
+        self.classes: dict[str, float] = {}
+        self._stack: list[str] = []
+        self._switched_at = time.perf_counter()
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def enter(self, phase: str) -> None:
+        self._switch()
+        self._stack.append(phase)
+        if phase not in self.phases:
+            self.phases[phase] = {"seconds": 0.0, "calls": 0}
+        self.phases[phase]["calls"] += 1
+
+    def exit(self) -> None:
+        self._switch()
+        self._stack.pop()
+
+    def _switch(self) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            self.phases[self._stack[-1]]["seconds"] += now - self._switched_at
+        self._switched_at = now
+
+    def record_branch(self, title: str, seconds: float, pages: int) -> None:
+        self.branches.append({"title": title, "seconds": seconds, "pages": pages})
+
+    def record_page(self, page: str, seconds: float, class_import_path: str = "") -> None:
+        self.pages[page] = seconds
+        if class_import_path:
+            self.classes[class_import_path] = self.classes.get(class_import_path, 0.0) + seconds
+
+    def take(self) -> dict[str, Any]:
+        """Return everything recorded so far and start over, so nothing gets reported twice."""
+        self._switch()
+        data = {
+            "phases": self.phases,
+            "counters": self.counters,
+            "branches": self.branches,
+            "pages": self.pages,
+            "classes": self.classes,
+        }
+        stack = self._stack
+        self.reset()
+        self._stack = stack
+        return data
+
+    def merge(self, data: dict[str, Any]) -> None:
+        for phase, numbers in data["phases"].items():
+            totals = self.phases.setdefault(phase, {"seconds": 0.0, "calls": 0})
+            totals["seconds"] += numbers["seconds"]
+            totals["calls"] += numbers["calls"]
+        for counter, amount in data["counters"].items():
+            self.count(counter, amount)
+        self.branches.extend(data["branches"])
+        self.pages.update(data["pages"])
+        for class_import_path, seconds in data["classes"].items():
+            self.classes[class_import_path] = self.classes.get(class_import_path, 0.0) + seconds
+
+    def report(self) -> dict[str, Any]:
+        self._switch()
+        return {
+            "total_seconds": time.perf_counter() - self.started_at,
+            "phases": dict(sorted(self.phases.items(), key=lambda item: -item[1]["seconds"])),
+            "counters": dict(sorted(self.counters.items())),
+            "branches": self.branches,
+            "slowest_pages": self._slowest(self.pages, "page"),
+            "slowest_classes": self._slowest(self.classes, "class"),
+            "pages": dict(sorted(self.pages.items())),
+        }
+
+    def _slowest(self, timings: dict[str, float], key: str) -> list[dict[str, Any]]:
+        slowest = sorted(timings.items(), key=lambda item: -item[1])[: self.slowest]
+        return [{key: name, "seconds": seconds} for (name, seconds) in slowest]
+
+    def write_report(self, build_path: str | os.PathLike) -> dict[str, Any]:
+        report = self.report()
+        report_path = pathlib.Path(build_path) / REPORT_FILENAME
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2))
+        return report
+
+
+def count(counter: str, amount: int = 1) -> None:
+    """Bump a counter in the active profile (if there is one)."""
+    if active:
+        active.count(counter, amount)
+
+
+@contextlib.contextmanager
+def phase(name: str, **details: Any) -> Generator[None, None, None]:
+    """
+    Time a block of code as part of the given phase of the active profile (if there is one).
+
+    The block is also recorded as a span in the active trace (if there is one), with the details attached.
+    """
+    profile = active
+    trace = build_trace.active
+    if not profile and not trace:
+        yield
+        return
+    if profile:
+        profile.enter(name)
+    if trace:
+        trace.begin(name, details)
+    try:
+        yield
+    finally:
+        if trace:
+            trace.end()
+        if profile:
+            profile.exit()
+
+
+def timed(name: str, details: Callable[..., dict[str, Any]] | None = None) -> Callable[[Callable], Callable]:
+    """
+    Time every call of the decorated function as part of the given phase, and record it as a span in the trace.
+
+    `details` is called with the same arguments as the function to describe the call in the trace, and only when
+    tracing.  When profiling and tracing are both off this costs one extra function call, so it's fine for functions
+    that are called often, but not for the innermost loops.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profile = active
+            trace = build_trace.active
+            if not profile and not trace:
+                return function(*args, **kwargs)
+            if profile:
+                profile.enter(name)
+            if trace:
+                trace.begin(name, details(*args, **kwargs) if details else None)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if trace:
+                    trace.end()
+                if profile:
+                    profile.exit()
+
+        return wrapper
+
+    return decorator
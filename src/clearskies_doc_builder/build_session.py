@@ -0,0 +1,159 @@
+import importlib
+import multiprocessing
+import pathlib
+from typing import Any
+
+from clearskies_doc_builder import build_profile, build_trace, dependency_graph
+from clearskies_doc_builder.builders.page_writer import DEFAULT_WRITE_QUEUE_DEPTH, PageWriter, WritePool
+from clearskies_doc_builder.import_stubs import ImportStubs
+from clearskies_doc_builder.introspection_cache import DEFAULT_CACHE_FILENAME, IntrospectionCache
+from clearskies_doc_builder.module_inventory import ModuleInventory
+from clearskies_doc_builder.static_analysis import StaticImporter
+
+import_stubs: ImportStubs | None = None
+trace_path: pathlib.Path | None = None
+# batch builds keep the classes resolved for one project around for the next one (see `batch.py`)
+shared_caches: bool = False
+
+
+def start(config: dict[str, Any], project_root: str | pathlib.Path) -> None:
+    """
+    Apply the build-wide settings from the config to the shared backends and builders.
+
+    This happens once at the start of the build and, for parallel builds, once in every worker process.
+    """
+    # the backends (and clearskies) are imported here, rather than up top, to keep them out of our import time.
+    from clearskies_doc_builder.backends.attribute_backend import AttributeBackend
+    from clearskies_doc_builder.backends.class_backend import ClassBackend
+    from clearskies_doc_builder.backends.class_records import ClassRecords
+    from clearskies_doc_builder.backends.module_backend import ModuleBackend
+    from clearskies_doc_builder.builders.builder import Builder
+
+    profile_setting = config.get("profile")
+    if profile_setting:
+        # `"profile": true` reports the 10 slowest pages and classes, or a number can be given instead.
+        slowest = build_profile.DEFAULT_SLOWEST if profile_setting is True else int(profile_setting)
+        build_profile.active = build_profile.BuildProfile(slowest=slowest)
+    else:
+        build_profile.active = None
+
+    global trace_path
+    trace_setting = config.get("trace")
+    # `"trace": true` writes the trace next to the other reports in the build folder.
+    trace_path = pathlib.Path(project_root) / trace_setting if isinstance(trace_setting, str) else None
+    if trace_setting:
+        process_name = "build worker" if multiprocessing.parent_process() else "build"
+        build_trace.active = build_trace.BuildTrace(process_name=process_name)
+    else:
+        build_trace.active = None
+
+    # targeted builds (of the pages affected by a set of changed files) need the graph too
+    if config.get("dependency_graph") or is_targeted(config):
+        dependency_graph.active = dependency_graph.DependencyGraph(pathlib.Path(project_root).parent)
+    else:
+        dependency_graph.active = None
+
+    global import_stubs
+    if import_stubs:
+        import_stubs.uninstall()
+    import_stubs = (
+        ImportStubs(config["stub_imports"], measure_imports=bool(config.get("measure_stubbed_imports")))
+        if config.get("stub_imports")
+        else None
+    )
+    if import_stubs:
+        import_stubs.install()
+
+    introspection_cache = None
+    cache_setting = config.get("introspection_cache")
+    if cache_setting:
+        cache_path = (
+            pathlib.Path(project_root) / "build" / DEFAULT_CACHE_FILENAME
+            if cache_setting is True
+            else pathlib.Path(project_root) / cache_setting
+        )
+        introspection_cache = IntrospectionCache(cache_path)
+
+    AttributeBackend.introspection_cache = introspection_cache
+    Builder.attribute_doc_index.introspection_cache = introspection_cache
+    ClassBackend.reset_resolution_cache(keep_records=shared_caches)
+    ClassRecords.enabled = config.get("lightweight_records", True)
+    PageWriter.reset_counts()
+    if PageWriter.write_pool:
+        PageWriter.write_pool.close()
+    write_threads = int(config.get("write_threads") or 0)
+    PageWriter.write_pool = (
+        WritePool(write_threads, int(config.get("write_queue_depth", DEFAULT_WRITE_QUEUE_DEPTH)))
+        if write_threads > 0
+        else None
+    )
+    ModuleBackend.inventory = ModuleInventory(config.get("root_packages", []))
+
+    introspection = config.get("introspection", "import")
+    if introspection == "import":
+        ModuleBackend.importer = importlib
+    elif introspection == "static":
+        # the builders still have to run, so they get imported like normal
+        builder_modules = [branch["builder"].rpartition(".")[0] for branch in config.get("tree", [])]
+        ModuleBackend.importer = StaticImporter(live_modules=builder_modules)
+    else:
+        raise ValueError(f"Unknown introspection mode '{introspection}': it should be either 'import' or 'static'")
+
+
+def is_targeted(config: dict[str, Any]) -> bool:
+    """Check if the build should only rebuild the pages affected by a set of changed files."""
+    return "changed_files" in config or bool(config.get("since"))
+
+
+def flush() -> None:
+    """Persist anything that was cached during the build, and wait for any pages still being written."""
+    from clearskies_doc_builder.backends.attribute_backend import AttributeBackend
+
+    if PageWriter.write_pool:
+        PageWriter.write_pool.drain()
+    if AttributeBackend.introspection_cache:
+        AttributeBackend.introspection_cache.flush()
+
+
+def worker_report() -> dict[str, Any]:
+    """Summarize what happened in a worker process, for the main process to merge with `merge_worker_report()`."""
+    return {
+        "stubbed_imports": sorted(import_stubs.stubbed) if import_stubs else [],
+        "page_counts": PageWriter.take_counts(),
+        "profile": build_profile.active.take() if build_profile.active else None,
+        "trace": build_trace.active.take() if build_trace.active else None,
+        "dependency_graph": dependency_graph.active.take() if dependency_graph.active else None,
+    }
+
+
+def merge_worker_report(report: dict[str, Any]) -> None:
+    PageWriter.add_counts(report["page_counts"])
+    if import_stubs:
+        import_stubs.stubbed.update(report["stubbed_imports"])
+    if build_profile.active and report["profile"]:
+        build_profile.active.merge(report["profile"])
+    if build_trace.active and report["trace"]:
+        build_trace.active.merge(report["trace"])
+    if dependency_graph.active and report["dependency_graph"]:
+        dependency_graph.active.merge(report["dependency_graph"])
+
+
+def finish(build_path: str | pathlib.Path) -> dict[str, int]:
+    """Wrap up the build: persist the caches, write out the reports, and summarize which pages changed."""
+    global import_stubs
+    flush()
+    if PageWriter.write_pool:
+        PageWriter.write_pool.close()
+        PageWriter.write_pool = None
+    if import_stubs:
+        import_stubs.write_report(build_path)
+        import_stubs.uninstall()
+        import_stubs = None
+    if build_profile.active:
+        build_profile.active.write_report(build_path)
+        build_profile.active = None
+    if build_trace.active:
+        build_trace.active.write(trace_path or pathlib.Path(build_path) / build_trace.DEFAULT_TRACE_FILENAME)
+        build_trace.active = None
+    dependency_graph.active = None
+    return PageWriter.take_counts()
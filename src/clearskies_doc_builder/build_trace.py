@@ -0,0 +1,89 @@
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+from typing import Any, Generator
+
+DEFAULT_TRACE_FILENAME = ".doc-builder-trace.json"
+
+# the trace for the current build, or None when tracing is off.  Set by `build_session.start()`.
+active: "BuildTrace | None" = None
+
+
+class BuildTrace:
+    """
+    Record a timeline of the build in the Chrome trace event format.
+
+    Every span becomes a "complete" event with a start time and duration, which can be opened with Perfetto
+    (https://ui.perfetto.dev) or `chrome://tracing`.  Timestamps come from the system-wide monotonic clock, so the
+    spans from worker processes line up with the spans from the main process.  Each process gets its own track.
+
+    Workers hand their events over with `take()` and the main process adds them to its own with `merge()`.
+    """
+
+    def __init__(self, process_name: str = "build"):
+        self.pid = os.getpid()
+        self.process_name = process_name
+        self.events: list[dict[str, Any]] = []
+        self._stacks: dict[int, list[tuple[str, int, dict[str, Any]]]] = {}
+        self._process_named = False
+
+    def begin(self, name: str, args: dict[str, Any] | None = None) -> None:
+        thread_id = threading.get_native_id()
+        if thread_id not in self._stacks:
+            self._stacks[thread_id] = []
+        self._stacks[thread_id].append((name, time.perf_counter_ns(), args or {}))
+
+    def end(self) -> None:
+        ended_at = time.perf_counter_ns()
+        thread_id = threading.get_native_id()
+        (name, started_at, args) = self._stacks[thread_id].pop()
+        self.events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": started_at / 1000,
+                "dur": (ended_at - started_at) / 1000,
+                "pid": self.pid,
+                "tid": thread_id,
+                "args": args,
+            }
+        )
+
+    def take(self) -> list[dict[str, Any]]:
+        """Return the events recorded so far and start over, so nothing gets reported twice."""
+        events = self._process_name_events() + self.events
+        self.events = []
+        return events
+
+    def merge(self, events: list[dict[str, Any]]) -> None:
+        self.events.extend(events)
+
+    def write(self, trace_path: str | os.PathLike) -> None:
+        trace_path = pathlib.Path(trace_path)
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        trace = {"traceEvents": self.take(), "displayTimeUnit": "ms"}
+        trace_path.write_text(json.dumps(trace))
+
+    def _process_name_events(self) -> list[dict[str, Any]]:
+        # the process name only has to be sent once, along with the first batch of events.
+        if self._process_named:
+            return []
+        self._process_named = True
+        return [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": self.process_name}}]
+
+
+@contextlib.contextmanager
+def span(name: str, **args: Any) -> Generator[None, None, None]:
+    """Record a block of code as a span in the active trace (if there is one)."""
+    trace = active
+    if not trace:
+        yield
+        return
+    trace.begin(name, args)
+    try:
+        yield
+    finally:
+        trace.end()
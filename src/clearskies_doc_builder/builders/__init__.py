@@ -1,9 +1,23 @@
-from clearskies_doc_builder.builders.module import Module
-from clearskies_doc_builder.builders.single_class import SingleClass
-from clearskies_doc_builder.builders.single_class_to_section import SingleClassToSection
+from typing import TYPE_CHECKING
+
+from clearskies_doc_builder.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from clearskies_doc_builder.builders.module import Module
+    from clearskies_doc_builder.builders.single_class import SingleClass
+    from clearskies_doc_builder.builders.single_class_to_section import SingleClassToSection
 
 __all__ = [
     "Module",
     "SingleClass",
     "SingleClassToSection",
 ]
+
+(__getattr__, __dir__) = lazy_exports(
+    __name__,
+    {
+        "Module": "clearskies_doc_builder.builders.module:Module",
+        "SingleClass": "clearskies_doc_builder.builders.single_class:SingleClass",
+        "SingleClassToSection": "clearskies_doc_builder.builders.single_class_to_section:SingleClassToSection",
+    },
+)
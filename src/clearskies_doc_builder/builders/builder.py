@@ -1,10 +1,24 @@
+import contextlib
 import pathlib
 import re
-import tokenize
+import time
+from typing import Any, Generator
+
+from clearskies_doc_builder import build_profile
+from clearskies_doc_builder.attribute_doc_index import AttributeDocIndex
+from clearskies_doc_builder.builders.page_writer import PageWriter
 
 
 class Builder:
-    _attribute_cache: dict[str, dict[str, str]] = {}
+    # shared by every builder, so that each source file is parsed at most once per build.
+    attribute_doc_index = AttributeDocIndex()
+
+    # for targeted builds: the pages (relative to the doc root) that need to be rebuilt, or None to build everything.
+    pages_to_build: set[str] | None = None
+
+    # for big branches that are split over several workers: (this part, number of parts), or None to build everything.
+    # Only builders that know how to split their work (i.e. `Module`) look at this.
+    shard: tuple[int, int] | None = None
 
     def __init__(self, branch, modules, classes, doc_root, nav_order):
         self.modules = modules
@@ -13,12 +27,18 @@ class Builder:
         self.title = branch["title"]
         self.source = branch["source"]
         self.nav_order = nav_order
-        self._attribute_cache = {}
         self.args_to_additional_attributes_map = {}
+        self.written_pages: list[pathlib.Path] = []
+        # the class that each page documents, for the dependency graph
+        self.page_classes: dict[pathlib.Path, str] = {}
+        # when profiling, each page is charged with the time since the previous page was written.
+        self.page_started_at = time.perf_counter()
 
     def make_index_from_class_overview(self, title_snake_case, source_class, section_folder_path):
         filename = "index"
-        section_folder_path.mkdir(exist_ok=True)
+        section_folder_path.mkdir(parents=True, exist_ok=True)
+        if self.skip_page(section_folder_path / f"{filename}.md"):
+            return
 
         doc = self.build_header(self.title, filename, title_snake_case, None, self.nav_order, True)
         (elevator_pitch, overview) = self.parse_overview_doc(
@@ -31,9 +51,7 @@ class Builder:
         )
         doc += f"\n\n# {self.title}\n\n{elevator_pitch}\n\n## Overview\n\n{overview}"
 
-        output_file = section_folder_path / f"{filename}.md"
-        with output_file.open(mode="w") as doc_file:
-            doc_file.write(doc)
+        self.write_page(section_folder_path / f"{filename}.md", doc, source_class.import_path)
 
     def make_index_from_class_overview_with_hierarchy(
         self, title_snake_case, source_class, section_folder_path, section_name, parent=None, grand_parent=None
@@ -54,6 +72,8 @@ class Builder:
         """
         filename = "index"
         section_folder_path.mkdir(parents=True, exist_ok=True)
+        if self.skip_page(section_folder_path / f"{filename}.md"):
+            return
 
         # Use instance attributes if not provided as arguments
         parent = parent if parent is not None else getattr(self, "parent", None)
@@ -70,9 +90,56 @@ class Builder:
         )
         doc += f"\n\n# {self.title}\n\n{elevator_pitch}\n\n## Overview\n\n{overview}"
 
-        output_file = section_folder_path / f"{filename}.md"
-        with output_file.open(mode="w") as doc_file:
-            doc_file.write(doc)
+        self.write_page(section_folder_path / f"{filename}.md", doc, source_class.import_path)
+
+    @contextlib.contextmanager
+    def open_page(self, output_file: pathlib.Path, class_import_path: str = "") -> Generator[PageWriter, None, None]:
+        """Open a page for writing, so it can be written out as it is rendered."""
+        with PageWriter(output_file) as page:
+            yield page
+        self.written_pages.append(output_file)
+        self.page_classes[output_file] = class_import_path
+
+        profile = build_profile.active
+        if profile:
+            now = time.perf_counter()
+            relative_path = str(output_file.relative_to(self.doc_root))
+            profile.record_page(relative_path, now - self.page_started_at, class_import_path)
+            # pages that are written in the background are counted once they've been written
+            if not page.queued:
+                profile.count("pages_written" if page.changed else "pages_unchanged")
+            profile.count("bytes_written", page.bytes_written)
+            self.page_started_at = now
+
+    def skip_page(self, output_file: pathlib.Path) -> bool:
+        """Check if a page can be skipped, because a targeted build doesn't need it."""
+        if self.pages_to_build is None:
+            return False
+        return str(output_file.relative_to(self.doc_root)) not in self.pages_to_build
+
+    def write_page(self, output_file: pathlib.Path, doc: str, class_import_path: str = "") -> None:
+        with self.open_page(output_file, class_import_path) as page:
+            page.write(doc)
+
+    def write_class_sections(
+        self, page: PageWriter, source_class: Any, overview: str, arguments: dict[str, dict[str, Any]]
+    ) -> None:
+        """Write the table of contents, overview, and argument docs for a class page."""
+        page.write_table_of_contents([("Overview", "#overview"), *[(arg, f"#{arg}") for arg in arguments]])
+        page.write(f"\n## Overview\n\n{overview}\n\n")
+
+        for arg, arg_data in arguments.items():
+            page.write(f"## {arg}\n**" + ("Required" if arg_data["required"] else "Optional") + "**\n\n")
+            argument_doc = arg_data["doc"]
+            if isinstance(argument_doc, str):
+                argument_doc = argument_doc.replace('"""', "")
+            page.write(
+                self.raw_docblock_to_md(
+                    argument_doc,
+                    context=f"argument '{arg}' in class '{source_class.name}'",
+                )
+                + "\n\n"
+            )
 
     def parse_overview_doc(self, overview_doc):
         parts = overview_doc.lstrip("\n").split("\n", 1)
@@ -84,70 +151,13 @@ class Builder:
         """
         Fetch the docblocks for class arguments.
 
-        Sadly, python doesn't support docblocks on class arguments.  I only discovered this after writing all
-        the docblocs this way.  Still, I don't want to move my docblocs, because puttig them on arguments is
-        legitimately the place where they make the most sense.  So, we have to use the python parsing capabilities
-        built into python in order to extract them ourselves.  Very exciting... :cry:
-
-        We substantially simplify this process (in a way that hopefully works) by setting stringent requirements
-        for how our docblocks need to be defined.  The docblock must come before the argument and they must be
-        at the top of the class.  In addition, when we are called, we are provided with a list of all argument
-        names so that we are looking for a specific list of things rather than searching more generically for
-        a series of documented arguments.  So, we're looking for a pattern of:
-
-         1. tokenize.STRING
-         2. tokenize.NEWLINE
-         3. tokenize.NAME
-
-        This will probably match a bunch of things, which is where our list of argument names comes in.
-        Also, we'll only use the first combination of these things we find, which menas that attribute definitions
-        must be at the top of the file. This will help us avoid getting confused by variable definitions with
-        matching names later in the class.
+        Python doesn't support docblocks on class arguments, so we parse them out of the source code ourselves.
+        The parsing happens in the build-wide `attribute_doc_index`, which is shared by all builders so that
+        common base classes only get parsed once.
         """
-        # built in classes (which we will reach with our iterative approach) don't have a source file.
-        if not source_class.source_file:
-            return {}
-
-        # we will iterate over base classes, and these often get re-used, so let's keep a cache
-        if source_class.source_file in self._attribute_cache:
-            return self._attribute_cache[source_class.source_file]
-
-        doc_strings = {}
-        with open(source_class.source_file, "r") as fp:
-            # so this is both very simple and, hopefully, not prone to failure. The tokenization information that comes back from the
-            # parser is surprisingly generic and vague.  However, we are looking for something
-            last_string = ""
-            for token_type, token_string, (srow, scol), (erow, ecol), line_content in tokenize.generate_tokens(
-                fp.readline
-            ):
-                if token_type == tokenize.STRING:
-                    last_string = token_string
-                    continue
-                if token_type == tokenize.NEWLINE:
-                    continue
-                if token_type != tokenize.NAME:
-                    last_string = ""
-                    continue
-                if not last_string or token_string not in argument_names:
-                    continue
-                doc_strings[token_string] = last_string
-
-        # and let's repeat this for any base classes just to make sure we don't miss anything.  Often attributes are defined in
-        # bases and we want to use those docs if we don't have them.
-        for base_class in source_class.base_classes:
-            doc_strings = {
-                **self.extract_attribute_docs(base_class, argument_names),
-                **doc_strings,
-            }
-
-        for additional_source_class in additional_attribute_sources:
-            doc_strings = {
-                **self.extract_attribute_docs(additional_source_class, argument_names),
-                **doc_strings,
-            }
-
-        self._attribute_cache[source_class.source_file] = doc_strings
-        return doc_strings
+        return self.attribute_doc_index.extract_attribute_docs(
+            source_class, argument_names, additional_attribute_sources=additional_attribute_sources
+        )
 
     def build_header(self, title, filename, section_name, parent, nav_order, has_children, grand_parent=None):
         permalink = "/docs/" + (f"{section_name}/" if section_name else "") + f"{filename}.html"
@@ -47,25 +47,35 @@ class Module(Builder):
             section_name = title_snake_case
             section_folder_path = self.doc_root / title_snake_case
 
-        source_class = self.classes.find(f"import_path={self.source}")
-        self.make_index_from_class_overview_with_hierarchy(
-            title_snake_case, source_class, section_folder_path, section_name
-        )
+        # A big module can be split over several workers, each of which builds every n-th class, and the first of
+        # which also builds the index.
+        (shard_index, shard_count) = self.shard if self.shard else (0, 1)
+        if shard_index == 0:
+            source_class = self.classes.find(f"import_path={self.source}")
+            self.make_index_from_class_overview_with_hierarchy(
+                title_snake_case, source_class, section_folder_path, section_name
+            )
+        else:
+            section_folder_path.mkdir(parents=True, exist_ok=True)
 
         default_args = self.default_args()
 
         # Start nav_order after any child entries (submodules) so they appear first
-        # Child entries get nav_order 1, 2, 3... and classes get nav_order after that
-        nav_order = self.child_entry_count
-        for class_name in self.class_list:
-            nav_order += 1
+        # Child entries get nav_order 1, 2, 3... and classes get nav_order after that.  The nav_order only depends on
+        # the position of the class in the list, so it doesn't matter how the classes were split up.
+        for position, class_name in enumerate(self.class_list):
+            if position % shard_count != shard_index:
+                continue
+            nav_order = self.child_entry_count + position + 1
             source_class = self.classes.find(f"import_path={class_name}")
             title = source_class.name
             filename = clearskies.functional.string.title_case_to_snake_case(source_class.name).replace("_", "-")
+            if self.skip_page(section_folder_path / f"{filename}.md"):
+                continue
             # For classes within a module, the module title becomes the parent
             # and if the module has a parent, that becomes the grand_parent
             class_grand_parent = self.parent if self.parent else None
-            class_doc = self.build_header(
+            class_header = self.build_header(
                 source_class.name, filename, section_name, self.title, nav_order, False, class_grand_parent
             )
             (elevator_pitch, overview) = self.parse_overview_doc(
@@ -76,9 +86,6 @@ class Module(Builder):
                 .lstrip("\n")
                 .lstrip(" ")
             )
-            class_doc += f"\n\n# {title}\n\n{elevator_pitch}\n\n"
-            main_doc = f"## Overview\n\n{overview}\n\n"
-            table_of_contents = " 1. [Overview](#overview)\n"
 
             # Find the documentation for all of our init args.
             arguments: dict[str, Any] = OrderedDict()
@@ -100,23 +107,6 @@ class Module(Builder):
                     continue
                 arguments[arg]["doc"] = doc
 
-            for index, arg in enumerate(arguments.keys()):
-                arg_data = arguments[arg]
-                table_of_contents += f" {index + 2}. [{arg}](#{arg})\n"
-                main_doc += f"## {arg}\n**" + ("Required" if arg_data["required"] else "Optional") + "**\n\n"
-                argument_doc = arg_data["doc"]
-                if isinstance(argument_doc, str):
-                    argument_doc = argument_doc.replace('"""', "")
-                main_doc += (
-                    self.raw_docblock_to_md(
-                        argument_doc,
-                        context=f"argument '{arg}' in class '{source_class.name}'",
-                    )
-                    + "\n\n"
-                )
-
-            class_doc += f"{table_of_contents}\n{main_doc}"
-
-            output_file = section_folder_path / f"{filename}.md"
-            with output_file.open(mode="w") as doc_file:
-                doc_file.write(class_doc)
+            with self.open_page(section_folder_path / f"{filename}.md", source_class.import_path) as page:
+                page.write(f"{class_header}\n\n# {title}\n\n{elevator_pitch}\n\n")
+                self.write_class_sections(page, source_class, overview, arguments)
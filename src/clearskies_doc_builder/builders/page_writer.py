@@ -0,0 +1,229 @@
+import hashlib
+import os
+import pathlib
+import queue
+import threading
+from typing import Any, Callable, Iterable
+
+from clearskies_doc_builder import build_profile
+
+DEFAULT_WRITE_QUEUE_DEPTH = 64
+
+
+class PageWriter:
+    """
+    Write a page of documentation in chunks, straight to its file.
+
+    Builders write the page from top to bottom as they render it, so a page is never held in memory as one big
+    string (and never gets copied over and over again as it grows).  Small chunks are gathered up by the file's
+    buffer before they hit the disk.
+
+    The page goes to a temporary file next to the real one, and is hashed as it is written.  Once it's finished,
+    the page is compared with the existing file: if nothing changed the existing file is left alone (so it keeps its
+    modification time, and Jekyll, rsync, etc... can skip it), and otherwise the new page is moved into place in one
+    step, so nothing ever sees a half-written page.
+
+    Use it as a context manager.  If anything goes wrong before the page is finished, the existing file is left
+    as-is and the partial page is thrown away.
+
+    When there is a `write_pool`, the page is gathered up in memory instead, and the finished page is handed to the
+    pool to be compared and written in the background (see `WritePool`).
+    """
+
+    # the number of pages that were (or weren't) written during the build.  Reset by `build_session.start()`.
+    pages_written = 0
+    pages_unchanged = 0
+    _counts_lock = threading.Lock()
+
+    # writes finished pages in the background, or None to write them as they are rendered.  Set by
+    # `build_session.start()`.
+    write_pool: "WritePool | None" = None
+
+    def __init__(self, output_file: pathlib.Path):
+        self.output_file = output_file
+        self.temporary_file = output_file.with_name(f".{output_file.name}.tmp")
+        self.bytes_written = 0
+        self.changed = True
+        # True once the page has been handed to the write pool, after which `changed` isn't known until it's written.
+        self.queued = False
+        self._hash = hashlib.sha256()
+        self._sink: Any = None
+        self._chunks: list[bytes] | None = None
+        self._write_data: Callable[[bytes], Any] | None = None
+
+    def __enter__(self) -> "PageWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback) -> None:
+        self.close()
+        if exception_type is not None:
+            self.temporary_file.unlink(missing_ok=True)
+            return
+        self.commit()
+
+    @classmethod
+    def reset_counts(cls) -> None:
+        cls.pages_written = 0
+        cls.pages_unchanged = 0
+
+    @classmethod
+    def take_counts(cls) -> dict[str, int]:
+        """Return the page counts so far and start over, so nothing gets counted twice."""
+        counts = {"pages_written": cls.pages_written, "pages_unchanged": cls.pages_unchanged}
+        cls.reset_counts()
+        return counts
+
+    @classmethod
+    def add_counts(cls, counts: dict[str, int]) -> None:
+        with cls._counts_lock:
+            cls.pages_written += counts["pages_written"]
+            cls.pages_unchanged += counts["pages_unchanged"]
+
+    @build_profile.timed("writes", lambda page: {"page": str(page.output_file)})
+    def open(self) -> None:
+        if self.write_pool:
+            self._chunks = []
+            self._write_data = self._chunks.append
+        else:
+            self._sink = self.temporary_file.open(mode="wb")
+            self._write_data = self._sink.write
+
+    @build_profile.timed("writes", lambda page: {"page": str(page.output_file)})
+    def close(self) -> None:
+        if self._sink:
+            self._sink.close()
+            self._sink = None
+
+    @build_profile.timed("writes", lambda page: {"page": str(page.output_file)})
+    def commit(self) -> None:
+        """Move the finished page into place, unless it's identical to the page that is already there."""
+        if self._chunks is not None:
+            # this waits when the pool is already busy with as many pages as it can hold
+            self.queued = True
+            self.write_pool.submit(self)  # type: ignore
+            return
+        self.changed = not self.matches_existing_file()
+        if self.changed:
+            os.replace(self.temporary_file, self.output_file)
+        else:
+            self.temporary_file.unlink()
+        PageWriter.add_counts({"pages_written": int(self.changed), "pages_unchanged": int(not self.changed)})
+
+    def persist(self) -> None:
+        """Write out a page that was gathered up in memory (this is what the write pool calls)."""
+        self.changed = not self.matches_existing_file()
+        if self.changed:
+            try:
+                with self.temporary_file.open(mode="wb") as sink:
+                    sink.writelines(self._chunks)  # type: ignore
+                os.replace(self.temporary_file, self.output_file)
+            except BaseException:
+                self.temporary_file.unlink(missing_ok=True)
+                raise
+        self._chunks = None
+        PageWriter.add_counts({"pages_written": int(self.changed), "pages_unchanged": int(not self.changed)})
+
+    def matches_existing_file(self) -> bool:
+        try:
+            size = self.output_file.stat().st_size
+        except FileNotFoundError:
+            return False
+        # no need to read the existing file unless it's the same size
+        if size != self.bytes_written:
+            return False
+        with self.output_file.open(mode="rb") as existing_file:
+            return hashlib.file_digest(existing_file, "sha256").digest() == self._hash.digest()
+
+    def write(self, chunk: str) -> None:
+        data = chunk.encode("utf-8")
+        self._write_data(data)  # type: ignore
+        self._hash.update(data)
+        self.bytes_written += len(data)
+
+    def write_table_of_contents(self, entries: Iterable[tuple[str, str]]) -> None:
+        """
+        Write a numbered table of contents from (title, link) pairs.
+
+        The table of contents only needs the titles of the sections, which are known before any section is
+        rendered, so it can go out before the sections do.
+        """
+        for number, (title, link) in enumerate(entries, start=1):
+            self.write(f" {number}. [{title}]({link})\n")
+
+
+class WritePool:
+    """
+    Write finished pages from a pool of background threads, so that rendering doesn't wait for the disk.
+
+    Builders render pages into memory and hand them over with `submit()`.  The threads compare each page with the
+    existing file and write it out if it changed, which is mostly waiting on the file system (and the GIL is
+    released while waiting), so the next page is rendered while the previous ones are written.  This pays off on slow
+    (e.g. network) file systems, where every stat, write, and rename is a round trip.
+
+    The queue between the builders and the threads holds at most `depth` pages: when it's full, `submit()` waits
+    for a thread to catch up, which keeps memory use in check.  Call `drain()` to wait for everything to be written
+    (it raises the first error from the threads, if there was one) and `close()` to stop the threads.  The threads
+    are only started once the first page comes in, so a process that never writes pages (e.g. the main process of
+    a parallel build, which forks the workers) never has any.
+    """
+
+    def __init__(self, threads: int, depth: int = DEFAULT_WRITE_QUEUE_DEPTH):
+        self.thread_count = threads
+        self.queue: queue.Queue[PageWriter | None] = queue.Queue(maxsize=max(depth, 1))
+        self.threads: list[threading.Thread] = []
+        self.error: BaseException | None = None
+        self.pid = os.getpid()
+        # pages written (or left alone) since the last drain, for the profile
+        self.counts = {"pages_written": 0, "pages_unchanged": 0}
+        self._lock = threading.Lock()
+
+    def submit(self, page: PageWriter) -> None:
+        if self.error:
+            self.drain()
+        if not self.threads:
+            self.threads = [
+                threading.Thread(target=self._write_pages, name=f"page-writer-{index}", daemon=True)
+                for index in range(self.thread_count)
+            ]
+            for thread in self.threads:
+                thread.start()
+        self.queue.put(page)
+
+    def drain(self) -> None:
+        """Wait for every page to be written, and count them in the profile."""
+        if self.threads:
+            self.queue.join()
+        with self._lock:
+            (counts, self.counts) = (self.counts, {"pages_written": 0, "pages_unchanged": 0})
+        for counter, amount in counts.items():
+            if amount:
+                build_profile.count(counter, amount)
+        if self.error:
+            (error, self.error) = (self.error, None)
+            raise error
+
+    def close(self) -> None:
+        # after a fork, the threads only exist in the parent process
+        if not self.threads or self.pid != os.getpid():
+            return
+        for thread in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def _write_pages(self) -> None:
+        while True:
+            page = self.queue.get()
+            try:
+                if page is None:
+                    return
+                if not self.error:
+                    page.persist()
+                    with self._lock:
+                        self.counts["pages_written" if page.changed else "pages_unchanged"] += 1
+            except BaseException as error:
+                self.error = self.error or error
+            finally:
+                self.queue.task_done()
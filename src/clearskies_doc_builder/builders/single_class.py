@@ -47,7 +47,7 @@ class SingleClass(Builder):
         title_snake_case = clearskies.functional.string.title_case_to_snake_case(self.title.replace(" ", "")).replace(
             "_", "-"
         )
-        class_doc = self.build_header(
+        class_header = self.build_header(
             self.title, title_snake_case, section_name, self.parent, self.nav_order, False, self.grand_parent
         )
         (elevator_pitch, overview) = self.parse_overview_doc(
@@ -58,9 +58,6 @@ class SingleClass(Builder):
             .lstrip("\n")
             .lstrip(" ")
         )
-        class_doc += f"\n\n# {self.title}\n\n{elevator_pitch}\n\n"
-        main_doc = f"## Overview\n\n{overview}\n\n"
-        table_of_contents = " 1. [Overview](#overview)\n"
 
         default_args = self.default_args()
 
@@ -90,23 +87,6 @@ class SingleClass(Builder):
                 continue
             arguments[arg]["doc"] = doc
 
-        for index, arg in enumerate(arguments.keys()):
-            arg_data = arguments[arg]
-            table_of_contents += f" {index + 2}. [{arg}](#{arg})\n"
-            main_doc += f"## {arg}\n**" + ("Required" if arg_data["required"] else "Optional") + "**\n\n"
-            argument_doc = arg_data["doc"]
-            if isinstance(argument_doc, str):
-                argument_doc = argument_doc.replace('"""', "")
-            main_doc += (
-                self.raw_docblock_to_md(
-                    argument_doc,
-                    context=f"argument '{arg}' in class '{source_class.name}'",
-                )
-                + "\n\n"
-            )
-
-        class_doc += f"{table_of_contents}\n{main_doc}"
-
         # Determine output filename based on hierarchy level
         if self.parent or self.grand_parent:
             # Child or grandchild: use title as filename
@@ -118,6 +98,6 @@ class SingleClass(Builder):
             # Top-level: use index.md
             output_filename = "index.md"
 
-        output_file = section_folder_path / output_filename
-        with output_file.open(mode="w") as doc_file:
-            doc_file.write(class_doc)
+        with self.open_page(section_folder_path / output_filename, source_class.import_path) as page:
+            page.write(f"{class_header}\n\n# {self.title}\n\n{elevator_pitch}\n\n")
+            self.write_class_sections(page, source_class, overview, arguments)
@@ -21,26 +21,24 @@ class SingleClassToSection(Builder):
             title_snake_case = clearskies.functional.string.title_case_to_snake_case(title.replace(" ", "")).replace(
                 "_", "-"
             )
-            doc = self.build_header(title, title_snake_case, section_name, self.title, index + 1, False)
-            doc += f"\n\n# {title}\n\n"
-            table_of_contents = ""
-            attribute_docs = ""
-
-            for index, attribute_name in enumerate(doc_data["attributes"]):
-                attribute = source_class.attributes.find(f"name={attribute_name}")
-                table_of_contents += f" {index + 1}. [{attribute_name}]({title_snake_case}.html#{attribute_name})\n"
-                attribute_docs += f"\n\n## {attribute_name}\n\n"
-                attribute_docs += re.sub(
-                    "\n    ",
-                    "\n",
-                    self.raw_docblock_to_md(
-                        attribute.doc,
-                        context=f"attribute '{attribute_name}' in class '{source_class.name}'",
-                    ),
+            header = self.build_header(title, title_snake_case, section_name, self.title, index + 1, False)
+            with self.open_page(section_folder_path / f"{title_snake_case}.md", source_class.import_path) as page:
+                page.write(f"{header}\n\n# {title}\n\n")
+                page.write_table_of_contents(
+                    (attribute_name, f"{title_snake_case}.html#{attribute_name}")
+                    for attribute_name in doc_data["attributes"]
                 )
 
-            doc += f"{table_of_contents}{attribute_docs}"
-
-            output_file = section_folder_path / f"{title_snake_case}.md"
-            with output_file.open(mode="w") as doc_file:
-                doc_file.write(doc)
+                for attribute_name in doc_data["attributes"]:
+                    attribute = source_class.attributes.find(f"name={attribute_name}")
+                    page.write(f"\n\n## {attribute_name}\n\n")
+                    page.write(
+                        re.sub(
+                            "\n    ",
+                            "\n",
+                            self.raw_docblock_to_md(
+                                attribute.doc,
+                                context=f"attribute '{attribute_name}' in class '{source_class.name}'",
+                            ),
+                        )
+                    )
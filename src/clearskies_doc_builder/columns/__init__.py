@@ -1,10 +1,15 @@
-from clearskies_doc_builder.columns.any import Any
-from clearskies_doc_builder.columns.attribute import Attribute
-from clearskies_doc_builder.columns.attributes import Attributes
-from clearskies_doc_builder.columns.base_classes import BaseClasses
-from clearskies_doc_builder.columns.class_column import Class
-from clearskies_doc_builder.columns.module import Module
-from clearskies_doc_builder.columns.module_classes import ModuleClasses
+from typing import TYPE_CHECKING
+
+from clearskies_doc_builder.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from clearskies_doc_builder.columns.any import Any
+    from clearskies_doc_builder.columns.attribute import Attribute
+    from clearskies_doc_builder.columns.attributes import Attributes
+    from clearskies_doc_builder.columns.base_classes import BaseClasses
+    from clearskies_doc_builder.columns.class_column import Class
+    from clearskies_doc_builder.columns.module import Module
+    from clearskies_doc_builder.columns.module_classes import ModuleClasses
 
 __all__ = [
     "Any",
@@ -15,3 +20,16 @@ __all__ = [
     "Module",
     "ModuleClasses",
 ]
+
+(__getattr__, __dir__) = lazy_exports(
+    __name__,
+    {
+        "Any": "clearskies_doc_builder.columns.any:Any",
+        "Attribute": "clearskies_doc_builder.columns.attribute:Attribute",
+        "Attributes": "clearskies_doc_builder.columns.attributes:Attributes",
+        "BaseClasses": "clearskies_doc_builder.columns.base_classes:BaseClasses",
+        "Class": "clearskies_doc_builder.columns.class_column:Class",
+        "Module": "clearskies_doc_builder.columns.module:Module",
+        "ModuleClasses": "clearskies_doc_builder.columns.module_classes:ModuleClasses",
+    },
+)
@@ -1,18 +1,23 @@
 from __future__ import annotations
 
+import itertools
 from typing import Callable
 
 import clearskies
 
+from clearskies_doc_builder.columns.memoized_column import MemoizedColumn
 
-class Attribute(clearskies.columns.HasMany):
+
+class Attribute(MemoizedColumn, clearskies.columns.HasMany):
     def __init__(
         self,
         child_model_class,
         readable_child_column_names: list[str] = [],
         filter: Callable | None = None,
+        attribute_name: str | None = None,
     ):
         self.filter = filter
+        self.attribute_name = attribute_name
         super().__init__(
             child_model_class,
             foreign_column_name="parent_class",
@@ -28,11 +33,16 @@ class Attribute(clearskies.columns.HasMany):
         if not self._config or "name" not in self._config:
             instance.get_columns()
 
+        return self.memoize(instance, lambda: self.find_attribute(instance))
+
+    def find_attribute(self, instance):
         parent_class_column = getattr(self.child_model_class, "parent_class")
         attributes = self.child_model.where(parent_class_column.equals(instance.type))
+        if self.attribute_name:
+            # searching by name lets the backend go straight to the attribute instead of unpacking all of them
+            attributes = attributes.where(getattr(self.child_model_class, "name").equals(self.attribute_name))
         if self.filter:
-            filtered_attributes = list(filter(self.filter, attributes))
-            return filtered_attributes[0]
+            attributes = filter(self.filter, attributes)
 
-        all_attributes = list(attributes)
-        return all_attributes[0]
+        # only take the first match, so we don't have to run the filter over everything else
+        return list(itertools.islice(attributes, 1))[0]
@@ -1,11 +1,44 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable
 
 import clearskies
 
+from clearskies_doc_builder.columns.memoized_column import MemoizedColumn
 
-class Attributes(clearskies.columns.HasMany):
+
+class QueryResults:
+    """
+    Wraps a query so that the models it returns are kept the first time through, instead of running it every time.
+
+    Anything else (e.g. `where()` or `find()`, to narrow things down) goes to the query itself.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self._models: list | None = None
+
+    @property
+    def models(self) -> list:
+        if self._models is None:
+            # not `list(self.query)`, which would ask the query for its length (i.e. run it an extra time) first
+            self._models = list(iter(self.query))
+        return self._models
+
+    def __iter__(self):
+        return iter(self.models)
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+    def __getitem__(self, index):
+        return self.models[index]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.query, name)
+
+
+class Attributes(MemoizedColumn, clearskies.columns.HasMany):
     def __init__(
         self,
         child_model_class,
@@ -28,9 +61,12 @@ class Attributes(clearskies.columns.HasMany):
         if not self._config or "name" not in self._config:
             instance.get_columns()
 
+        return self.memoize(instance, lambda: self.find_attributes(instance))
+
+    def find_attributes(self, instance):
         parent_class_column = getattr(self.child_model_class, "parent_class")
         attributes = self.child_model.where(parent_class_column.equals(instance.type))
         if self.filter:
             return list(filter(self.filter, attributes))
 
-        return attributes
+        return QueryResults(attributes)
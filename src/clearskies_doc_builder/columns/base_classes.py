@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import clearskies
 
+from clearskies_doc_builder.columns.memoized_column import MemoizedColumn
 
-class BaseClasses(clearskies.columns.HasMany):
+
+class BaseClasses(MemoizedColumn, clearskies.columns.HasMany):
     def __init__(
         self,
         readable_child_column_names: list[str] = [],
@@ -24,8 +26,10 @@ class BaseClasses(clearskies.columns.HasMany):
         if not self._config or "name" not in self._config:
             instance.get_columns()
 
-        bases = []
-        for base_class in instance.type.__bases__:
-            bases.append(instance.model(instance.backend.unpack(base_class, instance.module)))
-
-        return bases
+        return self.memoize(
+            instance,
+            lambda: [
+                instance.model(instance.backend.unpack(base_class, instance.module))
+                for base_class in instance.type.__bases__
+            ],
+        )
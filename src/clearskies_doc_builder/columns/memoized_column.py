@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+
+class MemoizedColumn:
+    """
+    Keep the value of a relationship column on the model instance after it is first calculated.
+
+    Our relationship columns are calculated by querying a backend, which (for classes) means reflecting over every
+    attribute of the class.  The answer doesn't change during a build, so it's stored alongside the other transformed
+    column values of the model, which clearskies clears whenever the model gets new data.  Call `invalidate` to
+    force it to be calculated again.
+    """
+
+    def memoize(self, instance, calculate: Callable[[], Any]) -> Any:
+        if self.name not in instance._transformed_data:  # type: ignore
+            instance._transformed_data[self.name] = calculate()  # type: ignore
+        return instance._transformed_data[self.name]  # type: ignore
+
+    def invalidate(self, instance) -> None:
+        instance._transformed_data.pop(self.name, None)  # type: ignore
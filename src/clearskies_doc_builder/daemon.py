@@ -0,0 +1,391 @@
+import contextlib
+import json
+import os
+import pathlib
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from typing import Any, Callable
+
+# The client side of this module (everything that `python -m clearskies_doc_builder.daemon build` needs) only uses the
+# standard library, so that asking the daemon for a build costs a python startup and nothing more.  The build side
+# imports clearskies and friends when the daemon starts serving.
+
+START_TIMEOUT_SECONDS = 30
+
+
+def default_socket_path() -> str:
+    """Return the socket that the daemon listens on unless told otherwise: one per user, in a directory of its own."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"clearskies-doc-builder-{os.getuid()}", "daemon.sock")
+
+
+def check_socket_directory(socket_path: str, create: bool = False) -> None:
+    """
+    Make sure that nobody else can put a socket where we expect to find the daemon's.
+
+    The directory that holds the socket has to be a real directory that belongs to us, and that nobody else can
+    write to.  Otherwise another user could put their own socket there, either to keep the daemon from starting or to
+    receive our build requests.  With `create`, the directory is made (readable by us alone) if it doesn't exist.  A
+    missing directory is otherwise fine, since then there's nothing to connect to.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    try:
+        status = os.lstat(directory)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o022:
+        raise PermissionError(
+            "The build daemon's socket has to be in a directory that belongs to you and that nobody else can write "
+            + f"to, but {directory} isn't"
+        )
+
+
+class BuildDaemon:
+    """
+    A long running build server that keeps everything warm between builds.
+
+    The daemon listens on a Unix socket for build requests, each of which names a project root (containing the usual
+    `src/` and `docs/python/config.json`) along with any command line flags for the build.  The first build of a
+    project is a normal incremental build.  After that, the modules of the project stay imported, and each request
+    only reloads the modules whose source files changed since the last build (and the modules that import from them),
+    and then rebuilds the branches of the tree that depend on them, just like watch mode.  Clearskies, the
+    dependency injection container, and the build caches stay warm the whole time, so a rebuild doesn't pay for any
+    of them.
+
+    One project is loaded at a time: asking for a different project unloads the current one (see
+    `batch.isolated_project()`).  Requests are handled one at a time, in the order they arrive.  If a change can't be
+    reloaded in place (e.g. a change to clearskies itself, when documenting clearskies), the daemon tells the client
+    and restarts itself, and the client then asks again.
+
+    The protocol is one line of JSON in each direction.
+    """
+
+    def __init__(self, socket_path: str | None = None, output: Callable[[str], None] = print):
+        self.socket_path = socket_path or default_socket_path()
+        self.output = output
+        self.project_root: pathlib.Path | None = None
+        self.project = contextlib.ExitStack()
+        self.watch: Any = None
+        self.flags: dict[str, Any] = {}
+        self.server: socket.socket | None = None
+
+    def listen(self) -> None:
+        check_socket_directory(self.socket_path, create=True)
+        if os.path.exists(self.socket_path):
+            with contextlib.suppress(OSError), socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(self.socket_path)
+                raise ValueError(f"A build daemon is already listening on {self.socket_path}")
+            # left behind by a daemon that didn't shut down cleanly
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        # anyone who can talk to the daemon can make it import (and therefore run) python code
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen()
+
+    def serve(self) -> None:
+        """Handle requests until we're asked to stop (or are interrupted)."""
+        # importing everything before the first request is what keeps the first build fast, too
+        from clearskies_doc_builder import batch, workers
+
+        batch.protected_modules()
+        workers.worker_models()
+        if not self.server:
+            self.listen()
+        self.output(f"Listening for builds on {self.socket_path}")
+        try:
+            while True:
+                (connection, _) = self.server.accept()  # type: ignore
+                with connection:
+                    response = self.respond(connection)
+                if response.get("stopping"):
+                    return
+                if response.get("restarting"):
+                    self.restart()
+                    return
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def respond(self, connection: socket.socket) -> dict[str, Any]:
+        """
+        Read one request from a connection and answer it.
+
+        Nothing that a client sends (or fails to send) is allowed to take the daemon down: connections that close
+        without a request (e.g. another daemon checking whether we're running) are ignored, and requests that aren't
+        JSON get an error back.
+        """
+        try:
+            line = _receive_line(connection)
+        except OSError:
+            return {}
+        if not line.strip():
+            return {}
+        try:
+            request = json.loads(line)
+        except ValueError:
+            request = None
+        if isinstance(request, dict):
+            response = self.handle(request)
+        else:
+            response = {"error": f"Requests should be a line of JSON with a 'command', but I received {line[:200]!r}"}
+        with contextlib.suppress(OSError):
+            connection.sendall((json.dumps(response) + "\n").encode("utf-8"))
+        return response
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        command = request.get("command", "build")
+        if command == "stop":
+            return {"stopping": True}
+        if command == "status":
+            return {"project_root": str(self.project_root) if self.project_root else None, "pid": os.getpid()}
+        if command != "build":
+            return {"error": f"Unknown command '{command}': it should be 'build', 'status', or 'stop'"}
+
+        from clearskies_doc_builder.watch import RestartRequired
+
+        output: list[str] = []
+        started_at = time.perf_counter()
+        try:
+            flags = parse_flags(request.get("argv", []), request.get("cwd"))
+            results = self.build(pathlib.Path(request["project_root"]), flags, output.append)
+        except RestartRequired as restart:
+            return {"restarting": True, "output": [f"{restart}: restarting the build daemon"]}
+        except Exception:
+            return {"error": traceback.format_exc(), "output": output}
+        return {"results": results, "output": output, "seconds": round(time.perf_counter() - started_at, 3)}
+
+    def build(
+        self, project_root: pathlib.Path, flags: dict[str, Any], output: Callable[[str], None]
+    ) -> dict[str, int] | None:
+        """
+        Build a project with the given flags, reloading whatever changed since the last build.
+
+        Returns the page counts, or None if a changed module failed to load (the reason goes to the output).
+        """
+        project_root = project_root.resolve()
+        if project_root != self.project_root:
+            self.open_project(project_root, flags)
+            self.watch.output = output
+            return self.watch.build()
+
+        self.watch.output = output
+        changed_files = self.watch.watcher.changed()
+        if flags != self.flags:
+            self.flags = flags
+            # treat it like a change to the config, so the config gets reloaded with the new flags
+            changed_files.add(self.watch.config_file)
+        if changed_files:
+            return self.watch.rebuild(changed_files)
+        return self.watch.build()
+
+    def open_project(self, project_root: pathlib.Path, flags: dict[str, Any]) -> None:
+        from clearskies_doc_builder import batch, build_session, workers
+        from clearskies_doc_builder.watch import PollingWatcher, Watch
+
+        self.close_project()
+        try:
+            self.project.enter_context(batch.isolated_project(project_root))
+        except batch.SharedModuleConflict:
+            # the project is (part of) the builder itself.  We can still build it, like `build()` does, but any change
+            # to it means a restart.
+            source_path = str(project_root / "src")
+            sys.path.append(source_path)
+            self.project.callback(lambda: source_path in sys.path and sys.path.remove(source_path))
+        build_session.shared_caches = True
+        self.project.callback(setattr, build_session, "shared_caches", False)
+
+        self.flags = flags
+        (modules, classes) = workers.worker_models()
+        self.watch = Watch(
+            modules,
+            classes,
+            project_root / "docs" / "python" / "config.json",
+            project_root / "docs",
+            watcher=PollingWatcher(),
+            apply_flags=lambda config: {**config, **self.flags},
+        )
+        self.project_root = project_root
+
+    def close_project(self) -> None:
+        if self.watch:
+            self.watch.watcher.close()
+        self.watch = None
+        self.project_root = None
+        self.project.close()
+        self.project = contextlib.ExitStack()
+
+    def close(self) -> None:
+        self.close_project()
+        if self.server:
+            self.server.close()
+            self.server = None
+            with contextlib.suppress(OSError):
+                os.unlink(self.socket_path)
+
+    def restart(self) -> None:
+        self.close()
+        os.execv(
+            sys.executable,
+            [sys.executable, "-m", "clearskies_doc_builder.daemon", "serve", "--socket", self.socket_path],
+        )
+
+
+def parse_flags(argv: list[str], cwd: str | None = None) -> dict[str, Any]:
+    """
+    Turn the command line flags from a build request into config settings, the same way a build script does.
+
+    Relative paths in the flags are relative to the client's working directory, rather than ours.
+    """
+    from clearskies_doc_builder import apply_command_line_flags
+
+    (original_argv, original_cwd) = (sys.argv, os.getcwd())
+    sys.argv = ["build.py", *argv]
+    try:
+        if cwd:
+            os.chdir(cwd)
+        flags = apply_command_line_flags({})
+        unknown = sys.argv[1:]
+    finally:
+        sys.argv = original_argv
+        os.chdir(original_cwd)
+    if unknown:
+        raise ValueError(f"The build daemon doesn't understand these arguments: {' '.join(unknown)}")
+    return flags
+
+
+def _receive_line(connection: socket.socket) -> str:
+    chunks = []
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks).decode("utf-8")
+
+
+def send_request(request: dict[str, Any], socket_path: str | None = None) -> dict[str, Any]:
+    """Send one request to the daemon and wait for the response."""
+    socket_path = socket_path or default_socket_path()
+    check_socket_directory(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        response = _receive_line(connection)
+    if not response:
+        raise ConnectionError("The build daemon closed the connection without responding")
+    return json.loads(response)
+
+
+def start_daemon(socket_path: str | None = None, timeout: float = START_TIMEOUT_SECONDS) -> None:
+    """Start a daemon in the background (in its own session, so it outlives us) and wait for it to listen."""
+    socket_path = socket_path or default_socket_path()
+    subprocess.Popen(
+        [sys.executable, "-m", "clearskies_doc_builder.daemon", "serve", "--socket", socket_path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    wait_for_daemon(socket_path, timeout)
+
+
+def wait_for_daemon(socket_path: str, timeout: float = START_TIMEOUT_SECONDS) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            send_request({"command": "status"}, socket_path)
+            return
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"The build daemon didn't start listening on {socket_path}")
+            time.sleep(0.05)
+
+
+def request_build(
+    project_root: str | pathlib.Path, argv: list[str] | None = None, socket_path: str | None = None
+) -> dict[str, Any]:
+    """
+    Ask the daemon to build a project, starting the daemon first if it isn't running.
+
+    If the daemon has to restart to pick up a change, we wait for it to come back and ask again.
+    """
+    socket_path = socket_path or default_socket_path()
+    request = {
+        "command": "build",
+        "project_root": os.path.abspath(project_root),
+        "argv": argv or [],
+        "cwd": os.getcwd(),
+    }
+    try:
+        response = send_request(request, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        start_daemon(socket_path)
+        response = send_request(request, socket_path)
+    if response.get("restarting"):
+        wait_for_daemon(socket_path)
+        restarted = send_request(request, socket_path)
+        response = {**restarted, "output": response.get("output", []) + restarted.get("output", [])}
+    return response
+
+
+def main(argv: list[str]) -> int:
+    """
+    Talk to (or run) the build daemon from the command line.
+
+    ```
+    python -m clearskies_doc_builder.daemon build [project root] [build flags, e.g. --profile]
+    python -m clearskies_doc_builder.daemon serve
+    python -m clearskies_doc_builder.daemon stop
+    ```
+
+    `build` starts the daemon if it isn't running yet, and the project root defaults to the current directory.
+    `--socket path` changes the socket for any of them.
+    """
+    socket_path = None
+    if "--socket" in argv:
+        index = argv.index("--socket")
+        socket_path = argv[index + 1] if index + 1 < len(argv) else None
+        if not socket_path:
+            raise ValueError("--socket needs the path to the socket")
+        argv = argv[:index] + argv[index + 2 :]
+    (command, *arguments) = argv or ["build"]
+
+    if command == "serve":
+        BuildDaemon(socket_path).serve()
+        return 0
+    if command == "stop":
+        with contextlib.suppress(FileNotFoundError, ConnectionRefusedError):
+            send_request({"command": "stop"}, socket_path)
+        return 0
+    if command != "build":
+        print(f"Unknown command '{command}': it should be 'build', 'serve', or 'stop'", file=sys.stderr)
+        return 2
+
+    project_root = "."
+    if arguments and not arguments[0].startswith("--"):
+        (project_root, *arguments) = arguments
+    response = request_build(project_root, arguments, socket_path)
+    for line in response.get("output", []):
+        print(line)
+    if "error" in response:
+        print(response["error"], file=sys.stderr)
+        return 1
+    if response.get("results") is None:
+        return 1
+    print(f"Built the docs in {response['seconds']:.3f}s: {response['results']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,289 @@
+import ast
+import functools
+import inspect
+import json
+import os
+import pathlib
+import subprocess
+from typing import Any, Iterable
+
+from clearskies_doc_builder import build_manifest, static_analysis
+
+GRAPH_FILENAME = ".doc-builder-graph.json"
+GRAPH_VERSION = 1
+
+# the graph for the current build, or None when we aren't tracking dependencies.  Set by `build_session.start()`.
+active: "DependencyGraph | None" = None
+
+
+class DependencyGraph:
+    """
+    Track which source files, classes, and config entries every page was rendered from.
+
+    Each page records its config entry (the branch of the tree that built it) and every class that its content comes
+    from: the documented class and its base classes, along with any `additional_attribute_sources` and the targets
+    of `args_to_additional_attributes_map`.  Each entry records its builder (and the builder's base classes), since
+    changing the builder can change every page in the entry.  For each class we keep its source file, which lets us
+    answer "which pages depend on these files?".  To answer "which pages show this line?" we look up the classes
+    around the line in the current version of the file.
+
+    Source files inside the project are stored relative to the project root, so a graph from one checkout (e.g. a
+    CI cache) still works in another.  On disk the file names and class names are stored once, and referred to by
+    their position everywhere else, which keeps the graph small and quick to load.
+    """
+
+    def __init__(self, root: str | pathlib.Path):
+        self.root = pathlib.Path(os.path.realpath(root))
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.pages: dict[str, dict[str, Any]] = {}
+        # class import path -> (module, qualname, source file)
+        self.classes: dict[str, tuple[str, str, str]] = {}
+        # entries that were completely rebuilt, so pages from earlier builds of them can be dropped when merging
+        self.replaced: set[str] = set()
+        self._relative_paths: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, root: str | pathlib.Path, build_path: str | pathlib.Path) -> "DependencyGraph | None":
+        """Load the graph saved by a previous build, or return None if there isn't one we can use."""
+        graph = cls(root)
+        try:
+            data = json.loads((pathlib.Path(build_path) / GRAPH_FILENAME).read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != GRAPH_VERSION:
+            return None
+
+        try:
+            files = data["files"]
+            class_names = []
+            for module, qualname, file_index in data["classes"]:
+                class_path = f"{module}.{qualname}"
+                class_names.append(class_path)
+                graph.classes[class_path] = (module, qualname, files[file_index])
+            entry_keys = []
+            for key, inputs_hash, builder_classes in data["entries"]:
+                entry_keys.append(key)
+                graph.entries[key] = {"inputs": inputs_hash, "builder": [class_names[i] for i in builder_classes]}
+            for page, entry_index, page_classes in data["pages"]:
+                pages = [class_names[i] for i in page_classes]
+                graph.pages[page] = {"entry": entry_keys[entry_index], "classes": pages}
+        except (KeyError, IndexError, TypeError, ValueError):
+            # a damaged graph is no better than no graph at all
+            return None
+        return graph
+
+    def save(self, build_path: str | pathlib.Path) -> None:
+        # classes that nothing depends on anymore (e.g. after a page was removed) are left out
+        used_classes = {class_path for data in self.pages.values() for class_path in data["classes"]}
+        used_classes.update(class_path for entry in self.entries.values() for class_path in entry["builder"])
+        files: dict[str, int] = {}
+        class_indexes: dict[str, int] = {}
+        classes = []
+        for class_path in sorted(used_classes):
+            (module, qualname, source_file) = self.classes[class_path]
+            class_indexes[class_path] = len(classes)
+            classes.append([module, qualname, files.setdefault(source_file, len(files))])
+        entry_indexes = {key: index for (index, key) in enumerate(sorted(self.entries))}
+        data = {
+            "version": GRAPH_VERSION,
+            "files": list(files),
+            "classes": classes,
+            "entries": [
+                [key, entry["inputs"], [class_indexes[class_path] for class_path in entry["builder"]]]
+                for (key, entry) in sorted(self.entries.items())
+            ],
+            "pages": [
+                [page, entry_indexes[data["entry"]], [class_indexes[class_path] for class_path in data["classes"]]]
+                for (page, data) in sorted(self.pages.items())
+            ],
+        }
+        graph_path = pathlib.Path(build_path) / GRAPH_FILENAME
+        graph_path.parent.mkdir(parents=True, exist_ok=True)
+        graph_path.write_text(json.dumps(data, separators=(",", ":")))
+
+    def record_branch(
+        self, branch: dict[str, Any], nav_order: int, page_classes: dict[str, str], classes, partial: bool = False
+    ) -> None:
+        """
+        Record the pages that a branch just wrote, along with the class that each one documents.
+
+        A partial build of a branch only replaces the pages it wrote, and otherwise everything from the previous
+        build of the branch is replaced.
+        """
+        key = build_manifest.branch_key(branch)
+        if not partial:
+            if key in self.entries:
+                self.remove_entries([key])
+            self.replaced.add(key)
+        self.entries[key] = {
+            "inputs": build_manifest.branch_inputs_hash(branch, nav_order),
+            "builder": self.class_dependencies([branch["builder"]], classes),
+        }
+
+        extra_sources = list(branch.get("additional_attribute_sources", []))
+        for target in branch.get("args_to_additional_attributes_map", {}).values():
+            extra_sources.append(target.rsplit(".", 1)[0])
+        extra_dependencies = self.class_dependencies(extra_sources, classes)
+        for page, class_path in page_classes.items():
+            page_dependencies = self.class_dependencies([class_path], classes)
+            self.pages[page] = {
+                "entry": key,
+                "classes": page_dependencies + [name for name in extra_dependencies if name not in page_dependencies],
+            }
+
+    def class_dependencies(self, class_paths: Iterable[str], classes) -> list[str]:
+        """Return the given classes along with all of their base classes, and remember where each one lives."""
+        dependencies: list[str] = []
+        for class_path in class_paths:
+            if not class_path:
+                continue
+            for Class in inspect.getmro(_find_class(class_path, classes)):
+                name = f"{Class.__module__}.{Class.__qualname__}"
+                if name in dependencies:
+                    continue
+                if name not in self.classes:
+                    try:
+                        source_file = static_analysis.getfile(Class)
+                    except TypeError:
+                        # built-ins don't have a source file, so nothing can change them
+                        continue
+                    self.classes[name] = (Class.__module__, Class.__qualname__, self.relative_path(source_file))
+                dependencies.append(name)
+        return dependencies
+
+    def relative_path(self, path: str | os.PathLike) -> str:
+        """Normalize a path: relative to the project root when it's inside it, and absolute otherwise."""
+        path = str(path)
+        if path not in self._relative_paths:
+            absolute_path = pathlib.Path(os.path.realpath(path))
+            try:
+                self._relative_paths[path] = str(absolute_path.relative_to(self.root))
+            except ValueError:
+                self._relative_paths[path] = str(absolute_path)
+        return self._relative_paths[path]
+
+    def take(self) -> dict[str, Any]:
+        """Return everything recorded so far and start over, so nothing gets reported twice."""
+        data = {"entries": self.entries, "pages": self.pages, "classes": self.classes, "replaced": self.replaced}
+        self.entries = {}
+        self.pages = {}
+        self.classes = {}
+        self.replaced = set()
+        return data
+
+    def merge(self, data: dict[str, Any]) -> None:
+        self.remove_entries(data["replaced"])
+        self.replaced.update(data["replaced"])
+        self.entries.update(data["entries"])
+        self.pages.update(data["pages"])
+        self.classes.update(data["classes"])
+
+    def carry_forward(self, previous: "DependencyGraph", keys: Iterable[str]) -> None:
+        """Copy entries (and their pages) from a previous graph, for branches that didn't have to be rebuilt."""
+        keys = {key for key in keys if key in previous.entries}
+        for key in keys:
+            self.entries[key] = previous.entries[key]
+        for page, data in previous.pages.items():
+            if data["entry"] in keys:
+                self.pages[page] = data
+        for class_path, location in previous.classes.items():
+            self.classes.setdefault(class_path, location)
+
+    def remove_entries(self, keys: Iterable[str]) -> list[str]:
+        """Forget the given entries, and return the pages that they built."""
+        keys = set(keys)
+        removed_pages = sorted(page for (page, data) in self.pages.items() if data["entry"] in keys)
+        for page in removed_pages:
+            del self.pages[page]
+        for key in keys:
+            self.entries.pop(key, None)
+        return removed_pages
+
+    def classes_in(self, source_files: Iterable[str], line: int | None = None) -> set[str]:
+        """Return the classes defined in the given files (and, if a line is given, that span that line)."""
+        source_files = {self.relative_path(source_file): source_file for source_file in source_files}
+        found = set()
+        for class_path, (module, qualname, source_file) in self.classes.items():
+            if source_file not in source_files:
+                continue
+            if line is not None:
+                (first_line, last_line) = class_lines(source_files[source_file]).get(qualname, (0, 0))
+                if not first_line <= line <= last_line:
+                    continue
+            found.add(class_path)
+        return found
+
+    def affected_pages(self, source_files: Iterable[str]) -> dict[str, set[str]]:
+        """
+        Return the pages (grouped by entry) that depend on any of the given source files.
+
+        When an entry's builder changes, all of its pages are included.
+        """
+        changed_classes = self.classes_in(source_files)
+        changed_entries = {
+            key for (key, entry) in self.entries.items() if changed_classes.intersection(entry["builder"])
+        }
+        affected: dict[str, set[str]] = {}
+        for page, data in self.pages.items():
+            if data["entry"] in changed_entries or changed_classes.intersection(data["classes"]):
+                affected.setdefault(data["entry"], set()).add(page)
+        return affected
+
+    def pages_showing(self, source_file: str, line: int | None = None) -> list[str]:
+        """Return the pages that show the given line of a source file (or anything from the file, without a line)."""
+        shown_classes = self.classes_in([source_file], line)
+        return sorted(page for (page, data) in self.pages.items() if shown_classes.intersection(data["classes"]))
+
+
+def _find_class(class_path: str, classes) -> type:
+    from clearskies_doc_builder.backends.class_backend import ClassBackend
+
+    # the builder just looked the class up, so it's normally in the resolution cache.  Going through the model's
+    # query machinery for every page adds up, so we check the cache ourselves first.
+    record = ClassBackend.resolution_cache.get(class_path)
+    return record["type"] if record else classes.find(f"import_path={class_path}").type
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_class_lines(source_file: str, mtime_ns: int) -> dict[str, tuple[int, int]]:
+    lines: dict[str, tuple[int, int]] = {}
+    try:
+        with open(source_file, "r") as fp:
+            tree = ast.parse(fp.read(), filename=source_file)
+    except (OSError, SyntaxError, ValueError):
+        return lines
+    _find_class_lines(tree.body, "", lines)
+    return lines
+
+
+def class_lines(source_file: str) -> dict[str, tuple[int, int]]:
+    """Find the first and last line of every class in a source file, by qualified name."""
+    try:
+        return _parse_class_lines(source_file, os.stat(source_file).st_mtime_ns)
+    except OSError:
+        return {}
+
+
+def _find_class_lines(statements: list[ast.stmt], prefix: str, lines: dict[str, tuple[int, int]]) -> None:
+    for statement in statements:
+        if not isinstance(statement, ast.ClassDef):
+            continue
+        qualname = f"{prefix}{statement.name}"
+        first_line = min([statement.lineno, *[decorator.lineno for decorator in statement.decorator_list]])
+        lines[qualname] = (first_line, statement.end_lineno or statement.lineno)
+        _find_class_lines(statement.body, f"{qualname}.", lines)
+
+
+def changed_files_since(ref: str, path: str | pathlib.Path) -> list[str]:
+    """List the files that changed since the given git ref (including uncommitted changes), as absolute paths."""
+    try:
+        top_level = _git(["rev-parse", "--show-toplevel"], path).strip()
+        changed = _git(["diff", "--name-only", ref, "--"], path).splitlines()
+    except (OSError, subprocess.CalledProcessError) as error:
+        details = getattr(error, "stderr", "") or str(error)
+        raise ValueError(f"I couldn't find the files that changed since '{ref}': {details.strip()}")
+    return [os.path.join(top_level, changed_file) for changed_file in changed if changed_file]
+
+
+def _git(args: list[str], path: str | pathlib.Path) -> str:
+    return subprocess.run(["git", *args], cwd=str(path), capture_output=True, text=True, check=True).stdout
@@ -0,0 +1,189 @@
+import abc
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import pathlib
+import subprocess
+import sys
+from types import ModuleType
+from typing import Any
+
+REPORT_FILENAME = ".doc-builder-stubs.json"
+
+MEASURE_IMPORT = (
+    "import importlib, sys, time\n"
+    + "start = time.perf_counter()\n"
+    + "importlib.import_module(sys.argv[1])\n"
+    + "print(time.perf_counter() - start)\n"
+)
+
+
+class StubMeta(abc.ABCMeta):
+    """
+    The metaclass for stubbed classes.
+
+    Any attribute of a stubbed class is another stubbed class, so e.g. `boto3.session.Session.client` works.  This is
+    based on `ABCMeta` so that documented classes can mix stubbed base classes with abstract ones.
+    """
+
+    def __getattr__(cls, name: str) -> Any:
+        if name.startswith("__") or "_stub_name" not in cls.__dict__:
+            raise AttributeError(name)
+        stub = make_stub_class(f"{cls._stub_name}.{name}", cls.__module__)
+        setattr(cls, name, stub)
+        return stub
+
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        # stubbed decorators have to give back what they decorate, or we'll lose the docs for it.
+        is_stub = "_stub_name" in cls.__dict__
+        if is_stub and len(args) == 1 and not kwargs and callable(args[0]):
+            return args[0]
+        return super().__call__(*args, **kwargs)
+
+    def __getitem__(cls, item: Any) -> Any:
+        return cls
+
+    def __or__(cls, other: Any) -> Any:
+        return cls
+
+    def __ror__(cls, other: Any) -> Any:
+        return cls
+
+
+class Stub(metaclass=StubMeta):
+    # An instance of a stubbed class: it accepts anything and does nothing.
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        pass
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if len(args) == 1 and not kwargs and callable(args[0]):
+            return args[0]
+        return Stub()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub()
+
+    def __getitem__(self, key: Any) -> Any:
+        return Stub()
+
+    def __iter__(self):
+        return iter(())
+
+
+def make_stub_class(stub_name: str, module_name: str) -> type:
+    name = stub_name.rpartition(".")[2]
+    return StubMeta(name, (Stub,), {"_stub_name": stub_name, "__module__": module_name, "__qualname__": name})
+
+
+class StubModule(ModuleType):
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        stub = make_stub_class(f"{self.__name__}.{name}", self.__name__)
+        setattr(self, name, stub)
+        return stub
+
+
+class ImportStubs(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """
+    Replace heavy third-party packages with stubs while documenting code that imports them.
+
+    Documenting a class means importing its module, which in turn imports everything that it depends on, even though
+    all we need are docstrings and signatures.  For the packages listed in `stub_imports` in the config, this import
+    hook hands out stub modules instead.  Every attribute of a stub module is a stub class, which can be subclassed,
+    called, used as a decorator, used in type hints, etc...
+
+    Packages that were imported before the stubs were installed are left alone.
+
+    With `measure_imports`, the report also says how long the real imports of the stubbed packages take.  Measuring
+    that means really importing them (in another process), so it's off by default.
+    """
+
+    def __init__(self, packages: list[str], measure_imports: bool = False):
+        self.packages = list(packages)
+        self.measure_imports = measure_imports
+        self.stubbed: set[str] = set()
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        for name in [name for (name, module) in sys.modules.items() if isinstance(module, StubModule)]:
+            del sys.modules[name]
+
+    def find_spec(self, fullname: str, path: Any = None, target: Any = None) -> importlib.machinery.ModuleSpec | None:
+        if fullname.split(".")[0] not in self.packages:
+            return None
+        return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+
+    def create_module(self, spec: importlib.machinery.ModuleSpec) -> ModuleType:
+        return StubModule(spec.name)
+
+    def exec_module(self, module: ModuleType) -> None:
+        module.__path__ = []
+        self.stubbed.add(module.__name__)
+
+    def write_report(self, build_path: str | os.PathLike) -> dict[str, Any]:
+        """
+        Record which imports were stubbed, and (with `measure_imports`) how long the real imports would have taken.
+
+        The real import times are measured in a separate process (since importing the packages here would defeat the
+        point) and are kept in the report, so each package is only measured again when it changes.
+        """
+        report_path = pathlib.Path(build_path) / REPORT_FILENAME
+        report: dict[str, Any] = {"stubbed_modules": sorted(self.stubbed)}
+        if not self.measure_imports:
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            report_path.write_text(json.dumps(report, indent=2, sort_keys=True))
+            return report
+
+        previous_packages = {}
+        if report_path.exists():
+            try:
+                previous_packages = json.loads(report_path.read_text()).get("packages", {})
+            except ValueError:
+                pass
+
+        packages: dict[str, dict[str, Any]] = {}
+        for package in sorted({name.split(".")[0] for name in self.stubbed}):
+            fingerprint = self.fingerprint(package)
+            previous = previous_packages.get(package, {})
+            if previous.get("fingerprint") == fingerprint:
+                packages[package] = previous
+                continue
+            packages[package] = {
+                "fingerprint": fingerprint,
+                "import_seconds": self.measure_import(package) if fingerprint else None,
+            }
+
+        report["packages"] = packages
+        report["saved_seconds"] = sum(package["import_seconds"] or 0 for package in packages.values())
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2, sort_keys=True))
+        return report
+
+    def fingerprint(self, package: str) -> str:
+        """Identify the installed version of a package, or return an empty string if it isn't installed."""
+        spec = importlib.machinery.PathFinder.find_spec(package)
+        if spec is None or not spec.origin or not os.path.exists(spec.origin):
+            return ""
+        stat = os.stat(spec.origin)
+        return f"{spec.origin}:{stat.st_mtime_ns}:{stat.st_size}:{sys.version}"
+
+    def measure_import(self, package: str) -> float | None:
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_IMPORT, package],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)},
+        )
+        if result.returncode:
+            return None
+        return float(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,217 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+from typing import Any
+
+from clearskies_doc_builder import build_profile, static_analysis
+
+DEFAULT_CACHE_FILENAME = ".doc-builder-cache.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parsed_files (
+    content_hash TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS attribute_docs (
+    content_hash TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    name TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    PRIMARY KEY (content_hash, qualname, name)
+);
+CREATE TABLE IF NOT EXISTS arguments (
+    class_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    all_args TEXT NOT NULL,
+    args TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    defaults TEXT NOT NULL,
+    PRIMARY KEY (class_key, name)
+);
+"""
+
+
+class IntrospectionCache:
+    """
+    A persistent (sqlite) cache of the expensive parts of introspection, reused across builds.
+
+    Two things are cached:
+
+     1. The attribute docblocks parsed out of each source file, keyed by the content hash of the file.
+     2. The argument lists (from `inspect.getfullargspec`) of every attribute of a class, keyed by a hash of the
+        contents of every source file in the class's MRO, since inherited attributes depend on all of them.
+
+    Everything else on our records (class/attribute docstrings, names, etc...) comes straight from the imported
+    objects and is cheap to read, so it isn't worth caching.  Arguments are cached as lists of names, and argument
+    defaults are stored as reprs, since the actual default values can't be serialized.  Records served from the
+    cache recover the real default values from the function itself.
+
+    Nothing is loaded up front: we query for one source file or one class at a time and keep the results in memory
+    for the rest of the build.  File content hashes are only recalculated when the size or modification time of a
+    file changes.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = str(path)
+        self.hits = 0
+        self.misses = 0
+        self._connection: sqlite3.Connection | None = None
+        self._file_hashes: dict[str, str] = {}
+        self._class_keys: dict[type, str] = {}
+        self._class_arguments: dict[str, dict[str, tuple[list[str], list[str], list[str]]]] = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # connect lazily: the cache gets handed to worker processes, and connections can't cross process boundaries
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # parallel workers share the cache, so every write commits right away (autocommit, with an explicit
+            # transaction where a write takes more than one statement) rather than holding the write lock for the
+            # rest of the branch.  The cache can always be rebuilt, so it doesn't need to sync on every commit.
+            self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["path"])
+
+    def file_hash(self, path: str) -> str:
+        if path in self._file_hashes:
+            return self._file_hashes[path]
+
+        stat = os.stat(path)
+        row = self.connection.execute("SELECT mtime_ns, size, content_hash FROM files WHERE path=?", (path,)).fetchone()
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            content_hash = row[2]
+        else:
+            with open(path, "rb") as fp:
+                content_hash = hashlib.file_digest(fp, "sha256").hexdigest()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, content_hash),
+            )
+        self._file_hashes[path] = content_hash
+        return content_hash
+
+    def attribute_docs(self, source_file: str, qualname: str) -> dict[str, str] | None:
+        """Return the attribute docs of a class, or None if we've never parsed this version of the file."""
+        content_hash = self.file_hash(source_file)
+        parsed = self.connection.execute("SELECT 1 FROM parsed_files WHERE content_hash=?", (content_hash,)).fetchone()
+        if not parsed:
+            self.misses += 1
+            build_profile.count("introspection_cache_misses")
+            return None
+
+        self.hits += 1
+        build_profile.count("introspection_cache_hits")
+        rows = self.connection.execute(
+            "SELECT name, doc FROM attribute_docs WHERE content_hash=? AND qualname=?", (content_hash, qualname)
+        )
+        return {name: doc for (name, doc) in rows}
+
+    def store_attribute_docs(self, source_file: str, class_docs: dict[str, dict[str, str]]) -> None:
+        content_hash = self.file_hash(source_file)
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO attribute_docs (content_hash, qualname, name, doc) VALUES (?, ?, ?, ?)",
+                [
+                    (content_hash, qualname, name, doc)
+                    for (qualname, docs) in class_docs.items()
+                    for (name, doc) in docs.items()
+                ],
+            )
+            self.connection.execute("INSERT OR REPLACE INTO parsed_files (content_hash) VALUES (?)", (content_hash,))
+
+    def arguments(self, parent_class: type, name: str) -> tuple[list[str], list[str], list[str]] | None:
+        """Return (all_args, args, kwargs) for an attribute of a class, or None if it isn't cached."""
+        class_key = self.class_key(parent_class)
+        if not class_key:
+            return None
+
+        if class_key not in self._class_arguments:
+            rows = self.connection.execute(
+                "SELECT name, all_args, args, kwargs FROM arguments WHERE class_key=?", (class_key,)
+            )
+            self._class_arguments[class_key] = {
+                row[0]: (json.loads(row[1]), json.loads(row[2]), json.loads(row[3])) for row in rows
+            }
+
+        arguments = self._class_arguments[class_key].get(name)
+        if arguments is None:
+            self.misses += 1
+            build_profile.count("introspection_cache_misses")
+        else:
+            self.hits += 1
+            build_profile.count("introspection_cache_hits")
+        return arguments
+
+    def store_arguments(
+        self,
+        parent_class: type,
+        name: str,
+        all_args: list[str],
+        args: list[str],
+        kwargs: list[str],
+        defaults: dict[str, Any],
+    ) -> None:
+        class_key = self.class_key(parent_class)
+        if not class_key:
+            return
+
+        self._class_arguments.setdefault(class_key, {})[name] = (all_args, args, kwargs)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO arguments (class_key, name, all_args, args, kwargs, defaults) "
+            + "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                class_key,
+                name,
+                json.dumps(all_args),
+                json.dumps(args),
+                json.dumps(kwargs),
+                json.dumps({key: repr(value) for (key, value) in defaults.items()}),
+            ),
+        )
+
+    def class_key(self, parent_class: type) -> str:
+        """
+        Hash a class along with the contents of every source file in its MRO.
+
+        Returns an empty string if the class can't be cached (e.g. it was defined somewhere without a source file).
+        """
+        if parent_class in self._class_keys:
+            return self._class_keys[parent_class]
+
+        parts = [f"{parent_class.__module__}.{parent_class.__qualname__}"]
+        for Class in inspect.getmro(parent_class):
+            try:
+                source_file = static_analysis.getfile(Class)
+            except TypeError:
+                # built-ins don't have a source file but they also don't change
+                continue
+            try:
+                parts.append(self.file_hash(source_file))
+            except OSError:
+                parts = []
+                break
+
+        class_key = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest() if parts else ""
+        self._class_keys[parent_class] = class_key
+        return class_key
+
+    def flush(self) -> None:
+        # writes are committed as they happen, so this only matters if someone left a transaction open
+        if self._connection is not None and self._connection.in_transaction:
+            self._connection.commit()
@@ -0,0 +1,28 @@
+import importlib
+import sys
+from typing import Any, Callable
+
+
+def lazy_exports(module_name: str, exports: dict[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    Build the module-level `__getattr__` and `__dir__` functions (PEP 562) for a package with lazy exports.
+
+    `exports` maps each exported name to where it lives: either a module (`"package.module"`) or an attribute of a
+    module (`"package.module:name"`).  Nothing is imported until the name is first used, and then the value is stored
+    on the package so that later lookups don't come back through `__getattr__`.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        (import_path, _, attribute_name) = exports[name].partition(":")
+        value = importlib.import_module(import_path)
+        if attribute_name:
+            value = getattr(value, attribute_name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*vars(sys.modules[module_name]), *exports})
+
+    return (__getattr__, __dir__)
@@ -15,12 +15,10 @@ class Class(clearskies.Model):
     source_file = clearskies.columns.String()
     import_path = clearskies.columns.String()
     name = clearskies.columns.String(is_searchable=False)
+    qualname = clearskies.columns.String(is_searchable=False)
     doc = clearskies.columns.String(is_searchable=False)
     module = columns.Module()
     base_classes = columns.BaseClasses()
     attributes = columns.Attributes(AttributeReference)
     methods = columns.Attributes(AttributeReference, filter=lambda attribute: callable(attribute.attribute))
-    init = columns.Attribute(
-        MethodReference,
-        filter=lambda attribute: attribute.name == "__init__",
-    )
+    init = columns.Attribute(MethodReference, attribute_name="__init__")
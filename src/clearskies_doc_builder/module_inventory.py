@@ -0,0 +1,83 @@
+import importlib.util
+import pkgutil
+import sys
+from typing import Any
+
+
+class ModuleInventory:
+    """
+    An index of the modules available to the build, by import path and source file.
+
+    The inventory is built (once) by walking the configured root packages on disk.  Nothing gets imported to do this:
+    we only ask the import system where each module lives, so searching over a large package doesn't mean importing
+    all of it.  Modules are imported when someone actually needs the module itself.
+
+    Without any root packages we fall back on the modules that have already been imported.
+    """
+
+    def __init__(self, root_packages: list[str] = []):
+        self.root_packages = list(root_packages)
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self._by_source_file: dict[str, list[dict[str, Any]]] = {}
+
+    def entries(self) -> list[dict[str, Any]]:
+        return list(self.index().values())
+
+    def find(self, import_path: str) -> dict[str, Any] | None:
+        return self.index().get(import_path)
+
+    def find_by_source_file(self, source_file: str) -> list[dict[str, Any]]:
+        if not self.root_packages:
+            return [entry for entry in self.entries() if entry["source_file"] == source_file]
+        self.index()
+        return self._by_source_file.get(source_file, [])
+
+    def index(self) -> dict[str, dict[str, Any]]:
+        if not self.root_packages:
+            # the list of imported modules changes as we go, so this one can't be kept.
+            return {
+                name: self.entry_from_module(name, module) for (name, module) in list(sys.modules.items()) if module
+            }
+
+        if self._entries is None:
+            self._entries = {}
+            for root_package in self.root_packages:
+                self.walk(root_package)
+            self._by_source_file = {}
+            for entry in self._entries.values():
+                self._by_source_file.setdefault(entry["source_file"], []).append(entry)
+        return self._entries
+
+    def walk(self, root_package: str) -> None:
+        spec = importlib.util.find_spec(root_package)
+        if spec is None:
+            raise ValueError(f"I was asked to document the package '{root_package}' but I couldn't find it")
+        self.add(root_package, spec.origin)
+        if spec.submodule_search_locations is not None:
+            self.walk_path(list(spec.submodule_search_locations), root_package + ".")
+
+    def walk_path(self, path: list[str], prefix: str) -> None:
+        for module_info in pkgutil.iter_modules(path, prefix):
+            spec = module_info.module_finder.find_spec(module_info.name)  # type: ignore
+            if spec is None:
+                continue
+            self.add(module_info.name, spec.origin)
+            if module_info.ispkg and spec.submodule_search_locations is not None:
+                self.walk_path(list(spec.submodule_search_locations), module_info.name + ".")
+
+    def add(self, import_path: str, origin: str | None) -> None:
+        is_builtin = origin in ["built-in", "frozen"]
+        self._entries[import_path] = {  # type: ignore
+            "import_path": import_path,
+            "name": import_path,
+            "is_builtin": is_builtin,
+            "source_file": origin if origin and not is_builtin else "",
+        }
+
+    def entry_from_module(self, import_path: str, module: Any) -> dict[str, Any]:
+        return {
+            "import_path": import_path,
+            "name": import_path,
+            "is_builtin": not hasattr(module, "__file__"),
+            "source_file": (module.__file__ or "") if hasattr(module, "__file__") else "",
+        }
@@ -1,8 +1,16 @@
+import json
+import os
 import pathlib
 import shutil
 
+SYNC_MANIFEST_FILENAME = ".doc-builder-sync.json"
+SYNC_LINK_MODES = ["copy", "hardlink", "reflink"]
 
-def prepare_doc_space(project_root):
+# from linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+
+def prepare_doc_space(project_root, clean=True, sync=False):
     project_path = pathlib.Path(project_root)
     build_path = project_path / "build"
     doc_path = build_path / "docs"
@@ -11,7 +19,12 @@ def prepare_doc_space(project_root):
     sass_path = jekyll_path / "_sass"
     assets_path = jekyll_path / "assets"
 
-    if doc_path.is_dir():
+    if sync:
+        sync_doc_space(jekyll_path, build_path, link_mode=sync if isinstance(sync, str) else "copy")
+        return str(doc_path)
+
+    # incremental builds keep the pages from the previous build around so that unchanged branches can be skipped
+    if clean and doc_path.is_dir():
         shutil.rmtree(doc_path)
     build_path.mkdir(parents=True, exist_ok=True)
 
@@ -20,14 +33,120 @@ def prepare_doc_space(project_root):
             continue
         shutil.copy2(str(file), str(build_path / file.name))
 
-    shutil.copytree(str(jekyll_path / "docs"), str(build_path / "docs"))
+    shutil.copytree(str(jekyll_path / "docs"), str(build_path / "docs"), dirs_exist_ok=True)
     if includes_path.is_dir():
-        shutil.copytree(str(includes_path), str(build_path / "_includes"))
+        shutil.copytree(str(includes_path), str(build_path / "_includes"), dirs_exist_ok=True)
 
     if sass_path.is_dir():
-        shutil.copytree(str(sass_path), str(build_path / "_sass"))
+        shutil.copytree(str(sass_path), str(build_path / "_sass"), dirs_exist_ok=True)
 
     if assets_path.is_dir():
-        shutil.copytree(str(assets_path), str(build_path / "assets"))
+        shutil.copytree(str(assets_path), str(build_path / "assets"), dirs_exist_ok=True)
 
     return str(doc_path)
+
+
+def sync_doc_space(jekyll_path: pathlib.Path, build_path: pathlib.Path, link_mode: str = "copy") -> dict[str, int]:
+    """
+    Bring the build folder in line with the jekyll folder without starting from scratch.
+
+    Files are only copied if their size or modification time differs from the copy in the build folder, and since
+    copies keep the modification time of the original, untouched files keep their modification time from one build
+    to the next.  That way Jekyll (and anything else downstream) can tell what actually changed.
+
+    Files that we copied over in a previous build but that no longer exist in the jekyll folder are deleted.  We keep
+    track of what we copied in a small manifest, because the `docs` folder is shared with the generated pages and
+    we don't want to delete those.
+
+    Assets can be hardlinked or reflinked (on filesystems that support it) instead of copied by setting `link_mode`.
+    If linking isn't possible we quietly fall back to a regular copy.
+    """
+    if link_mode not in SYNC_LINK_MODES:
+        raise ValueError(
+            f"Invalid sync mode '{link_mode}': it must be one of '" + "', '".join(SYNC_LINK_MODES) + "' (or true)"
+        )
+
+    build_path.mkdir(parents=True, exist_ok=True)
+    sync_manifest_path = build_path / SYNC_MANIFEST_FILENAME
+    previous_files: set[str] = set()
+    if sync_manifest_path.is_file():
+        try:
+            previous_files = set(json.loads(sync_manifest_path.read_text()).get("files", []))
+        except ValueError:
+            pass
+
+    source_files: dict[str, tuple[pathlib.Path, str]] = {}
+    for file in jekyll_path.glob("*"):
+        if file.is_file():
+            source_files[file.name] = (file, "copy")
+    for folder_name in ["docs", "_includes", "_sass", "assets"]:
+        folder_link_mode = link_mode if folder_name == "assets" else "copy"
+        folder_path = jekyll_path / folder_name
+        for file in sorted(folder_path.rglob("*")) if folder_path.is_dir() else []:
+            if file.is_file():
+                source_files[str(file.relative_to(jekyll_path))] = (file, folder_link_mode)
+
+    counts = {"copied": 0, "unchanged": 0, "removed": 0}
+    for relative_path, (source_file, file_link_mode) in source_files.items():
+        if _sync_file(source_file, build_path / relative_path, file_link_mode):
+            counts["copied"] += 1
+        else:
+            counts["unchanged"] += 1
+
+    for relative_path in sorted(previous_files - set(source_files)):
+        stale_file = build_path / relative_path
+        if stale_file.is_file():
+            stale_file.unlink()
+            counts["removed"] += 1
+
+    (build_path / "docs").mkdir(exist_ok=True)
+    sync_manifest_path.write_text(json.dumps({"files": sorted(source_files)}))
+    return counts
+
+
+def _sync_file(source: pathlib.Path, destination: pathlib.Path, link_mode: str) -> bool:
+    source_stat = source.stat()
+    try:
+        destination_stat = destination.stat()
+    except FileNotFoundError:
+        destination_stat = None
+
+    if destination_stat:
+        if (destination_stat.st_dev, destination_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+            return False
+        if destination_stat.st_size == source_stat.st_size and destination_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            return False
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # never write through the old destination: it may be a hardlink to an older version of the source.
+    temporary_destination = destination.with_name(f".{destination.name}.sync")
+    temporary_destination.unlink(missing_ok=True)
+    if link_mode == "hardlink":
+        try:
+            os.link(source, temporary_destination)
+            os.replace(temporary_destination, destination)
+            return True
+        except OSError:
+            pass
+    if link_mode == "reflink":
+        try:
+            _reflink(source, temporary_destination)
+            os.replace(temporary_destination, destination)
+            return True
+        except OSError:
+            temporary_destination.unlink(missing_ok=True)
+
+    shutil.copy2(str(source), str(temporary_destination))
+    os.replace(temporary_destination, destination)
+    return True
+
+
+def _reflink(source: pathlib.Path, destination: pathlib.Path) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("Reflinks are not supported on this platform")
+
+    with source.open("rb") as source_file, destination.open("wb") as destination_file:
+        fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    shutil.copystat(str(source), str(destination))
@@ -0,0 +1,375 @@
+import ast
+import builtins
+import copy
+import importlib
+import importlib.machinery
+import inspect
+import sys
+import types
+import typing
+import weakref
+from types import ModuleType
+from typing import Any, Callable
+
+# stand-in classes that extend `Generic[...]` are given this as their (only) type parameter.
+_T = typing.TypeVar("_T")
+# the source files of the classes that we build, since `inspect.getfile` can't find them.
+_source_files: "weakref.WeakKeyDictionary[type, str]" = weakref.WeakKeyDictionary()
+
+
+def getfile(Class: type) -> str:
+    """Return the source file for a class, like `inspect.getfile`, but including classes built by static analysis."""
+    if Class in _source_files:
+        return _source_files[Class]
+    return inspect.getfile(Class)
+
+
+class StaticValue:
+    # A stand-in for a value that we can't calculate without running code, e.g. the result of a function call.
+    # It intentionally has no docstring, since the docstring of an attribute's value is its class's docstring.
+    __doc__ = None
+
+    def __init__(self, source: str):
+        self.source = source
+
+    def __repr__(self) -> str:
+        return self.source
+
+
+class StaticModule(ModuleType):
+    """
+    A module built from its source code without executing it.
+
+    The top level of the module is parsed into a list of bindings (imports, classes, functions, and assignments), and
+    each one is only resolved into a value when it's first accessed.  This keeps us from parsing more of the
+    dependency tree than needed, and also lets modules that import each other resolve their names in any order.
+    """
+
+    def __init__(self, name: str, source_file: str | None, search_locations: list[str] | None, importer):
+        super().__init__(name)
+        self.__file__ = source_file
+        if search_locations is not None:
+            self.__path__ = search_locations
+        self._static_importer = importer
+        self._static_bindings: dict[str, Callable[[], Any]] = {}
+        self._static_star_imports: list[str] = []
+
+        if source_file:
+            with open(source_file, "rb") as fp:
+                tree = ast.parse(fp.read(), filename=source_file)
+            self.__doc__ = ast.get_docstring(tree, clean=False)
+            self._add_bindings(tree.body)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_static_"):
+            raise AttributeError(name)
+
+        if name in self._static_bindings:
+            # remove it first so that a circular reference fails instead of recursing forever
+            value = self._static_bindings.pop(name)()
+            setattr(self, name, value)
+            return value
+
+        for module_name in self._static_star_imports:
+            if name.startswith("_"):
+                break
+            try:
+                module = self._static_importer.import_module(module_name)
+            except ImportError:
+                continue
+            if name in dir(module):
+                value = getattr(module, name)
+                setattr(self, name, value)
+                return value
+
+        # attribute access on a package can also refer to a submodule, e.g. after `import package.submodule`
+        if "__path__" in self.__dict__ and not name.startswith("__"):
+            try:
+                return self._static_importer.import_module(f"{self.__name__}.{name}")
+            except ImportError:
+                pass
+
+        raise AttributeError(f"module '{self.__name__}' has no attribute '{name}'")
+
+    def __dir__(self) -> list[str]:
+        names = {name for name in self.__dict__ if not name.startswith("_static_")}
+        names.update(self._static_bindings)
+        for module_name in self._static_star_imports:
+            try:
+                module = self._static_importer.import_module(module_name)
+            except ImportError:
+                continue
+            names.update(name for name in dir(module) if not name.startswith("_"))
+        return sorted(names)
+
+    def _add_bindings(self, statements: list[ast.stmt]) -> None:
+        for statement in statements:
+            if isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    if alias.asname:
+                        self._bind(alias.asname, self._import, alias.name)
+                    else:
+                        top_level = alias.name.split(".")[0]
+                        self._bind(top_level, self._import, top_level)
+            elif isinstance(statement, ast.ImportFrom):
+                module_name = self._absolute_module_name(statement.module, statement.level)
+                for alias in statement.names:
+                    if alias.name == "*":
+                        self._static_star_imports.append(module_name)
+                        continue
+                    self._bind(alias.asname or alias.name, self._import_from, module_name, alias.name)
+            elif isinstance(statement, ast.ClassDef):
+                self._bind(statement.name, self._static_importer.build_class, statement, self, statement.name)
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._bind(statement.name, self._static_importer.build_function, statement, self, statement.name)
+            elif isinstance(statement, ast.Assign):
+                for target in statement.targets:
+                    if isinstance(target, ast.Name):
+                        self._bind(target.id, self._static_importer.value, statement.value, self)
+            elif isinstance(statement, ast.AnnAssign) and statement.value and isinstance(statement.target, ast.Name):
+                self._bind(statement.target.id, self._static_importer.value, statement.value, self)
+            elif isinstance(statement, ast.If):
+                # we can't know which branch would run, so take the names from all of them
+                self._add_bindings(statement.body)
+                self._add_bindings(statement.orelse)
+            elif isinstance(statement, ast.Try):
+                self._add_bindings(statement.body)
+                for handler in statement.handlers:
+                    self._add_bindings(handler.body)
+                self._add_bindings(statement.orelse)
+                self._add_bindings(statement.finalbody)
+
+    def _bind(self, name: str, resolver: Callable, *args: Any) -> None:
+        self._static_bindings[name] = lambda: resolver(*args)
+
+    def _absolute_module_name(self, module_name: str | None, level: int) -> str:
+        if not level:
+            return module_name or ""
+        package = self.__name__ if "__path__" in self.__dict__ else self.__name__.rpartition(".")[0]
+        for _ in range(level - 1):
+            package = package.rpartition(".")[0]
+        return f"{package}.{module_name}" if module_name else package
+
+    def _import(self, module_name: str) -> Any:
+        try:
+            return self._static_importer.import_module(module_name)
+        except ImportError:
+            return StaticValue(module_name)
+
+    def _import_from(self, module_name: str, name: str) -> Any:
+        try:
+            module = self._static_importer.import_module(module_name)
+        except ImportError:
+            return StaticValue(f"{module_name}.{name}")
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            pass
+        try:
+            return self._static_importer.import_module(f"{module_name}.{name}")
+        except ImportError:
+            return StaticValue(f"{module_name}.{name}")
+
+
+class StaticImporter:
+    """
+    Load modules from their source code (with `ast`) instead of importing them.
+
+    This gets used in place of `importlib` by the backends, so the records for modules, classes, and attributes are
+    built without ever running the code being documented.  Classes are still real classes, so the rest of the
+    introspection (the MRO, `dir()`, `inspect.getfullargspec`, etc...) works as usual:
+
+     1. Base classes are resolved through the imports of each module, across files and packages.
+     2. Methods are replaced with empty functions with the same signature and docstring.  Defaults that are literals
+        keep their values, and everything else becomes a `StaticValue`.
+     3. Class attributes set by calling a class become a (never initialized) instance of that class, so that their
+        docstring is still the docstring of their class.
+
+    Modules that are already imported (e.g. the standard library or clearskies itself, which the doc builder needs)
+    are used as-is, as are the modules in `live_modules` and their submodules.  The builders need to run, so their
+    modules belong in `live_modules`.
+    """
+
+    def __init__(self, live_modules: list[str] = []):
+        self.live_modules = list(live_modules)
+        self.modules: dict[str, ModuleType] = {}
+
+    def import_module(self, name: str) -> ModuleType:
+        if name in self.modules:
+            return self.modules[name]
+        if name in sys.modules or self.is_live(name):
+            return importlib.import_module(name)
+        return self.load(name)
+
+    def is_live(self, name: str) -> bool:
+        return any(name == live or name.startswith(live + ".") for live in self.live_modules)
+
+    def load(self, name: str) -> ModuleType:
+        """Build a module from its source code, whether or not it has already been imported."""
+        (parent_name, _, _) = name.rpartition(".")
+        search_locations = None
+        if parent_name:
+            search_locations = getattr(self.import_module(parent_name), "__path__", None)
+            if search_locations is None:
+                raise ModuleNotFoundError(f"No module named '{name}'; '{parent_name}' is not a package", name=name)
+
+        spec = importlib.machinery.PathFinder.find_spec(name, search_locations)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+        if spec.origin and not spec.origin.endswith(".py"):
+            # compiled extensions don't have any source to read
+            return importlib.import_module(name)
+
+        module = StaticModule(
+            name,
+            spec.origin,
+            list(spec.submodule_search_locations) if spec.submodule_search_locations is not None else None,
+            self,
+        )
+        self.modules[name] = module
+        return module
+
+    def resolve(self, node: ast.expr, module: ModuleType) -> Any:
+        """Resolve a name (or a dotted name) to the object it refers to, or return None if it can't be found."""
+        if isinstance(node, ast.Name):
+            try:
+                return getattr(module, node.id)
+            except AttributeError:
+                return getattr(builtins, node.id, None)
+        if isinstance(node, ast.Attribute):
+            value = self.resolve(node.value, module)
+            return getattr(value, node.attr, None) if value is not None else None
+        if isinstance(node, ast.Subscript):
+            # e.g. `Generic[T]` or `list[str]`: all we care about is the class.
+            return self.resolve(node.value, module)
+        return None
+
+    def value(self, node: ast.expr, module: ModuleType) -> Any:
+        """Calculate a value without running code, as best we can."""
+        try:
+            return ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            pass
+
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            value = self.resolve(node, module)
+            if value is not None:
+                return value
+        if isinstance(node, ast.Call):
+            Class = self.resolve(node.func, module)
+            if inspect.isclass(Class):
+                try:
+                    return object.__new__(Class)
+                except TypeError:
+                    pass
+        return StaticValue(ast.unparse(node))
+
+    def build_class(self, node: ast.ClassDef, module: ModuleType, qualname: str) -> type:
+        bases: list[Any] = []
+        for base_node in node.bases:
+            base = self.resolve(base_node, module)
+            if base is typing.Generic and isinstance(base_node, ast.Subscript):
+                # Generic can only be subclassed with type parameters, but it doesn't matter which (or how many).
+                base = typing.Generic[_T]
+            elif not inspect.isclass(base) or base is typing.Generic:
+                continue
+            if base not in bases:
+                bases.append(base)
+
+        namespace = {
+            "__module__": module.__name__,
+            "__qualname__": qualname,
+            "__doc__": ast.get_docstring(node, clean=False),
+        }
+        annotations = {
+            statement.target.id: StaticValue(ast.unparse(statement.annotation))
+            for statement in node.body
+            if isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name)
+        }
+        if annotations:
+            namespace["__annotations__"] = annotations
+        try:
+            Class = types.new_class(node.name, tuple(bases), exec_body=lambda body: body.update(namespace))
+        except Exception:
+            # e.g. a metaclass conflict or a base class that doesn't want to be subclassed.
+            Class = type(node.name, (object,), namespace)
+        if module.__file__:
+            _source_files[Class] = module.__file__
+
+        # class attributes are added after the fact so that live base classes (and their metaclasses)
+        # don't get a chance to run code on our stand-in values.
+        for name, value in self.class_members(node, module, qualname).items():
+            try:
+                setattr(Class, name, value)
+            except (AttributeError, TypeError):
+                pass
+        return Class
+
+    def class_members(self, node: ast.ClassDef, module: ModuleType, qualname: str) -> dict[str, Any]:
+        members: dict[str, Any] = {}
+        for statement in node.body:
+            if isinstance(statement, ast.ClassDef):
+                members[statement.name] = self.build_class(statement, module, f"{qualname}.{statement.name}")
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                decorators = [ast.unparse(decorator) for decorator in statement.decorator_list]
+                if any(decorator.endswith((".setter", ".deleter")) for decorator in decorators):
+                    continue
+                if statement.name == "__init_subclass__":
+                    # an empty stand-in would stop the hooks of any live base classes from running
+                    continue
+                function = self.build_function(statement, module, f"{qualname}.{statement.name}")
+                if "property" in decorators or "functools.cached_property" in decorators:
+                    members[statement.name] = property(function, doc=function.__doc__)
+                elif "staticmethod" in decorators or statement.name == "__new__":
+                    members[statement.name] = staticmethod(function)
+                elif "classmethod" in decorators or statement.name == "__class_getitem__":
+                    members[statement.name] = classmethod(function)
+                else:
+                    members[statement.name] = function
+            elif isinstance(statement, ast.Assign):
+                for target in statement.targets:
+                    if isinstance(target, ast.Name):
+                        members[target.id] = self.value(statement.value, module)
+            elif isinstance(statement, ast.AnnAssign) and statement.value and isinstance(statement.target, ast.Name):
+                members[statement.target.id] = self.value(statement.value, module)
+        return members
+
+    def build_function(
+        self, node: ast.FunctionDef | ast.AsyncFunctionDef, module: ModuleType, qualname: str
+    ) -> Callable:
+        """Build an empty function with the same signature and docstring as the one in the source code."""
+        arguments = copy.deepcopy(node.args)
+        for argument in [
+            *arguments.posonlyargs,
+            *arguments.args,
+            *arguments.kwonlyargs,
+            arguments.vararg,
+            arguments.kwarg,
+        ]:
+            if argument:
+                argument.annotation = None
+        defaults = [self.value(default, module) for default in arguments.defaults]
+        kwonly_defaults = {
+            argument.arg: self.value(default, module)
+            for (argument, default) in zip(arguments.kwonlyargs, arguments.kw_defaults)
+            if default is not None
+        }
+        arguments.defaults = [ast.Constant(None) for _ in arguments.defaults]
+        arguments.kw_defaults = [None if default is None else ast.Constant(None) for default in arguments.kw_defaults]
+
+        stub = copy.copy(node)
+        stub.args = arguments
+        stub.body = [ast.Pass()]
+        stub.decorator_list = []
+        stub.returns = None
+        namespace: dict[str, Any] = {"__name__": module.__name__}
+        stub_module = ast.fix_missing_locations(ast.Module(body=[stub], type_ignores=[]))
+        exec(compile(stub_module, "<static>", "exec"), namespace)
+
+        function = namespace[node.name]
+        function.__defaults__ = tuple(defaults) or None
+        function.__kwdefaults__ = kwonly_defaults or None
+        function.__qualname__ = qualname
+        function.__module__ = module.__name__
+        function.__doc__ = ast.get_docstring(node, clean=False)
+        return function
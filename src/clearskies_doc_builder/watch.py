@@ -0,0 +1,373 @@
+import ctypes
+import importlib
+import json
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+import traceback
+from types import ModuleType
+from typing import Any, Callable, Iterable
+
+from clearskies_doc_builder import build_manifest
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.builders.builder import Builder
+
+# how long to wait for more events after a file changes.  Editors often save in a few steps (write a temporary file,
+# rename it, update the permissions) and we want to rebuild once for all of them.
+DEBOUNCE_SECONDS = 0.05
+POLL_INTERVAL_SECONDS = 0.25
+
+# from sys/inotify.h
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Watch files by checking their modification time and size every so often."""
+
+    def __init__(self, interval: float = POLL_INTERVAL_SECONDS):
+        self.interval = interval
+        self.signatures: dict[str, tuple[int, int] | None] = {}
+
+    def watch(self, paths: Iterable[str]) -> None:
+        """Replace the set of watched files."""
+        previous = self.signatures
+        self.signatures = {path: previous[path] if path in previous else self._signature(path) for path in paths}
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Wait for (at least) one watched file to change and return the files that changed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self._check()
+            if changed:
+                time.sleep(DEBOUNCE_SECONDS)
+                return changed | self._check()
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0)))
+
+    def close(self) -> None:
+        pass
+
+    def changed(self) -> set[str]:
+        """Return the watched files that changed since we last looked, without waiting."""
+        return self._check()
+
+    def _check(self) -> set[str]:
+        changed = set()
+        for path, signature in self.signatures.items():
+            current = self._signature(path)
+            if current != signature:
+                self.signatures[path] = current
+                changed.add(path)
+        return changed
+
+    def _signature(self, path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+class InotifyWatcher:
+    """
+    Watch files with inotify.
+
+    We watch the folders that hold the files rather than the files themselves: plenty of editors save by writing a new
+    file and renaming it over the old one, which would silently end a watch on the file.
+    """
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths: set[str] = set()
+        self.directories: dict[str, int] = {}
+        self.watch_descriptors: dict[int, str] = {}
+
+    def watch(self, paths: Iterable[str]) -> None:
+        """Replace the set of watched files."""
+        self.paths = set(paths)
+        directories = {os.path.dirname(path) for path in self.paths}
+        for directory in set(self.directories) - directories:
+            self.libc.inotify_rm_watch(self.fd, self.directories.pop(directory))
+        for directory in directories - set(self.directories):
+            watch_descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if watch_descriptor < 0:
+                # the folder doesn't exist (anymore).  Nothing in it can be used by the build either.
+                continue
+            self.directories[directory] = watch_descriptor
+            self.watch_descriptors[watch_descriptor] = directory
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Wait for (at least) one watched file to change and return the files that changed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: set[str] = set()
+        while not changed:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not select.select([self.fd], [], [], remaining)[0]:
+                return set()
+            changed = self._read_events()
+        # keep collecting until things settle down
+        while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+            changed |= self._read_events()
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _read_events(self) -> set[str]:
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            (watch_descriptor, mask, cookie, name_length) = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size : offset + EVENT_HEADER.size + name_length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + name_length
+            if mask & IN_Q_OVERFLOW:
+                # the kernel dropped events, so we don't know what changed.  The build will figure it out.
+                return set(self.paths)
+            directory = self.watch_descriptors.get(watch_descriptor)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if path in self.paths:
+                changed.add(path)
+        return changed
+
+
+def make_watcher(polling: bool = False) -> "InotifyWatcher | PollingWatcher":
+    """Return an inotify watcher when we can, and a polling watcher otherwise."""
+    if not polling:
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher()
+
+
+class RestartRequired(Exception):
+    """Raised when a changed module can't be reloaded in place."""
+
+
+class ModuleReloader:
+    """
+    Reload the modules that were imported from a set of changed files.
+
+    Modules that did `from changed_module import Thing` still hold on to the old `Thing`, so they are reloaded too
+    (after the modules they import from).  Anything that was already imported when the reloader was created (the
+    standard library, clearskies, the doc builder itself, etc...) is never reloaded: the build depends on those, and
+    reloading them would leave it with a mix of old and new classes.  A change that would require reloading one of
+    them raises `RestartRequired` instead.
+    """
+
+    def __init__(self):
+        self.protected = set(sys.modules)
+
+    def reload(self, source_files: set[str]) -> list[str]:
+        """Reload everything that depends on the given files, and return the names of the reloaded modules."""
+        source_files = {os.path.realpath(source_file) for source_file in source_files}
+        changed = {name for (name, module) in list(sys.modules.items()) if _module_file(module) in source_files}
+        if not changed:
+            return []
+
+        to_reload = set(changed)
+        found_more = True
+        while found_more:
+            found_more = False
+            for name, module in list(sys.modules.items()):
+                if name not in to_reload and _module_file(module) and self.imports_from(module, to_reload):
+                    to_reload.add(name)
+                    found_more = True
+
+        protected = sorted(to_reload & self.protected)
+        if protected:
+            raise RestartRequired(f"Changes to {', '.join(protected)} can't be reloaded while the builder is running")
+
+        importlib.invalidate_caches()
+        reload_order = self.dependency_order(to_reload)
+        for name in reload_order:
+            importlib.reload(sys.modules[name])
+        return reload_order
+
+    def imports_from(self, module: ModuleType, module_names: set[str]) -> bool:
+        """Check if a module holds on to any of the given modules, or anything defined in them."""
+        for value in list(vars(module).values()):
+            if isinstance(value, ModuleType):
+                # packages hold on to their submodules, but reloading keeps the same module object, so that's fine.
+                # Anything else that imports a whole module might have subclassed something from it.
+                if value.__name__ in module_names and not value.__name__.startswith(f"{module.__name__}."):
+                    return True
+                continue
+            try:
+                if getattr(value, "__module__", None) in module_names:
+                    return True
+            except Exception:
+                continue
+        return False
+
+    def dependency_order(self, module_names: set[str]) -> list[str]:
+        """Sort modules so that every module comes after the modules it imports from."""
+        ordered: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in ordered or name in visiting:
+                return
+            visiting.add(name)
+            module = sys.modules[name]
+            for other_name in sorted(module_names - {name}):
+                if self.imports_from(module, {other_name}):
+                    visit(other_name)
+            ordered.append(name)
+
+        for name in sorted(module_names):
+            visit(name)
+        return ordered
+
+
+def _module_file(module: Any) -> str | None:
+    module_file = getattr(module, "__file__", None)
+    return os.path.realpath(module_file) if isinstance(module_file, str) else None
+
+
+class Watch:
+    """
+    Rebuild the docs whenever the documented source files (or `config.json`) change.
+
+    Watch builds are always incremental: the build manifest records the source files (including base classes and
+    additional attribute sources) that every branch of the tree was built from, so after a change only the branches
+    that depend on the changed files are rebuilt, and only the pages that actually changed are written.  Changed
+    modules are reloaded in place, which keeps everything else (clearskies, caches, etc...) warm between builds.
+    """
+
+    def __init__(
+        self,
+        modules,
+        classes,
+        config_file: str | pathlib.Path,
+        project_root: str | pathlib.Path,
+        watcher: "InotifyWatcher | PollingWatcher | None" = None,
+        apply_flags: Callable[[dict[str, Any]], dict[str, Any]] = lambda config: config,
+        restart_argv: list[str] | None = None,
+        output: Callable[[str], None] = print,
+    ):
+        self.modules = modules
+        self.classes = classes
+        self.config_file = str(config_file)
+        self.project_root = pathlib.Path(project_root)
+        self.watcher = watcher if watcher else make_watcher()
+        self.apply_flags = apply_flags
+        self.restart_argv = restart_argv if restart_argv is not None else list(sys.argv)
+        self.output = output
+        self.reloader = ModuleReloader()
+        self.pending: set[str] = set()
+        self.config = self.load_config()
+
+    def load_config(self) -> dict[str, Any]:
+        with open(self.config_file, "r") as fp:
+            return self.apply_flags(json.load(fp))
+
+    def manifest(self) -> build_manifest.BuildManifest:
+        return build_manifest.BuildManifest(self.project_root / "build")
+
+    def build(self) -> dict[str, int]:
+        config = {**self.config, "incremental": True}
+        results = build_callable(self.modules, self.classes, config, str(self.project_root))
+        self.watcher.watch(self.manifest().source_files() | {self.config_file})
+        return results
+
+    def rebuild(self, changed_files: set[str]) -> dict[str, int] | None:
+        """
+        Rebuild after the given files changed.
+
+        Returns the page counts from the build, or None if the changes couldn't be loaded (e.g. a syntax error half
+        way through an edit), in which case they are tried again along with the next change.
+        """
+        changed_files = set(changed_files) | self.pending
+        self.pending = set()
+        if self.config_file in changed_files:
+            try:
+                self.config = self.load_config()
+            except ValueError as error:
+                self.output(f"Not rebuilding: {self.config_file} isn't valid JSON: {error}")
+                self.pending = changed_files
+                return None
+
+        source_files = changed_files - {self.config_file}
+        if source_files:
+            Builder.attribute_doc_index.invalidate(sorted(source_files))
+            try:
+                reloaded = self.reloader.reload(source_files)
+            except RestartRequired:
+                raise
+            except Exception:
+                self.output("Not rebuilding: a changed module failed to load:\n" + traceback.format_exc())
+                self.pending = changed_files
+                return None
+            # the resolution cache is normally reset by every build, but not when it's shared between builds
+            ClassBackend.forget_modules(set(reloaded))
+        return self.build()
+
+    def describe(self, changed_files: set[str]) -> str:
+        branches = self.manifest().branches_depending_on(changed_files)
+        pages = sum(len(branch_pages) for branch_pages in branches.values())
+        names = ", ".join(sorted(os.path.basename(path) for path in changed_files))
+        if self.config_file in changed_files:
+            return f"{names} changed: rebuilding any changed branches"
+        return f"{names} changed: rebuilding {len(branches)} branch(es) with {pages} page(s)"
+
+    def run(self) -> None:
+        started_at = time.perf_counter()
+        results = self.build()
+        self.output(f"Built the docs in {time.perf_counter() - started_at:.2f}s: {results}")
+        self.output("Watching for changes (press Ctrl+C to stop)")
+        try:
+            while True:
+                changed_files = self.watcher.wait()
+                if not changed_files:
+                    continue
+                self.output(self.describe(changed_files))
+                started_at = time.perf_counter()
+                try:
+                    results = self.rebuild(changed_files)
+                except RestartRequired as restart:
+                    self.output(f"{restart}: restarting")
+                    self.restart()
+                    return
+                except Exception:
+                    # a broken docblock, a class that went missing, etc...  Keep going, so it can be fixed.
+                    self.output("The build failed:\n" + traceback.format_exc())
+                    continue
+                if results is not None:
+                    self.output(f"Rebuilt in {time.perf_counter() - started_at:.2f}s: {results}")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.watcher.close()
+
+    def restart(self) -> None:
+        self.watcher.close()
+        os.execv(sys.executable, [sys.executable, *self.restart_argv])
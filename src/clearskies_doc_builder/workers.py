@@ -0,0 +1,65 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+_worker_models: tuple[Any, Any] | None = None
+
+
+def resolve_worker_count(workers: int | str | None) -> int:
+    """
+    Normalize the `workers` setting from the build config.
+
+    `None`, `0` and `1` all mean "build serially".  The string "auto" uses one worker per available CPU.
+    """
+    if workers is None:
+        return 1
+    if workers == "auto":
+        return os.cpu_count() or 1
+    workers = int(workers)
+    if workers < 0:
+        raise ValueError(f"The number of workers must be a positive number, but I received {workers}")
+    return max(workers, 1)
+
+
+def make_process_pool(workers: int, config: dict[str, Any], project_root: str) -> ProcessPoolExecutor:
+    """
+    Create a process pool for building documentation.
+
+    The workers get a copy of our `sys.path` so that they can import the project being documented, even when
+    the pool uses the "spawn" start method and therefore doesn't inherit our interpreter state.  They also start
+    their own build session from the config, so they use the same caches/settings as the main process.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_initialize_worker,
+        initargs=(list(sys.path), config, str(project_root)),
+    )
+
+
+def worker_models() -> tuple[Any, Any]:
+    """
+    Return the `modules` and `classes` models for use inside of a worker process.
+
+    Models are bound to the dependency injection container that created them, so they can't be shipped to a worker.
+    Instead, each worker builds its own container (once) and pulls the models out of it.
+    """
+    global _worker_models
+    if _worker_models is None:
+        import clearskies
+
+        from clearskies_doc_builder import backends, models
+
+        di = clearskies.di.Di(modules=[models, backends])
+        _worker_models = (di.build_from_name("modules", cache=True), di.build_from_name("classes", cache=True))
+    return _worker_models
+
+
+def _initialize_worker(sys_path: list[str], config: dict[str, Any], project_root: str) -> None:
+    for path in sys_path:
+        if path not in sys.path:
+            sys.path.append(path)
+
+    from clearskies_doc_builder import build_session
+
+    build_session.start(config, project_root)
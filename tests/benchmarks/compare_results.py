@@ -0,0 +1,37 @@
+"""
+Compare two benchmark result files written by the build pipeline benchmark.
+
+    python tests/benchmarks/compare_results.py tests/benchmarks/results/before.json tests/benchmarks/results/after.json
+"""
+
+import json
+import sys
+
+
+def compare(before: dict, after: dict) -> list[str]:
+    lines = []
+    for size in after["sizes"]:
+        if size not in before["sizes"]:
+            continue
+        old = before["sizes"][size]
+        new = after["sizes"][size]
+        lines.append(f"{size} ({new['package']['classes']} classes):")
+        timings = [
+            ("process", old["process_seconds"], new["process_seconds"]),
+            ("build_callable", old["build_callable_seconds"], new["build_callable_seconds"]),
+            *[
+                (phase, old["phase_seconds"].get(phase, 0.0), seconds)
+                for (phase, seconds) in new["phase_seconds"].items()
+            ],
+        ]
+        for name, old_seconds, new_seconds in timings:
+            change = (new_seconds - old_seconds) / old_seconds * 100 if old_seconds else 0.0
+            lines.append(f"  {name:>16}: {old_seconds:8.3f}s -> {new_seconds:8.3f}s  {change:+6.1f}%")
+    return lines
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(f"Usage: {sys.argv[0]} BEFORE.json AFTER.json")
+    with open(sys.argv[1]) as before_file, open(sys.argv[2]) as after_file:
+        print("\n".join(compare(json.load(before_file), json.load(after_file))))
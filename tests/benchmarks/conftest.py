@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    # benchmarks are slow and their numbers only mean something on a quiet machine, so they are opt-in.
+    if os.environ.get("DOC_BUILDER_BENCHMARKS"):
+        return
+
+    skip = pytest.mark.skip(reason="set DOC_BUILDER_BENCHMARKS=1 to run the benchmarks")
+    for item in items:
+        if "benchmarks" in item.path.parts:
+            item.add_marker(skip)
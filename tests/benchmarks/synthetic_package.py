@@ -0,0 +1,140 @@
+import json
+import pathlib
+from typing import Any
+
+WORDS = "the quick brown fox jumps over a lazy dog while documenting every single argument of its class".split()
+
+
+def words(count: int, offset: int = 0) -> str:
+    return " ".join(WORDS[(offset + index) % len(WORDS)] for index in range(count))
+
+
+def docstring(indent: str, summary: str, length: int, offset: int = 0) -> str:
+    """Build a docstring with a one line summary and roughly `length` words spread over several lines."""
+    lines = [summary]
+    if length:
+        lines.append("")
+        for start in range(0, length, 12):
+            lines.append(words(min(12, length - start), offset + start))
+    body = "".join(f"{indent}{line}\n" if line else "\n" for line in lines)
+    return f'{indent}"""\n{body}{indent}"""\n'
+
+
+class SyntheticPackage:
+    """
+    Generate a fake project (source package and doc config) of a given size, for benchmarking the build.
+
+    Every module gets a chain of `inheritance_depth` base classes and `classes_per_module` classes that extend the
+    end of that chain.  Each class takes `init_args` arguments (half required, half optional), and the docs for those
+    arguments are spread over the class and its bases, the same way they are in clearskies itself.  Every module
+    becomes one `Module` branch in the config tree.
+
+    The project follows the usual layout: the package lives in `src/`, and the docs config (plus a tiny jekyll site)
+    in `docs/`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        modules: int = 10,
+        classes_per_module: int = 10,
+        inheritance_depth: int = 2,
+        init_args: int = 6,
+        docstring_length: int = 40,
+    ):
+        self.name = name
+        self.modules = modules
+        self.classes_per_module = classes_per_module
+        self.inheritance_depth = inheritance_depth
+        self.init_args = init_args
+        self.docstring_length = docstring_length
+
+    @property
+    def class_count(self) -> int:
+        return self.modules * self.classes_per_module
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "modules": self.modules,
+            "classes_per_module": self.classes_per_module,
+            "inheritance_depth": self.inheritance_depth,
+            "init_args": self.init_args,
+            "docstring_length": self.docstring_length,
+            "classes": self.class_count,
+        }
+
+    def generate(self, project_root: str | pathlib.Path) -> pathlib.Path:
+        project_path = pathlib.Path(project_root)
+        package_path = project_path / "src" / self.name
+        package_path.mkdir(parents=True, exist_ok=True)
+        (package_path / "__init__.py").write_text(
+            docstring("", f"The synthetic package {self.name}.", self.docstring_length)
+        )
+        for module_index in range(self.modules):
+            (package_path / f"module_{module_index}.py").write_text(self.module_source(module_index))
+
+        python_path = project_path / "docs" / "python"
+        python_path.mkdir(parents=True, exist_ok=True)
+        (python_path / "config.json").write_text(json.dumps(self.config(), indent=2))
+        (python_path / "build.py").write_text(
+            "import clearskies_doc_builder\n\nclearskies_doc_builder.build(__file__)\n"
+        )
+
+        jekyll_path = project_path / "docs" / "jekyll"
+        (jekyll_path / "docs").mkdir(parents=True, exist_ok=True)
+        (jekyll_path / "index.md").write_text(f"# {self.name}\n")
+        return project_path
+
+    def config(self) -> dict[str, Any]:
+        return {
+            "root_packages": [self.name],
+            "tree": [
+                {
+                    "title": f"Module {module_index}",
+                    "source": f"{self.name}.module_{module_index}.Overview",
+                    "builder": "clearskies_doc_builder.builders.Module",
+                    "classes": [
+                        f"{self.name}.module_{module_index}.Widget{class_index}"
+                        for class_index in range(self.classes_per_module)
+                    ],
+                }
+                for module_index in range(self.modules)
+            ],
+        }
+
+    def module_source(self, module_index: int) -> str:
+        source = docstring("", f"Module {module_index} of {self.name}.", self.docstring_length, module_index)
+        source += "\n\n" + self.class_source("Overview", "", f"The overview for module {module_index}.", [], [])
+
+        # argument `i` is documented on level `i % (depth + 1)` of the hierarchy, where the last level is the class.
+        levels = self.inheritance_depth + 1
+        arguments = [f"argument_{index}" for index in range(self.init_args)]
+        parent = ""
+        for depth in range(self.inheritance_depth):
+            documented = [argument for (index, argument) in enumerate(arguments) if index % levels == depth]
+            source += "\n\n" + self.class_source(f"Base{depth}", parent, f"Base class {depth}.", documented, [])
+            parent = f"Base{depth}"
+
+        documented = [argument for (index, argument) in enumerate(arguments) if index % levels == levels - 1]
+        for class_index in range(self.classes_per_module):
+            source += "\n\n" + self.class_source(
+                f"Widget{class_index}", parent, f"Widget number {class_index}.", documented, arguments
+            )
+        return source
+
+    def class_source(
+        self, class_name: str, parent: str, summary: str, documented: list[str], arguments: list[str]
+    ) -> str:
+        source = f"class {class_name}" + (f"({parent})" if parent else "") + ":\n"
+        source += docstring("    ", summary, self.docstring_length, len(class_name))
+        for index, argument in enumerate(documented):
+            # the docblock for an attribute goes directly above it
+            source += "\n" + docstring("    ", f"The docs for {argument}.", self.docstring_length // 4, index)
+            source += f"    {argument} = None\n"
+        if arguments:
+            required = arguments[: (len(arguments) + 1) // 2]
+            optional = arguments[len(required) :]
+            signature = ", ".join(["self", *required, *[f"{argument}=None" for argument in optional]])
+            source += f"\n    def __init__({signature}):\n"
+            source += "".join(f"        self.{argument} = {argument}\n" for argument in arguments)
+        return source
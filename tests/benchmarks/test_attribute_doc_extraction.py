@@ -0,0 +1,59 @@
+import pathlib
+import sys
+import time
+import tokenize
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "src"))
+
+import clearskies
+
+from clearskies_doc_builder.attribute_doc_index import AttributeDocIndex
+
+
+def tokenize_attribute_docs(source_file: str) -> dict[str, str]:
+    """Scan for attribute docs the original tokenize-based way, kept here so we can compare against it."""
+    doc_strings = {}
+    with open(source_file, "r") as fp:
+        last_string = ""
+        for token_type, token_string, _, _, _ in tokenize.generate_tokens(fp.readline):
+            if token_type == tokenize.STRING:
+                last_string = token_string
+                continue
+            if token_type == tokenize.NEWLINE:
+                continue
+            if token_type != tokenize.NAME:
+                last_string = ""
+                continue
+            if last_string:
+                doc_strings[token_string] = last_string
+    return doc_strings
+
+
+def time_extractor(extractor, source_files: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for source_file in source_files:
+            extractor(source_file)
+    return time.perf_counter() - start
+
+
+def test_ast_extractor_throughput():
+    source_files = sorted(str(path) for path in pathlib.Path(clearskies.__file__).parent.rglob("*.py"))
+    total_bytes = sum(pathlib.Path(source_file).stat().st_size for source_file in source_files)
+    rounds = 3
+
+    index = AttributeDocIndex()
+    results = {
+        "tokenize": time_extractor(tokenize_attribute_docs, source_files, rounds),
+        "ast": time_extractor(index.parse_file, source_files, rounds),
+    }
+
+    print(f"\nAttribute doc extraction over {len(source_files)} clearskies files ({total_bytes / 1e6:.1f} MB):")
+    for name, elapsed in results.items():
+        files_per_second = len(source_files) * rounds / elapsed
+        megabytes_per_second = total_bytes * rounds / elapsed / 1e6
+        print(f"  {name:>8}: {files_per_second:8.0f} files/s  {megabytes_per_second:6.2f} MB/s")
+    print(f"  speedup: {results['tokenize'] / results['ast']:.2f}x")
+
+    documented = sum(len(docs) for source_file in source_files for docs in index.parse_file(source_file).values())
+    assert documented > 0
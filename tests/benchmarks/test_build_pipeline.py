@@ -0,0 +1,174 @@
+import datetime
+import functools
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "src"))
+
+import clearskies
+import pytest
+from synthetic_package import SyntheticPackage
+
+from clearskies_doc_builder import backends, builders, models
+from clearskies_doc_builder.attribute_doc_index import AttributeDocIndex
+from clearskies_doc_builder.backends.attribute_backend import AttributeBackend
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+from clearskies_doc_builder.backends.module_backend import ModuleBackend
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.builders.builder import Builder
+from clearskies_doc_builder.builders.page_writer import PageWriter
+
+SRC = str(pathlib.Path(__file__).parent.parent.parent / "src")
+RESULTS_PATH = pathlib.Path(__file__).parent / "results"
+
+SIZES = {
+    "small": dict(modules=5, classes_per_module=10, inheritance_depth=1, init_args=4, docstring_length=20),
+    "medium": dict(modules=20, classes_per_module=25, inheritance_depth=2, init_args=8, docstring_length=60),
+    "large": dict(modules=100, classes_per_module=30, inheritance_depth=3, init_args=12, docstring_length=120),
+}
+
+# the methods that make up each phase of the build.  Anything not covered here (preparing the doc space, the
+# manifest, etc...) is reported as "other".
+PHASES = {
+    "introspection": [
+        (ModuleBackend, "records"),
+        (ModuleBackend, "unpack"),
+        (ClassBackend, "records"),
+        (ClassBackend, "resolve"),
+        (ClassBackend, "unpack"),
+        (AttributeBackend, "records"),
+        (AttributeBackend, "unpack_arguments"),
+    ],
+    "doc_extraction": [(AttributeDocIndex, "extract_attribute_docs")],
+    "rendering": [
+        (builders.Module, "build"),
+        (builders.SingleClass, "build"),
+        (builders.SingleClassToSection, "build"),
+    ],
+    "writing": [(PageWriter, "open"), (PageWriter, "write"), (PageWriter, "close")],
+}
+
+
+class PhaseTimer:
+    """
+    Attribute the time spent in a build to its phases.
+
+    Phases nest (rendering a page asks the backends for classes, which is introspection), so each phase only gets
+    the time spent in it directly, and not the time spent in whatever phases it calls.
+    """
+
+    def __init__(self):
+        self.seconds = {phase: 0.0 for phase in PHASES}
+        self.calls = {phase: 0 for phase in PHASES}
+        self.stack: list[str] = []
+        self.last = 0.0
+
+    def instrument(self, monkeypatch) -> None:
+        for phase, methods in PHASES.items():
+            for Class, method_name in methods:
+                monkeypatch.setattr(Class, method_name, self.wrap(phase, Class.__dict__[method_name]))
+
+    def wrap(self, phase, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            self.switch()
+            self.stack.append(phase)
+            self.calls[phase] += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.switch()
+                self.stack.pop()
+
+        return timed
+
+    def switch(self) -> None:
+        now = time.perf_counter()
+        if self.stack:
+            self.seconds[self.stack[-1]] += now - self.last
+        self.last = now
+
+
+def build_in_process(monkeypatch, project_root: pathlib.Path, timer: PhaseTimer | None) -> float:
+    config = json.loads((project_root / "docs" / "python" / "config.json").read_text())
+    monkeypatch.syspath_prepend(str(project_root / "src"))
+    Builder.attribute_doc_index.invalidate()
+    if timer:
+        timer.instrument(monkeypatch)
+
+    di = clearskies.di.Di(modules=[models, backends])
+    start = time.perf_counter()
+    build_callable(di.build_from_name("modules"), di.build_from_name("classes"), config, str(project_root / "docs"))
+    return time.perf_counter() - start
+
+
+def build_in_subprocess(project_root: pathlib.Path) -> float:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([SRC, str(project_root / "src")])}
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(project_root / "docs" / "python" / "build.py")],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+@pytest.fixture(scope="module")
+def results():
+    results = {
+        "benchmark": "build_pipeline",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "clearskies": clearskies.__version__ if hasattr(clearskies, "__version__") else "",
+        "sizes": {},
+    }
+    yield results
+
+    results_file = os.environ.get("DOC_BUILDER_BENCHMARK_RESULTS")
+    if results_file:
+        results_path = pathlib.Path(results_file)
+    else:
+        RESULTS_PATH.mkdir(exist_ok=True)
+        results_path = RESULTS_PATH / f"build-pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    results_path.write_text(json.dumps(results, indent=2))
+    print(f"\nBuild pipeline results written to {results_path}")
+
+
+@pytest.mark.parametrize("size", list(SIZES.keys()))
+def test_build_pipeline(size, results, monkeypatch, tmp_path):
+    package = SyntheticPackage(f"synthetic_{size}", **SIZES[size])
+
+    # a fresh interpreter, the way CI runs it
+    process_seconds = build_in_subprocess(package.generate(tmp_path / "process"))
+
+    # and then in process, broken down by phase.  The package name is new to this process, so nothing is cached yet.
+    timer = PhaseTimer()
+    project_root = package.generate(tmp_path / "phases")
+    build_seconds = build_in_process(monkeypatch, project_root, timer)
+    phases = {**timer.seconds, "other": build_seconds - sum(timer.seconds.values())}
+
+    pages = list((project_root / "docs" / "build" / "docs").rglob("*.md"))
+    results["sizes"][size] = {
+        "package": package.describe(),
+        "pages": len(pages),
+        "process_seconds": process_seconds,
+        "build_callable_seconds": build_seconds,
+        "phase_seconds": phases,
+        "phase_calls": timer.calls,
+    }
+
+    print(f"\nBuild pipeline, {size} ({package.class_count} classes, {len(pages)} pages):")
+    print(f"  {'process':>16}: {process_seconds:8.3f}s")
+    print(f"  {'build_callable':>16}: {build_seconds:8.3f}s  ({package.class_count / build_seconds:.0f} classes/s)")
+    for phase, seconds in phases.items():
+        print(f"  {phase:>16}: {seconds:8.3f}s  {seconds / build_seconds * 100:5.1f}%")
+
+    assert len(pages) == package.class_count + package.modules
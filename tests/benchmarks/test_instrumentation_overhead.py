@@ -0,0 +1,44 @@
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "src"))
+
+from clearskies_doc_builder import build_profile, build_trace
+
+
+def lookup(mapping, key):
+    return mapping.get(key)
+
+
+@build_profile.timed("lookups", lambda mapping, key: {"key": key})
+def timed_lookup(mapping, key):
+    return mapping.get(key)
+
+
+def nanoseconds_per_call(function, rounds: int = 1_000_000) -> float:
+    mapping = {"key": "value"}
+    return min(timeit.repeat(lambda: function(mapping, "key"), number=rounds, repeat=5)) / rounds * 1e9
+
+
+def test_instrumentation_overhead():
+    assert build_profile.active is None and build_trace.active is None
+    results = {
+        "bare": nanoseconds_per_call(lookup),
+        "instrumented (off)": nanoseconds_per_call(timed_lookup),
+    }
+
+    build_profile.active = build_profile.BuildProfile()
+    build_trace.active = build_trace.BuildTrace()
+    try:
+        results["profiled and traced"] = nanoseconds_per_call(timed_lookup, rounds=100_000)
+    finally:
+        build_profile.active = None
+        build_trace.active = None
+
+    print("\nInstrumentation overhead per call:")
+    for name, nanoseconds in results.items():
+        print(f"  {name:>20}: {nanoseconds:7.1f} ns")
+
+    # when it's off, instrumentation should cost about one extra function call, which is well under a microsecond
+    assert results["instrumented (off)"] - results["bare"] < 1000
@@ -0,0 +1,74 @@
+import pathlib
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "src"))
+
+import clearskies
+from synthetic_package import SyntheticPackage
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+from clearskies_doc_builder.backends.class_records import ClassRecords
+
+
+def read_classes(classes, import_paths: list[str]) -> list:
+    """Read the same fields that the builders read for every class they document."""
+    found = []
+    for import_path in import_paths:
+        source_class = classes.find(f"import_path={import_path}")
+        (source_class.name, source_class.import_path, source_class.doc)
+        for arg in source_class.init.all_args:
+            arg in source_class.init.kwargs
+        pending = [source_class]
+        while pending:
+            base_class = pending.pop()
+            (base_class.source_file, base_class.qualname)
+            pending.extend(base_class.base_classes)
+        found.append(source_class)
+    return found
+
+
+def measure(classes, import_paths: list[str], rounds: int) -> tuple[float, int]:
+    """Return the best time for reading every class (with fresh caches) and the memory allocated while doing it."""
+    best = float("inf")
+    for _ in range(rounds):
+        ClassBackend.reset_resolution_cache()
+        start = time.perf_counter()
+        read_classes(classes, import_paths)
+        best = min(best, time.perf_counter() - start)
+
+    ClassBackend.reset_resolution_cache()
+    tracemalloc.start()
+    found = read_classes(classes, import_paths)
+    (allocated, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del found
+    return (best, allocated)
+
+
+def test_records_versus_models(monkeypatch, tmp_path):
+    package = SyntheticPackage("synthetic_records", modules=10, classes_per_module=100)
+    project_root = package.generate(tmp_path)
+    monkeypatch.syspath_prepend(str(project_root / "src"))
+    config = package.config()
+    import_paths = [class_path for branch in config["tree"] for class_path in branch["classes"]]
+
+    classes = clearskies.di.Di(modules=[models, backends]).build_from_name("classes")
+    # warm up, so both start with everything imported
+    read_classes(classes, import_paths)
+
+    results = {
+        "models": measure(classes, import_paths, rounds=3),
+        "records": measure(ClassRecords(classes), import_paths, rounds=3),
+    }
+
+    per_thousand = 1000 / len(import_paths)
+    print(f"\nReading {len(import_paths)} classes (plus their bases and __init__), per thousand classes:")
+    for name, (seconds, allocated) in results.items():
+        print(f"  {name:>8}: {seconds * per_thousand * 1000:8.1f}ms  {allocated * per_thousand / 1e6:8.2f} MB held")
+    print(f"  speedup: {results['models'][0] / results['records'][0]:.2f}x")
+
+    assert results["records"][0] < results["models"][0]
+    assert results["records"][1] < results["models"][1]
@@ -0,0 +1,38 @@
+import pathlib
+import subprocess
+import sys
+
+SRC = str(pathlib.Path(__file__).parent.parent.parent / "src")
+
+
+def import_seconds(statement: str, rounds: int = 5) -> float:
+    """Return the best-of-N time for a fresh interpreter to run an import statement."""
+    code = (
+        "import sys, time\n"
+        + f"sys.path.insert(0, {SRC!r})\n"
+        + "start = time.perf_counter()\n"
+        + f"{statement}\n"
+        + "print(time.perf_counter() - start)\n"
+    )
+    times = []
+    for _ in range(rounds):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        times.append(float(result.stdout.strip()))
+    return min(times)
+
+
+def test_startup_time():
+    results = {
+        "clearskies_doc_builder": import_seconds("import clearskies_doc_builder"),
+        "build_callable": import_seconds("from clearskies_doc_builder.build_callable import build_callable"),
+        "builders": import_seconds("from clearskies_doc_builder.builders import Module"),
+        "models": import_seconds("from clearskies_doc_builder import models, backends"),
+        "clearskies": import_seconds("import clearskies"),
+    }
+
+    print("\nStartup time (best of 5, fresh interpreter):")
+    for name, seconds in results.items():
+        print(f"  {name:>24}: {seconds * 1000:7.1f} ms")
+
+    # the package itself shouldn't pay for clearskies until it builds something
+    assert results["clearskies_doc_builder"] < results["clearskies"] / 2
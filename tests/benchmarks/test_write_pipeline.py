@@ -0,0 +1,60 @@
+import json
+import os
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "src"))
+
+import clearskies
+from synthetic_package import SyntheticPackage
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.builders.builder import Builder
+
+# how long every file system call takes on our pretend network file system
+LATENCY_SECONDS = 0.001
+
+
+def slow(function):
+    def wrapper(*args, **kwargs):
+        time.sleep(LATENCY_SECONDS)
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def build(project_root: pathlib.Path, config: dict) -> float:
+    di = clearskies.di.Di(modules=[models, backends])
+    start = time.perf_counter()
+    build_callable(di.build_from_name("modules"), di.build_from_name("classes"), config, str(project_root / "docs"))
+    return time.perf_counter() - start
+
+
+def test_background_writes_on_a_slow_file_system(monkeypatch, tmp_path):
+    package = SyntheticPackage("synthetic_writes", modules=10, classes_per_module=30)
+    project_root = package.generate(tmp_path)
+    monkeypatch.syspath_prepend(str(project_root / "src"))
+    config = json.loads((project_root / "docs" / "python" / "config.json").read_text())
+
+    # warm up, so both builds start with everything imported and parsed
+    build(project_root, config)
+    monkeypatch.setattr(os, "replace", slow(os.replace))
+    monkeypatch.setattr(pathlib.Path, "stat", slow(pathlib.Path.stat))
+    monkeypatch.setattr(pathlib.Path, "open", slow(pathlib.Path.open))
+
+    results = {}
+    for write_threads in [0, 4, 16]:
+        for page in (project_root / "docs" / "build" / "docs").rglob("*.md"):
+            page.write_text("changed")
+        Builder.attribute_doc_index.invalidate()
+        results[write_threads] = build(project_root, {**config, "write_threads": write_threads})
+
+    pages = package.class_count + package.modules
+    print(f"\nWriting {pages} pages with {LATENCY_SECONDS * 1000:.0f}ms per file system call:")
+    for write_threads, seconds in results.items():
+        name = f"{write_threads} write threads" if write_threads else "while rendering"
+        print(f"  {name:>16}: {seconds:8.3f}s  ({pages / seconds:.0f} pages/s)")
+
+    assert results[4] < results[0]
@@ -0,0 +1,112 @@
+import json
+import pathlib
+import sys
+from typing import Any, Callable
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.prepare_doc_space import prepare_doc_space
+
+BASE_SOURCE = '''
+class Base:
+    """A base class."""
+
+    """
+    The docs for name.
+    """
+    name = None
+
+    def __init__(self, name: str):
+        self.name = name
+'''
+
+THINGS_SOURCE = '''
+from {package}.base import Base
+
+
+class Thing(Base):
+    """{docstring}"""
+
+    def __init__(self, name: str, size: int = 1):
+        self.name = name
+        self.size = size
+
+
+class Widget(Base):
+    """A widget."""
+'''
+
+OTHER_SOURCE = '''
+class Other:
+    """Something else entirely."""
+'''
+
+
+class TmpProject:
+    """
+    A small project to document, laid out like the real thing.
+
+    The package in `src/` has three modules: `base` (the `Base` class), `things` (`Thing` and `Widget`, which extend
+    `Base`) and `other` (`Other`, which stands alone).  The docs live in `docs/`, with the config in
+    `docs/python/config.json` and an empty jekyll site.
+    """
+
+    def __init__(self, root: pathlib.Path, package: str, tree: list[dict[str, Any]]):
+        self.root = root
+        self.package = package
+        self.tree = tree
+        self.docs_path = root / "docs"
+        self.doc_root = self.docs_path / "build" / "docs"
+
+    def source_file(self, module: str) -> pathlib.Path:
+        return self.root / "src" / self.package / f"{module}.py"
+
+    def write_things(self, docstring: str) -> None:
+        self.source_file("things").write_text(THINGS_SOURCE.format(package=self.package, docstring=docstring))
+
+
+@pytest.fixture
+def tmp_project(tmp_path, monkeypatch) -> Callable[..., TmpProject]:
+    """
+    Return a function that creates a `TmpProject` in a temporary folder.
+
+    The tree for the config is given with the package name left out of the class paths, e.g. `things.Thing`.  Use
+    `importable` to put the package on `sys.path` for the test (projects built by the batch builder or the daemon take
+    care of that themselves), and `name` to put more than one project in the same test.
+    """
+    # other tests swap out `prepare_doc_space`, but these projects need a real build folder
+    monkeypatch.setitem(build_callable.__globals__, "prepare_doc_space", prepare_doc_space)
+
+    def make(
+        package: str,
+        tree: list[dict[str, Any]],
+        name: str = "project",
+        importable: bool = False,
+        docstring: str = "A thing.",
+    ) -> TmpProject:
+        project = TmpProject(tmp_path / name, package, [with_package(entry, package) for entry in tree])
+        package_path = project.root / "src" / package
+        package_path.mkdir(parents=True)
+        (package_path / "__init__.py").write_text("")
+        project.source_file("base").write_text(BASE_SOURCE)
+        project.write_things(docstring)
+        project.source_file("other").write_text(OTHER_SOURCE)
+
+        (project.docs_path / "jekyll" / "docs").mkdir(parents=True)
+        (project.docs_path / "python").mkdir(parents=True)
+        (project.docs_path / "python" / "config.json").write_text(json.dumps({"tree": project.tree}))
+        if importable:
+            monkeypatch.syspath_prepend(str(project.root / "src"))
+        return project
+
+    return make
+
+
+def with_package(entry: dict[str, Any], package: str) -> dict[str, Any]:
+    entry = {**entry, "source": f"{package}.{entry['source']}"}
+    if "classes" in entry:
+        entry["classes"] = [f"{package}.{class_path}" for class_path in entry["classes"]]
+    return entry
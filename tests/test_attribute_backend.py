@@ -0,0 +1,118 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.backends.attribute_backend import AttributeBackend
+from clearskies_doc_builder.backends.lazy_record import LazyRecord
+
+
+class Widget:
+    """A widget."""
+
+    size = 3
+
+    def __init__(self, name, size=3, color="red"):
+        """Make a widget."""
+
+
+def test_name_searches_only_unpack_one_attribute(monkeypatch):
+    unpacked = []
+    original_unpack = AttributeBackend.unpack
+    monkeypatch.setattr(
+        AttributeBackend,
+        "unpack",
+        lambda self, attribute, name, parent_class: (
+            unpacked.append(name) or original_unpack(self, attribute, name, parent_class)
+        ),
+    )
+    classes = clearskies.di.Di(modules=[models, backends]).build_from_name("classes")
+    widget = classes.find("import_path=test_attribute_backend.Widget")
+
+    init = widget.init
+    assert init.name == "__init__"
+    assert init.all_args == ["self", "name", "size", "color"]
+    assert init.defaults == {"size": 3, "color": "red"}
+    assert unpacked == ["__init__"]
+
+    assert widget.attributes.find("name=size").attribute == 3
+    assert not widget.attributes.where("name=not_an_attribute").first()
+    # the metaclass isn't part of `dir()`, so it shouldn't be found by name either
+    assert not widget.attributes.where("name=mro").first()
+    assert unpacked == ["__init__", "size"]
+
+
+def test_arguments_are_unpacked_lazily(monkeypatch):
+    calls = []
+    original_arguments = AttributeBackend.arguments
+    monkeypatch.setattr(
+        AttributeBackend, "arguments", lambda self, attribute: calls.append(1) or original_arguments(self, attribute)
+    )
+    record = AttributeBackend().unpack(Widget.__init__, "__init__", Widget)
+    assert isinstance(record, LazyRecord)
+    assert record["doc"] == "Make a widget."
+    assert "kwargs" in record
+    assert not calls
+
+    assert record["kwargs"] == ["size", "color"]
+    assert record.get("defaults") == {"size": 3, "color": "red"}
+    assert len(calls) == 1
+    assert set(record) == {
+        "id",
+        "name",
+        "type",
+        "doc",
+        "parent_class",
+        "attribute",
+        "all_args",
+        "args",
+        "kwargs",
+        "defaults",
+    }
+
+
+def test_relationship_columns_are_memoized(monkeypatch):
+    unpacked = []
+    original_unpack = AttributeBackend.unpack
+    monkeypatch.setattr(
+        AttributeBackend,
+        "unpack",
+        lambda self, attribute, name, parent_class: (
+            unpacked.append(name) or original_unpack(self, attribute, name, parent_class)
+        ),
+    )
+    classes = clearskies.di.Di(modules=[models, backends]).build_from_name("classes")
+    widget = classes.find("import_path=test_attribute_backend.Widget")
+
+    for arg in widget.init.all_args:
+        assert widget.init.kwargs == ["size", "color"]
+    assert widget.methods is widget.methods
+    assert widget.base_classes is widget.base_classes
+    assert unpacked.count("__init__") == 2
+
+    models.Class.init.invalidate(widget)
+    assert widget.init.name == "__init__"
+    assert unpacked.count("__init__") == 3
+
+
+def test_attributes_are_only_scanned_once(monkeypatch):
+    scans = []
+    original_records = AttributeBackend.records
+    monkeypatch.setattr(
+        AttributeBackend, "records", lambda self, query, *args: scans.append(1) or original_records(self, query, *args)
+    )
+    classes = clearskies.di.Di(modules=[models, backends]).build_from_name("classes")
+    widget = classes.find("import_path=test_attribute_backend.Widget")
+
+    names = [attribute.name for attribute in widget.attributes]
+    assert "size" in names
+    assert [attribute.name for attribute in widget.attributes] == names
+    assert len(widget.attributes) == len(names)
+    assert len(scans) == 1
+
+    # narrowing things down still goes to the backend
+    assert widget.attributes.find("name=size").attribute == 3
+    assert len(scans) == 2
@@ -0,0 +1,106 @@
+import pathlib
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+from clearskies_doc_builder.attribute_doc_index import AttributeDocIndex
+
+BASE_SOURCE = '''
+class Base:
+    """A base class."""
+
+    """
+    The name of the thing.
+    """
+    name = None
+
+    """
+    The size of the thing.
+    """
+    size = None
+'''
+
+CHILD_SOURCE = '''
+class Child(Base):
+    """A child class."""
+
+    """
+    The color of the child.
+    """
+    color = None
+
+    """
+    The child has its own size.
+    """
+    size = None
+
+    def __init__(self):
+        """
+        Not an attribute doc.
+        """
+        color = None
+
+
+class Sibling(Base):
+    """
+    The color of the sibling.
+    """
+    color = None
+'''
+
+
+def make_classes(tmp_path):
+    (tmp_path / "base.py").write_text(BASE_SOURCE)
+    (tmp_path / "child.py").write_text(CHILD_SOURCE)
+    base = SimpleNamespace(source_file=str(tmp_path / "base.py"), qualname="Base", base_classes=[])
+    child = SimpleNamespace(source_file=str(tmp_path / "child.py"), qualname="Child", base_classes=[base])
+    return base, child
+
+
+def test_lookups_depend_on_argument_names(tmp_path):
+    base, child = make_classes(tmp_path)
+    index = AttributeDocIndex()
+
+    assert list(index.extract_attribute_docs(base, ["name"])) == ["name"]
+    # a second lookup against the same file must not be limited to the arguments of the first one
+    docs = index.extract_attribute_docs(child, ["name", "size", "color"])
+    assert "The name of the thing." in docs["name"]
+    assert "The child has its own size." in docs["size"]
+    assert "The color of the child." in docs["color"]
+    assert index.files_parsed == 2
+
+
+def test_additional_attribute_sources_fill_gaps(tmp_path):
+    base, child = make_classes(tmp_path)
+    child.base_classes = []
+    index = AttributeDocIndex()
+
+    docs = index.extract_attribute_docs(child, ["name", "size"], additional_attribute_sources=[base])
+    assert "The name of the thing." in docs["name"]
+    assert "The child has its own size." in docs["size"]
+
+
+def test_invalidate_forces_a_reparse(tmp_path):
+    base, child = make_classes(tmp_path)
+    index = AttributeDocIndex()
+    index.extract_attribute_docs(base, ["name"])
+    index.extract_attribute_docs(base, ["size"])
+    assert index.files_parsed == 1
+
+    index.invalidate([base.source_file])
+    index.extract_attribute_docs(base, ["name"])
+    assert index.files_parsed == 2
+    assert not index.extract_attribute_docs(SimpleNamespace(source_file="", base_classes=[]), ["name"])
+
+
+def test_docs_are_scoped_to_their_class(tmp_path):
+    base, child = make_classes(tmp_path)
+    index = AttributeDocIndex()
+
+    assert list(index.class_docs(child.source_file, "Child")) == ["color", "size"]
+    assert "The color of the child." in index.class_docs(child.source_file, "Child")["color"]
+    # the first string in a class body is the class docblock, not an attribute docblock.
+    assert index.class_docs(child.source_file, "Sibling") == {}
+    assert index.class_docs(child.source_file, "Unknown") == {}
+    assert index.files_parsed == 1
@@ -0,0 +1,79 @@
+import json
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from clearskies_doc_builder import build_session
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+from clearskies_doc_builder.batch import SharedModuleConflict, build_batch, isolated_project
+
+TREE = [
+    {
+        "title": "Things",
+        "source": "things.Thing",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+    }
+]
+
+
+def test_projects_with_the_same_package_stay_isolated(tmp_project):
+    first = tmp_project("batch_plugin", TREE, name="first", docstring="The first thing.").root
+    second = tmp_project("batch_plugin", TREE, name="second", docstring="The second thing.").root
+    sys_path = list(sys.path)
+
+    results = build_batch([first, second])
+
+    assert results == {
+        str(first): {"pages_written": 1, "pages_unchanged": 0},
+        str(second): {"pages_written": 1, "pages_unchanged": 0},
+    }
+    assert "The first thing." in (first / "docs" / "build" / "docs" / "things" / "index.md").read_text()
+    assert "The second thing." in (second / "docs" / "build" / "docs" / "things" / "index.md").read_text()
+    assert sys.path == sys_path
+    assert "batch_plugin" not in sys.modules
+    assert not build_session.shared_caches
+
+    # the builder is shared by both projects, so it stays resolved, but the project classes are forgotten
+    assert "clearskies_doc_builder.builders.SingleClass" in ClassBackend.resolution_cache
+    assert not [path for path in ClassBackend.resolution_cache if path.startswith("batch_plugin")]
+
+
+def test_a_broken_project_does_not_stop_the_batch(tmp_project):
+    broken = tmp_project("batch_broken", TREE, name="broken")
+    broken.source_file("things").write_text("class Thing(:\n")
+    working = tmp_project("batch_working", TREE, name="working")
+
+    results = build_batch([broken.root, working.root], workers=2)
+
+    assert "SyntaxError" in results[str(broken.root)]["error"]
+    assert results[str(working.root)] == {"pages_written": 1, "pages_unchanged": 0}
+
+
+def test_projects_cannot_replace_modules_the_build_depends_on(tmp_project):
+    project = tmp_project("json", TREE)
+
+    with pytest.raises(SharedModuleConflict, match="json"):
+        with isolated_project(project.root):
+            pass
+
+
+def test_projects_built_by_their_own_script_keep_the_flags(tmp_project, monkeypatch):
+    project = tmp_project("batch_conflict", TREE)
+    # a module that clashes with one the build uses means the project has to be built by its own build script
+    (project.root / "src" / "json.py").write_text("")
+    (project.docs_path / "python" / "build.py").write_text(
+        "import clearskies_doc_builder\n\nclearskies_doc_builder.build_direct(__file__)\n"
+    )
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(path for path in sys.path if path))
+
+    results = build_batch([project.root], overrides={"profile": True, "trace": True})
+
+    assert results == {str(project.root): {}}
+    assert (project.doc_root / "things" / "index.md").exists()
+    profile = json.loads((project.docs_path / "build" / ".doc-builder-profile.json").read_text())
+    assert profile["phases"]
+    assert (project.docs_path / "build" / ".doc-builder-trace.json").exists()
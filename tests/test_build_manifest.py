@@ -0,0 +1,73 @@
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+from clearskies_doc_builder.build_manifest import BuildManifest, branch_class_paths, branch_key
+
+
+def make_build(tmp_path):
+    source_file = tmp_path / "source.py"
+    source_file.write_text("class Thing:\n    pass\n")
+    doc_root = tmp_path / "build" / "docs"
+    (doc_root / "things").mkdir(parents=True)
+    (doc_root / "things" / "index.md").write_text("# Things")
+
+    manifest = BuildManifest(tmp_path / "build")
+    manifest.record("Things", "inputs", [str(source_file)], ["things/index.md"])
+    manifest.save()
+    return source_file, doc_root
+
+
+def test_unchanged_branch_is_skipped(tmp_path):
+    source_file, doc_root = make_build(tmp_path)
+
+    # a touch without a content change still counts as unchanged
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    assert BuildManifest(tmp_path / "build").is_unchanged("Things", "inputs", doc_root)
+
+
+def test_changed_branch_is_rebuilt(tmp_path):
+    source_file, doc_root = make_build(tmp_path)
+
+    assert not BuildManifest(tmp_path / "build").is_unchanged("Things", "other-inputs", doc_root)
+    assert not BuildManifest(tmp_path / "build").is_unchanged("Other", "inputs", doc_root)
+
+    source_file.write_text("class Thing:\n    x = 1\n")
+    assert not BuildManifest(tmp_path / "build").is_unchanged("Things", "inputs", doc_root)
+
+
+def test_missing_page_forces_rebuild(tmp_path):
+    source_file, doc_root = make_build(tmp_path)
+    (doc_root / "things" / "index.md").unlink()
+
+    assert not BuildManifest(tmp_path / "build").is_unchanged("Things", "inputs", doc_root)
+
+
+def test_stale_pages_are_removed(tmp_path):
+    source_file, doc_root = make_build(tmp_path)
+
+    manifest = BuildManifest(tmp_path / "build")
+    assert manifest.remove_stale_pages(doc_root) == ["things/index.md"]
+    assert not (doc_root / "things" / "index.md").exists()
+
+
+def test_branch_helpers():
+    branch = {
+        "title": "Env",
+        "parent": "Cursors",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+        "source": "clearskies.cursors.Env",
+        "additional_attribute_sources": ["clearskies.cursors.Base"],
+        "args_to_additional_attributes_map": {"name": "clearskies.cursors.Named.name"},
+    }
+    assert branch_key(branch) == "Cursors/Env"
+    assert branch_class_paths(branch) == [
+        "clearskies_doc_builder.builders.SingleClass",
+        "clearskies.cursors.Env",
+        "clearskies.cursors.Base",
+        "clearskies.cursors.Named",
+    ]
@@ -0,0 +1,75 @@
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+
+from clearskies_doc_builder import backends, build_profile, models
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.build_profile import REPORT_FILENAME, BuildProfile
+
+TREE = [
+    {
+        "title": "Columns",
+        "source": "clearskies.Column",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "classes": ["clearskies.columns.Boolean", "clearskies.columns.String", "clearskies.columns.Integer"],
+    },
+    {"title": "Model", "source": "clearskies.Model", "builder": "clearskies_doc_builder.builders.SingleClass"},
+]
+
+
+def run_build(monkeypatch, doc_root: pathlib.Path, config: dict) -> dict:
+    doc_root.mkdir(parents=True)
+    monkeypatch.setitem(build_callable.__globals__, "prepare_doc_space", lambda project_root: str(doc_root))
+    di = clearskies.di.Di(modules=[models, backends])
+    build_callable(di.build_from_name("modules"), di.build_from_name("classes"), config, str(doc_root))
+    return json.loads((doc_root.parent / REPORT_FILENAME).read_text())
+
+
+def test_phases_only_count_their_own_time(monkeypatch):
+    profile = BuildProfile()
+    clock = iter([0.0, 1.0, 3.0, 6.0])
+    monkeypatch.setattr(build_profile.time, "perf_counter", lambda: next(clock))
+    profile.enter("rendering")
+    profile.enter("imports")
+    profile.exit()
+    profile.exit()
+
+    assert profile.phases["rendering"] == {"seconds": 4.0, "calls": 1}
+    assert profile.phases["imports"] == {"seconds": 2.0, "calls": 1}
+
+
+def test_worker_profiles_merge_without_double_counting():
+    worker = BuildProfile()
+    worker.count("pages_written", 2)
+    worker.record_page("a.md", 0.5, "pkg.A")
+    worker.record_page("b.md", 0.25, "pkg.A")
+    main = BuildProfile(slowest=1)
+    main.merge(worker.take())
+    main.merge(worker.take())
+
+    report = main.report()
+    assert report["counters"] == {"pages_written": 2}
+    assert report["slowest_pages"] == [{"page": "a.md", "seconds": 0.5}]
+    assert report["slowest_classes"] == [{"class": "pkg.A", "seconds": 0.75}]
+
+
+def test_build_writes_a_profile_report(monkeypatch, tmp_path):
+    serial = run_build(monkeypatch, tmp_path / "serial" / "docs", {"tree": TREE, "profile": 2})
+    parallel = run_build(monkeypatch, tmp_path / "parallel" / "docs", {"tree": TREE, "profile": True, "workers": 2})
+
+    for report in [serial, parallel]:
+        assert sorted(report["pages"]) == sorted(serial["pages"])
+        assert {branch["title"] for branch in report["branches"]} == {"Columns", "Model"}
+        assert report["counters"]["pages_written"] == 5
+        assert report["counters"]["bytes_written"] > 0
+        # each page is opened, closed, and then moved into place
+        assert report["phases"]["writes"]["calls"] == 15
+        assert report["phases"]["attribute_scans"]["calls"] > 0
+    assert len(serial["slowest_pages"]) == 2
+    assert len(parallel["slowest_classes"]) == 5
+    assert "clearskies.model.Model" in {entry["class"] for entry in parallel["slowest_classes"]}
+    assert build_profile.active is None
@@ -0,0 +1,63 @@
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+
+from clearskies_doc_builder import backends, build_trace, models
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.build_trace import DEFAULT_TRACE_FILENAME, BuildTrace
+
+TREE = [
+    {
+        "title": "Columns",
+        "source": "clearskies.Column",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "classes": ["clearskies.columns.Boolean", "clearskies.columns.String"],
+    },
+    {"title": "Model", "source": "clearskies.Model", "builder": "clearskies_doc_builder.builders.SingleClass"},
+]
+
+
+def run_build(monkeypatch, doc_root: pathlib.Path, config: dict) -> None:
+    doc_root.mkdir(parents=True)
+    monkeypatch.setitem(build_callable.__globals__, "prepare_doc_space", lambda project_root: str(doc_root))
+    di = clearskies.di.Di(modules=[models, backends])
+    build_callable(di.build_from_name("modules"), di.build_from_name("classes"), config, str(doc_root))
+
+
+def test_spans_nest():
+    trace = BuildTrace(process_name="test")
+    # this trace isn't the active one, so spans don't end up in it
+    with build_trace.span("outer", title="Columns"):
+        pass
+    trace.begin("outer", {"title": "Columns"})
+    trace.begin("inner")
+    trace.end()
+    trace.end()
+
+    (metadata, inner, outer) = trace.take()
+    assert metadata == {"name": "process_name", "ph": "M", "pid": trace.pid, "tid": 0, "args": {"name": "test"}}
+    assert (inner["name"], outer["name"]) == ("inner", "outer")
+    assert outer["args"] == {"title": "Columns"}
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert trace.take() == []
+
+
+def test_build_writes_a_trace(monkeypatch, tmp_path):
+    run_build(monkeypatch, tmp_path / "serial" / "docs", {"tree": TREE, "trace": True})
+    run_build(monkeypatch, tmp_path / "parallel" / "docs", {"tree": TREE, "trace": "trace.json", "workers": 2})
+
+    serial = json.loads((tmp_path / "serial" / DEFAULT_TRACE_FILENAME).read_text())["traceEvents"]
+    parallel = json.loads((tmp_path / "parallel" / "docs" / "trace.json").read_text())["traceEvents"]
+    for events in [serial, parallel]:
+        names = {event["name"] for event in events}
+        assert {"branch", "rendering", "class_queries", "imports", "writes"} <= names
+        branches = [event["args"]["title"] for event in events if event["name"] == "branch"]
+        assert sorted(branches) == ["Columns", "Model"]
+    assert {event["args"]["name"] for event in parallel if event["ph"] == "M"} >= {"build", "build worker"}
+    assert len({event["pid"] for event in parallel}) > 1
+    assert build_trace.active is None
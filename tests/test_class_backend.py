@@ -0,0 +1,33 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+
+
+def test_resolutions_are_cached_by_import_path():
+    ClassBackend.reset_resolution_cache()
+    backend = ClassBackend()
+
+    record = backend.resolve("clearskies_doc_builder.backends.class_backend.ClassBackend")
+    assert record["type"] is ClassBackend
+    assert ClassBackend.resolution_cache_misses == 1
+
+    # every backend shares the cache, so a different instance gets the same record back
+    assert ClassBackend().resolve("clearskies_doc_builder.backends.class_backend.ClassBackend") is record
+    assert ClassBackend.resolution_cache_hits == 1
+    assert ClassBackend.resolution_cache_misses == 1
+
+    ClassBackend.reset_resolution_cache()
+    assert ClassBackend.resolve(backend, "clearskies_doc_builder.backends.class_backend.ClassBackend") is not record
+    assert ClassBackend.resolution_cache_misses == 1
+
+
+def test_bad_import_paths_are_not_cached():
+    ClassBackend.reset_resolution_cache()
+    with pytest.raises(ValueError):
+        ClassBackend().resolve("clearskies_doc_builder.backends.class_backend.NotAClass")
+    assert ClassBackend.resolution_cache == {}
@@ -0,0 +1,63 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+import pytest
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.backends.class_backend import ClassBackend
+from clearskies_doc_builder.backends.class_records import ClassRecord, ClassRecords
+
+
+def make_classes():
+    di = clearskies.di.Di(modules=[models, backends])
+    return di.build_from_name("classes")
+
+
+def test_records_have_the_same_fields_as_the_model():
+    ClassBackend.reset_resolution_cache()
+    classes = make_classes()
+    model = classes.find("import_path=clearskies.columns.String")
+    record = ClassRecords(classes).find("import_path=clearskies.columns.String")
+
+    assert isinstance(record, ClassRecord)
+    for field in ["id", "type", "source_file", "import_path", "name", "qualname", "doc", "module"]:
+        assert getattr(record, field) == getattr(model, field)
+    assert [base.import_path for base in record.base_classes] == [base.import_path for base in model.base_classes]
+    assert [base.source_file for base in record.base_classes] == [base.source_file for base in model.base_classes]
+    for field in ["name", "doc", "parent_class", "all_args", "args", "kwargs", "defaults"]:
+        assert getattr(record.init, field) == getattr(model.init, field)
+
+    # anything else comes from the model
+    assert sorted(method.name for method in record.methods) == sorted(method.name for method in model.methods)
+
+
+def test_records_are_read_only_and_reused():
+    ClassBackend.reset_resolution_cache()
+    records = ClassRecords(make_classes())
+    record = records.find("import_path=clearskies.columns.String")
+
+    with pytest.raises(AttributeError, match="read-only"):
+        record.name = "Something else"
+    with pytest.raises(AttributeError, match="read-only"):
+        record.init.doc = "Something else"
+
+    assert records.find("import_path=clearskies.columns.String") is record
+    assert record.base_classes[0] is records.find("import_path=clearskies.columns.String").base_classes[0]
+
+    # they last as long as the resolution cache does
+    ClassBackend.reset_resolution_cache()
+    assert records.find("import_path=clearskies.columns.String") is not record
+
+
+def test_records_can_be_turned_off():
+    classes = make_classes()
+    assert isinstance(ClassRecords.wrap(classes), ClassRecords)
+
+    ClassRecords.enabled = False
+    try:
+        assert ClassRecords.wrap(classes) is classes
+    finally:
+        ClassRecords.enabled = True
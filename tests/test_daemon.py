@@ -0,0 +1,117 @@
+import json
+import os
+import pathlib
+import socket
+import sys
+import threading
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from clearskies_doc_builder.daemon import BuildDaemon, default_socket_path, parse_flags, request_build, send_request
+
+TREE = [
+    {
+        "title": "Things",
+        "source": "things.Thing",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+    },
+    {
+        "title": "Base",
+        "source": "base.Base",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+    },
+]
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = BuildDaemon(str(tmp_path / "daemon.sock"), output=lambda message: None)
+    daemon.listen()
+    thread = threading.Thread(target=daemon.serve)
+    thread.start()
+    yield daemon
+    send_request({"command": "stop"}, daemon.socket_path)
+    thread.join(timeout=10)
+
+
+def test_daemon_rebuilds_only_what_changed(tmp_project, daemon):
+    project = tmp_project("daemon_plugin", TREE)
+    project_root = project.root
+    first = request_build(project_root, socket_path=daemon.socket_path)
+    assert first["results"] == {"pages_written": 2, "pages_unchanged": 0, "pages_removed": 0}
+    assert send_request({"command": "status"}, daemon.socket_path)["project_root"] == str(project_root.resolve())
+
+    # nothing changed, so nothing is rebuilt
+    second = request_build(project_root, socket_path=daemon.socket_path)
+    assert second["results"] == {"pages_written": 0, "pages_unchanged": 0, "pages_removed": 0}
+
+    project.write_things("A changed thing.")
+    third = request_build(project_root, socket_path=daemon.socket_path)
+    assert third["results"] == {"pages_written": 1, "pages_unchanged": 0, "pages_removed": 0}
+    thing_page = project_root / "docs" / "build" / "docs" / "things" / "index.md"
+    assert "A changed thing." in thing_page.read_text()
+
+    project.source_file("things").write_text("class Thing(:\n")
+    broken = request_build(project_root, socket_path=daemon.socket_path)
+    assert broken["results"] is None
+    assert "failed to load" in broken["output"][0]
+
+
+def test_daemon_reports_errors_without_stopping(tmp_path, tmp_project, daemon):
+    response = request_build(tmp_path / "missing", socket_path=daemon.socket_path)
+    assert "FileNotFoundError" in response["error"]
+
+    response = request_build(tmp_project("daemon_plugin", TREE).root, ["--nonsense"], socket_path=daemon.socket_path)
+    assert "--nonsense" in response["error"]
+    assert send_request({"command": "status"}, daemon.socket_path)["project_root"] is None
+
+
+def test_clients_that_send_nothing_or_garbage_do_not_stop_the_daemon(daemon):
+    # e.g. a second daemon checking whether this one is already running
+    with pytest.raises(ValueError, match="already listening"):
+        BuildDaemon(daemon.socket_path).listen()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(daemon.socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(daemon.socket_path)
+        connection.sendall(b"not json\n")
+        assert "line of JSON" in json.loads(connection.makefile().readline())["error"]
+
+    assert send_request({"command": "status"}, daemon.socket_path)["project_root"] is None
+
+
+def test_the_socket_lives_in_a_directory_that_only_we_can_write_to(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    socket_path = default_socket_path()
+    assert socket_path == str(tmp_path / f"clearskies-doc-builder-{os.getuid()}" / "daemon.sock")
+
+    daemon = BuildDaemon(output=lambda message: None)
+    daemon.listen()
+    try:
+        assert oct(os.stat(os.path.dirname(socket_path)).st_mode & 0o777) == "0o700"
+    finally:
+        daemon.close()
+
+
+def test_sockets_in_directories_that_others_can_write_to_are_refused(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    (tmp_path / "linked").symlink_to(tmp_path / "private", target_is_directory=True)
+    (tmp_path / "private").mkdir(mode=0o700)
+
+    for directory in [shared, tmp_path / "linked"]:
+        socket_path = str(directory / "daemon.sock")
+        with pytest.raises(PermissionError, match="nobody else can write to"):
+            BuildDaemon(socket_path).listen()
+        with pytest.raises(PermissionError, match="nobody else can write to"):
+            send_request({"command": "status"}, socket_path)
+
+
+def test_flags_are_relative_to_the_client(tmp_path):
+    flags = parse_flags(["--profile", "--changed-files", "src/a.py"], cwd=str(tmp_path))
+    assert flags == {"profile": True, "changed_files": [str(tmp_path / "src" / "a.py")]}
@@ -0,0 +1,115 @@
+import pathlib
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+import pytest
+
+import clearskies_doc_builder
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.dependency_graph import GRAPH_FILENAME, DependencyGraph, changed_files_since
+
+TREE = [
+    {
+        "title": "Things",
+        "source": "things.Thing",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "classes": ["things.Thing", "things.Widget"],
+    },
+    {
+        "title": "Other",
+        "source": "other.Other",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+    },
+]
+
+
+def run_build(docs_path: pathlib.Path, config: dict) -> dict:
+    di = clearskies.di.Di(modules=[models, backends])
+    return build_callable(di.build_from_name("modules"), di.build_from_name("classes"), config, str(docs_path))
+
+
+def test_graph_maps_pages_to_the_classes_they_show(tmp_project):
+    project = tmp_project("graph_pages", TREE, importable=True)
+    run_build(project.docs_path, {"tree": project.tree, "dependency_graph": True, "workers": 2})
+
+    graph = DependencyGraph.load(project.root, project.docs_path / "build")
+    assert graph
+    assert sorted(graph.pages) == ["other/index.md", "things/index.md", "things/thing.md", "things/widget.md"]
+    assert graph.pages["things/widget.md"]["classes"] == ["graph_pages.things.Widget", "graph_pages.base.Base"]
+    assert graph.classes["graph_pages.base.Base"] == ("graph_pages.base", "Base", "src/graph_pages/base.py")
+    assert "clearskies_doc_builder.builders.module.Module" in graph.entries["Things"]["builder"]
+
+    things_file = str(project.source_file("things"))
+    assert graph.affected_pages([str(project.source_file("base"))]) == {
+        "Things": {"things/index.md", "things/thing.md", "things/widget.md"}
+    }
+    # line 6 is in Thing, line 14 is in Widget, and line 2 (the import) isn't in any class
+    assert graph.pages_showing(things_file, 6) == ["things/index.md", "things/thing.md"]
+    assert graph.pages_showing(things_file, 14) == ["things/widget.md"]
+    assert graph.pages_showing(things_file, 2) == []
+    assert graph.pages_showing(things_file) == ["things/index.md", "things/thing.md", "things/widget.md"]
+
+
+def test_changed_files_only_rebuild_affected_pages(tmp_project):
+    project = tmp_project("graph_changed", TREE, importable=True)
+    (docs_path, doc_root, tree) = (project.docs_path, project.doc_root, project.tree)
+    run_build(docs_path, {"tree": tree, "dependency_graph": True})
+    other_page = doc_root / "other" / "index.md"
+    other_page.write_text("left alone")
+
+    things_file = project.source_file("things")
+    results = run_build(docs_path, {"tree": tree, "changed_files": [str(things_file)]})
+    assert results == {"pages_written": 0, "pages_unchanged": 3, "pages_removed": 0}
+    assert other_page.read_text() == "left alone"
+
+    # changing a config entry rebuilds the whole branch, and pages from removed branches are deleted
+    tree = [{**tree[0], "classes": tree[0]["classes"][:1]}]
+    results = run_build(docs_path, {"tree": tree, "changed_files": []})
+    assert results == {"pages_written": 0, "pages_unchanged": 2, "pages_removed": 2}
+    assert sorted(str(page.relative_to(doc_root)) for page in doc_root.rglob("*.md")) == [
+        "things/index.md",
+        "things/thing.md",
+    ]
+    assert sorted(DependencyGraph.load(project.root, docs_path / "build").pages) == [
+        "things/index.md",
+        "things/thing.md",
+    ]
+
+
+def test_targeted_build_without_a_graph_builds_everything(tmp_project):
+    project = tmp_project("graph_missing", TREE, importable=True)
+    results = run_build(project.docs_path, {"tree": project.tree, "changed_files": []})
+
+    assert results["pages_written"] == 4
+    assert (project.docs_path / "build" / GRAPH_FILENAME).is_file()
+
+
+@pytest.mark.skipif(not shutil.which("git"), reason="git isn't installed")
+def test_changed_files_since_a_git_ref(tmp_path):
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=docs", "-c", "user.email=docs@example.com", *args], cwd=tmp_path)
+
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    git("init", "-q")
+    git("add", "a.py", "b.py")
+    git("commit", "-q", "-m", "start")
+    (tmp_path / "b.py").write_text("b = 2\n")
+
+    assert changed_files_since("HEAD", tmp_path) == [str(pathlib.Path(tmp_path).resolve() / "b.py")]
+    with pytest.raises(ValueError, match="not-a-ref"):
+        changed_files_since("not-a-ref", tmp_path)
+
+
+def test_command_line_flags(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["build.py", "--changed-files", "a.py,b.py", "c.py", "--since", "main", "x=1"])
+    config = clearskies_doc_builder.apply_command_line_flags({"tree": []})
+
+    assert [pathlib.Path(path).name for path in config["changed_files"]] == ["a.py", "b.py", "c.py"]
+    assert config["since"] == "main"
+    assert sys.argv == ["build.py", "x=1"]
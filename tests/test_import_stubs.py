@@ -0,0 +1,80 @@
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import pytest
+
+from clearskies_doc_builder import build_session
+from clearskies_doc_builder.import_stubs import REPORT_FILENAME, ImportStubs, StubModule
+
+DOCUMENTED_SOURCE = '''
+import heavy_dependency
+from heavy_dependency.client import Client
+from slow_dependency import Thing
+
+
+class Documented(Client, heavy_dependency.mixins.Retry[int]):
+    """A documented class."""
+
+    session: heavy_dependency.Session | None = None
+
+    def __init__(self, name, region="us-east-1", thing=Thing()):
+        pass
+
+    @heavy_dependency.decorators.cached
+    def fetch(self, key):
+        """Fetch something."""
+'''
+
+
+@pytest.fixture
+def stubbed_project(tmp_path, monkeypatch):
+    (tmp_path / "documented_module.py").write_text(DOCUMENTED_SOURCE)
+    (tmp_path / "slow_dependency").mkdir()
+    (tmp_path / "slow_dependency" / "__init__.py").write_text("import time\ntime.sleep(0.2)\nThing = object\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    build_session.finish(tmp_path / "build")
+    sys.modules.pop("documented_module", None)
+    assert not [name for (name, module) in sys.modules.items() if isinstance(module, StubModule)]
+
+
+def test_stubbed_packages_can_be_documented(stubbed_project):
+    build_session.start({"stub_imports": ["heavy_dependency", "slow_dependency"]}, stubbed_project)
+    import documented_module
+
+    Documented = documented_module.Documented
+    assert Documented.__doc__ == "A documented class."
+    assert Documented.fetch.__doc__ == "Fetch something."
+    assert Documented.__init__.__defaults__[0] == "us-east-1"
+    assert Documented.__mro__[1].__qualname__ == "Client"
+    assert isinstance(sys.modules["slow_dependency"], StubModule)
+
+
+def test_report_lists_stubs_without_importing_them(stubbed_project):
+    stubs = ImportStubs(["heavy_dependency", "slow_dependency"])
+    stubs.stubbed.update(["heavy_dependency", "slow_dependency"])
+    stubs.measure_import = lambda package: pytest.fail("imports are only measured when asked to")
+
+    report = stubs.write_report(stubbed_project / "build")
+    assert report == {"stubbed_modules": ["heavy_dependency", "slow_dependency"]}
+    assert json.loads((stubbed_project / "build" / REPORT_FILENAME).read_text()) == report
+
+
+def test_report_lists_stubs_and_time_saved(stubbed_project):
+    stubs = ImportStubs(["heavy_dependency", "slow_dependency"], measure_imports=True)
+    stubs.stubbed.update(["heavy_dependency", "heavy_dependency.client", "slow_dependency"])
+
+    report = stubs.write_report(stubbed_project / "build")
+    assert report["stubbed_modules"] == ["heavy_dependency", "heavy_dependency.client", "slow_dependency"]
+    # heavy_dependency isn't installed, so we can't know how long it would have taken.
+    assert report["packages"]["heavy_dependency"]["import_seconds"] is None
+    assert report["packages"]["slow_dependency"]["import_seconds"] >= 0.2
+    assert report["saved_seconds"] == report["packages"]["slow_dependency"]["import_seconds"]
+    assert json.loads((stubbed_project / "build" / REPORT_FILENAME).read_text()) == report
+
+    # unchanged packages aren't measured again
+    stubs.measure_import = lambda package: pytest.fail("slow_dependency should not be measured again")
+    assert stubs.write_report(stubbed_project / "build") == report
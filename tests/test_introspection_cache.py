@@ -0,0 +1,86 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+from clearskies_doc_builder.attribute_doc_index import AttributeDocIndex
+from clearskies_doc_builder.backends.attribute_backend import AttributeBackend
+from clearskies_doc_builder.introspection_cache import IntrospectionCache
+
+SOURCE = '''
+class Thing:
+    """A thing."""
+
+    """
+    The name of the thing.
+    """
+    name = None
+'''
+
+
+class Widget:
+    def __init__(self, name, size=3, color="red"):
+        pass
+
+
+def test_attribute_docs_persist_between_builds(tmp_path):
+    source_file = tmp_path / "thing.py"
+    source_file.write_text(SOURCE)
+    cache_path = tmp_path / "cache.sqlite"
+
+    cold_index = AttributeDocIndex()
+    cold_index.introspection_cache = IntrospectionCache(cache_path)
+    assert "The name of the thing." in cold_index.class_docs(str(source_file), "Thing")["name"]
+    assert cold_index.files_parsed == 1
+    cold_index.introspection_cache.flush()
+
+    warm_index = AttributeDocIndex()
+    warm_index.introspection_cache = IntrospectionCache(cache_path)
+    assert warm_index.class_docs(str(source_file), "Thing") == cold_index.class_docs(str(source_file), "Thing")
+    assert warm_index.class_docs(str(source_file), "Other") == {}
+    assert warm_index.files_parsed == 0
+
+    # changing the file means it has to be parsed again
+    source_file.write_text(SOURCE.replace("The name", "The new name"))
+    changed_index = AttributeDocIndex()
+    changed_index.introspection_cache = IntrospectionCache(cache_path)
+    assert "The new name of the thing." in changed_index.class_docs(str(source_file), "Thing")["name"]
+    assert changed_index.files_parsed == 1
+
+
+def test_arguments_persist_between_builds(tmp_path, monkeypatch):
+    cache_path = tmp_path / "cache.sqlite"
+    backend = AttributeBackend()
+    monkeypatch.setattr(AttributeBackend, "introspection_cache", IntrospectionCache(cache_path))
+    cold = dict(backend.unpack(Widget.__init__, "__init__", Widget))
+    AttributeBackend.introspection_cache.flush()
+    assert AttributeBackend.introspection_cache.misses == 1
+
+    monkeypatch.setattr(AttributeBackend, "introspection_cache", IntrospectionCache(cache_path))
+    monkeypatch.setattr(AttributeBackend, "arguments", lambda self, attribute: fail_if_called())
+    warm = dict(backend.unpack(Widget.__init__, "__init__", Widget))
+    assert AttributeBackend.introspection_cache.hits == 1
+    assert warm["all_args"] == ["self", "name", "size", "color"]
+    assert warm["kwargs"] == ["size", "color"]
+    assert warm["defaults"] == {"size": 3, "color": "red"}
+    assert warm == cold
+
+
+def fail_if_called():
+    raise AssertionError("Cached arguments should not be recalculated")
+
+
+def test_writes_do_not_hold_the_cache_locked(tmp_path):
+    source_file = tmp_path / "thing.py"
+    source_file.write_text(SOURCE)
+    cache_path = tmp_path / "cache.sqlite"
+
+    # parallel workers each have their own connection, and none of them flush until their branch is done
+    first = IntrospectionCache(cache_path)
+    first.store_attribute_docs(str(source_file), {"Thing": {"name": "The name of the thing."}})
+    assert not first.connection.in_transaction
+
+    second = IntrospectionCache(cache_path)
+    second.store_arguments(Widget, "__init__", ["self", "name"], ["name"], [], {})
+    assert second.attribute_docs(str(source_file), "Thing") == {"name": "The name of the thing."}
+    assert IntrospectionCache(cache_path).arguments(Widget, "__init__") == (["self", "name"], ["name"], [])
@@ -16,6 +16,7 @@ def test_class_fields():
         "source_file",
         "import_path",
         "name",
+        "qualname",
         "doc",
         "module",
         "base_classes",
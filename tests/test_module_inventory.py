@@ -0,0 +1,56 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.backends.module_backend import ModuleBackend
+from clearskies_doc_builder.module_inventory import ModuleInventory
+
+
+def make_package(tmp_path):
+    package = tmp_path / "inventory_package"
+    (package / "sub").mkdir(parents=True)
+    (package / "__init__.py").write_text('"""The root."""\n')
+    (package / "first.py").write_text('"""The first module."""\n')
+    (package / "sub" / "__init__.py").write_text("")
+    (package / "sub" / "second.py").write_text('"""The second module."""\n')
+    return package
+
+
+def test_packages_are_walked_without_importing(tmp_path, monkeypatch):
+    package = make_package(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    inventory = ModuleInventory(["inventory_package"])
+
+    assert sorted(entry["import_path"] for entry in inventory.entries()) == [
+        "inventory_package",
+        "inventory_package.first",
+        "inventory_package.sub",
+        "inventory_package.sub.second",
+    ]
+    assert inventory.find("inventory_package.sub.second")["source_file"] == str(package / "sub" / "second.py")
+    assert [entry["name"] for entry in inventory.find_by_source_file(str(package / "first.py"))] == [
+        "inventory_package.first"
+    ]
+    assert "inventory_package" not in sys.modules
+
+
+def test_modules_are_imported_when_materialized(tmp_path, monkeypatch):
+    package = make_package(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(ModuleBackend, "inventory", ModuleInventory(["inventory_package"]))
+    modules = clearskies.di.Di(modules=[models, backends]).build_from_name("modules")
+
+    second = modules.find(f"source_file={package / 'sub' / 'second.py'}")
+    assert second.import_path == "inventory_package.sub.second"
+    assert "inventory_package.sub.second" not in sys.modules
+    assert second.doc == "The second module."
+    assert "inventory_package.sub.second" in sys.modules
+    assert not modules.where("is_builtin=1").first()
+
+    for name in list(sys.modules):
+        if name.startswith("inventory_package"):
+            del sys.modules[name]
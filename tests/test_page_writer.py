@@ -0,0 +1,164 @@
+import os
+import pathlib
+import sys
+import threading
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+import pytest
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.builders.page_writer import PageWriter, WritePool
+
+TREE = [
+    {
+        "title": "Columns",
+        "source": "clearskies.Column",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "classes": ["clearskies.columns.Boolean"],
+    },
+    {"title": "Model", "source": "clearskies.Model", "builder": "clearskies_doc_builder.builders.SingleClass"},
+]
+
+
+def test_page_is_written_in_chunks(tmp_path):
+    output_file = tmp_path / "page.md"
+    with PageWriter(output_file) as page:
+        page.write("# Title\n\n")
+        page.write_table_of_contents([("Overview", "#overview"), ("name", "#name")])
+        page.write("\n## Overview\n\nÜber\n")
+
+    expected = "# Title\n\n 1. [Overview](#overview)\n 2. [name](#name)\n\n## Overview\n\nÜber\n"
+    assert output_file.read_text() == expected
+    assert page.bytes_written == len(output_file.read_bytes())
+
+
+def test_partial_page_is_removed_on_error(tmp_path):
+    output_file = tmp_path / "page.md"
+    with pytest.raises(TypeError):
+        with PageWriter(output_file) as page:
+            page.write("# Title\n\n")
+            raise TypeError("Missing docstring")
+
+    assert not output_file.exists()
+
+
+def test_unchanged_pages_are_left_alone(tmp_path):
+    output_file = tmp_path / "page.md"
+    output_file.write_text("# Title\n")
+    os.utime(output_file, ns=(1_000_000_000, 1_000_000_000))
+    PageWriter.reset_counts()
+
+    with PageWriter(output_file) as page:
+        page.write("# Title\n")
+    assert not page.changed
+    assert output_file.stat().st_mtime_ns == 1_000_000_000
+
+    with PageWriter(output_file) as page:
+        page.write("# New Title\n")
+    assert page.changed
+    assert output_file.read_text() == "# New Title\n"
+
+    assert PageWriter.take_counts() == {"pages_written": 1, "pages_unchanged": 1}
+    assert [path.name for path in tmp_path.iterdir()] == ["page.md"]
+
+
+def test_failed_page_keeps_the_existing_file(tmp_path):
+    output_file = tmp_path / "page.md"
+    output_file.write_text("# Title\n")
+    with pytest.raises(TypeError):
+        with PageWriter(output_file) as page:
+            page.write("# New Title\n")
+            raise TypeError("Missing docstring")
+
+    assert output_file.read_text() == "# Title\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["page.md"]
+
+
+def test_build_reports_written_and_unchanged_pages(monkeypatch, tmp_path):
+    doc_root = tmp_path / "docs"
+    doc_root.mkdir()
+    monkeypatch.setitem(build_callable.__globals__, "prepare_doc_space", lambda project_root, **kwargs: str(doc_root))
+    di = clearskies.di.Di(modules=[models, backends])
+    modules = di.build_from_name("modules")
+    classes = di.build_from_name("classes")
+
+    first = build_callable(modules, classes, {"tree": TREE, "sync": True}, str(doc_root))
+    second = build_callable(modules, classes, {"tree": TREE, "sync": True, "workers": 2}, str(doc_root))
+
+    assert first == {"pages_written": 3, "pages_unchanged": 0, "pages_removed": 0}
+    assert second == {"pages_written": 0, "pages_unchanged": 3, "pages_removed": 0}
+
+
+def test_write_pool_writes_pages_in_the_background(monkeypatch, tmp_path):
+    unchanged_file = tmp_path / "unchanged.md"
+    unchanged_file.write_text("# Same\n")
+    pool = WritePool(threads=1, depth=1)
+    monkeypatch.setattr(PageWriter, "write_pool", pool)
+    PageWriter.reset_counts()
+
+    # nothing can be written until we let it, so the queue fills up and the third page has to wait for room
+    can_write = threading.Event()
+    persist = PageWriter.persist
+    monkeypatch.setattr(PageWriter, "persist", lambda page: can_write.wait() and persist(page))
+    pages = [PageWriter(tmp_path / "a.md"), PageWriter(tmp_path / "b.md"), PageWriter(unchanged_file)]
+    submitted = []
+
+    def render():
+        for page, content in zip(pages, ["# A\n", "# B\n", "# Same\n"]):
+            with page:
+                page.write(content)
+            submitted.append(page)
+
+    renderer = threading.Thread(target=render)
+    renderer.start()
+    renderer.join(timeout=0.2)
+    # one page is with the writer thread, and the queue holds one more
+    assert len(submitted) == 2 and renderer.is_alive()
+    assert not (tmp_path / "a.md").exists()
+
+    can_write.set()
+    renderer.join()
+    pool.drain()
+    pool.close()
+    assert (tmp_path / "a.md").read_text() == "# A\n"
+    assert (tmp_path / "b.md").read_text() == "# B\n"
+    assert [page.changed for page in pages] == [True, True, False]
+    assert PageWriter.take_counts() == {"pages_written": 2, "pages_unchanged": 1}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.md", "b.md", "unchanged.md"]
+
+
+def test_write_pool_reports_errors(monkeypatch, tmp_path):
+    pool = WritePool(threads=1)
+    monkeypatch.setattr(PageWriter, "write_pool", pool)
+    with PageWriter(tmp_path / "missing-folder" / "page.md") as page:
+        page.write("# Title\n")
+
+    with pytest.raises(FileNotFoundError):
+        pool.drain()
+    pool.close()
+
+
+def test_background_writes_match_the_normal_build(monkeypatch, tmp_path):
+    doc_root = tmp_path / "docs"
+    doc_root.mkdir()
+    monkeypatch.setitem(build_callable.__globals__, "prepare_doc_space", lambda project_root, **kwargs: str(doc_root))
+    di = clearskies.di.Di(modules=[models, backends])
+    modules = di.build_from_name("modules")
+    classes = di.build_from_name("classes")
+
+    build_callable(modules, classes, {"tree": TREE}, str(doc_root))
+    expected = {str(path.relative_to(doc_root)): path.read_bytes() for path in doc_root.rglob("*.md")}
+    for path in doc_root.rglob("*.md"):
+        path.write_text("old")
+    config = {"tree": TREE, "sync": True, "write_threads": 2, "write_queue_depth": 1, "profile": True}
+
+    assert build_callable(modules, classes, config, str(doc_root)) == {
+        "pages_written": 3,
+        "pages_unchanged": 0,
+        "pages_removed": 0,
+    }
+    assert {str(path.relative_to(doc_root)): path.read_bytes() for path in doc_root.rglob("*.md")} == expected
+    assert PageWriter.write_pool is None
@@ -0,0 +1,95 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.build_callable import build_callable
+from clearskies_doc_builder.introspection_cache import IntrospectionCache
+
+TREE = [
+    {
+        "title": "Columns",
+        "source": "clearskies.Column",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "classes": ["clearskies.columns.Boolean", "clearskies.columns.String", "clearskies.columns.Integer"],
+    },
+    {
+        "title": "Validators",
+        "source": "clearskies.Validator",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "parent": "Columns",
+        "classes": ["clearskies.validators.Required"],
+    },
+    {
+        "title": "Get",
+        "source": "clearskies.endpoints.Get",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+        "parent": "Columns",
+    },
+    {"title": "Model", "source": "clearskies.Model", "builder": "clearskies_doc_builder.builders.SingleClass"},
+]
+
+
+def read_tree(root: pathlib.Path) -> dict[str, bytes]:
+    return {str(path.relative_to(root)): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def run_build(monkeypatch, doc_root: pathlib.Path, config: dict) -> dict[str, bytes]:
+    doc_root.mkdir(parents=True)
+    monkeypatch.setitem(build_callable.__globals__, "prepare_doc_space", lambda project_root: str(doc_root))
+    di = clearskies.di.Di(modules=[models, backends])
+    build_callable(di.build_from_name("modules"), di.build_from_name("classes"), config, str(doc_root))
+    return read_tree(doc_root)
+
+
+def test_parallel_build_matches_serial_build(monkeypatch, tmp_path):
+    serial = run_build(monkeypatch, tmp_path / "serial", {"tree": TREE})
+    parallel = run_build(monkeypatch, tmp_path / "parallel", {"tree": TREE, "workers": 2})
+
+    assert "columns/validators/required.md" in serial
+    assert serial == parallel
+
+
+def test_parallel_build_shares_the_introspection_cache(monkeypatch, tmp_path):
+    cache_path = tmp_path / "cache.sqlite"
+    serial = run_build(monkeypatch, tmp_path / "serial", {"tree": TREE})
+
+    # something else is using the cache (and hasn't flushed) while the workers build their branches
+    holder = IntrospectionCache(cache_path)
+    holder.store_arguments(IntrospectionCache, "__init__", ["self", "path"], ["path"], [], {})
+    config = {"tree": TREE, "workers": 2, "introspection_cache": str(cache_path)}
+    parallel = run_build(monkeypatch, tmp_path / "parallel", config)
+
+    assert serial == parallel
+    assert holder.connection.execute("SELECT COUNT(*) FROM arguments").fetchone()[0] > 1
+
+
+def test_split_module_matches_serial_build(monkeypatch, tmp_path):
+    tree = [
+        {
+            **TREE[0],
+            "classes": [
+                "clearskies.columns.Boolean",
+                "clearskies.columns.String",
+                "clearskies.columns.Integer",
+                "clearskies.columns.Float",
+                "clearskies.columns.Email",
+            ],
+        }
+    ]
+    serial = run_build(monkeypatch, tmp_path / "serial", {"tree": tree})
+    # two classes per part means the one branch gets split three ways
+    split = run_build(monkeypatch, tmp_path / "split", {"tree": tree, "workers": 3, "module_shard_size": 2})
+
+    assert sorted(serial) == [
+        "columns/boolean.md",
+        "columns/email.md",
+        "columns/float.md",
+        "columns/index.md",
+        "columns/integer.md",
+        "columns/string.md",
+    ]
+    assert serial == split
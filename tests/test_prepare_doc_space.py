@@ -0,0 +1,49 @@
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+from clearskies_doc_builder.prepare_doc_space import sync_doc_space
+
+
+def make_jekyll(tmp_path):
+    jekyll_path = tmp_path / "jekyll"
+    (jekyll_path / "docs").mkdir(parents=True)
+    (jekyll_path / "assets").mkdir()
+    (jekyll_path / "_config.yml").write_text("title: docs")
+    (jekyll_path / "docs" / "intro.md").write_text("# Intro")
+    (jekyll_path / "assets" / "logo.svg").write_text("<svg/>")
+    return jekyll_path, tmp_path / "build"
+
+
+def test_sync_only_copies_changed_files(tmp_path):
+    jekyll_path, build_path = make_jekyll(tmp_path)
+    assert sync_doc_space(jekyll_path, build_path) == {"copied": 3, "unchanged": 0, "removed": 0}
+    assert (build_path / "docs" / "intro.md").read_text() == "# Intro"
+    mtime = (build_path / "docs" / "intro.md").stat().st_mtime_ns
+
+    (jekyll_path / "_config.yml").write_text("title: new docs")
+    assert sync_doc_space(jekyll_path, build_path) == {"copied": 1, "unchanged": 2, "removed": 0}
+    assert (build_path / "_config.yml").read_text() == "title: new docs"
+    assert (build_path / "docs" / "intro.md").stat().st_mtime_ns == mtime
+
+
+def test_sync_removes_stale_files_but_not_generated_pages(tmp_path):
+    jekyll_path, build_path = make_jekyll(tmp_path)
+    sync_doc_space(jekyll_path, build_path)
+    (build_path / "docs" / "generated.md").write_text("# Generated")
+
+    (jekyll_path / "docs" / "intro.md").unlink()
+    assert sync_doc_space(jekyll_path, build_path)["removed"] == 1
+    assert not (build_path / "docs" / "intro.md").exists()
+    assert (build_path / "docs" / "generated.md").exists()
+
+
+def test_sync_can_hardlink_assets(tmp_path):
+    jekyll_path, build_path = make_jekyll(tmp_path)
+    sync_doc_space(jekyll_path, build_path, link_mode="hardlink")
+
+    assert os.path.samefile(jekyll_path / "assets" / "logo.svg", build_path / "assets" / "logo.svg")
+    assert not os.path.samefile(jekyll_path / "docs" / "intro.md", build_path / "docs" / "intro.md")
+    assert sync_doc_space(jekyll_path, build_path, link_mode="hardlink")["copied"] == 0
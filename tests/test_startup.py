@@ -0,0 +1,42 @@
+import pathlib
+import subprocess
+import sys
+
+SRC = str(pathlib.Path(__file__).parent.parent / "src")
+sys.path.insert(0, SRC)
+
+
+def imported_after(code: str) -> set[str]:
+    """Run some code in a fresh interpreter and return the modules it ended up importing."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys\nsys.path.insert(0, {SRC!r})\n{code}\nprint(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_light_imports_do_not_load_clearskies():
+    modules = imported_after(
+        "import clearskies_doc_builder\n"
+        + "from clearskies_doc_builder.build_callable import _compute_nav_orders_and_child_counts\n"
+        + "from clearskies_doc_builder import build_manifest, daemon, prepare_doc_space, workers"
+    )
+    assert "clearskies_doc_builder.build_callable" in modules
+    assert "clearskies" not in modules
+    assert "clearskies_doc_builder.models" not in modules
+    assert "clearskies_doc_builder.backends" not in modules
+
+
+def test_lazy_exports_are_loaded_on_use():
+    modules = imported_after("import clearskies_doc_builder\nclearskies_doc_builder.models.Class")
+    assert "clearskies_doc_builder.models" in modules
+    assert "clearskies_doc_builder.builders.single_class" not in modules
+
+    import clearskies_doc_builder
+    import clearskies_doc_builder.builders
+
+    assert "models" in dir(clearskies_doc_builder)
+    assert "SingleClass" in dir(clearskies_doc_builder.builders)
+    assert clearskies_doc_builder.builders.SingleClass.__name__ == "SingleClass"
@@ -0,0 +1,113 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+import pytest
+
+from clearskies_doc_builder import backends, build_session, models
+from clearskies_doc_builder.backends.module_backend import ModuleBackend
+from clearskies_doc_builder.static_analysis import StaticImporter, StaticValue
+
+BASE_SOURCE = '''
+"""The base module."""
+import not_an_installed_dependency
+
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+raise RuntimeError("The documented package should never be run")
+
+
+class Base(Generic[T]):
+    """A base class."""
+
+    """
+    The name of the thing.
+    """
+    name: str = "base"
+
+    def __init__(self, name, size=3, *, color="red", helper=not_an_installed_dependency.Helper()):
+        """Make a thing."""
+
+    @property
+    def label(self):
+        return self.name
+'''
+
+CHILD_SOURCE = '''
+from . import base as base_module
+from .base import Base as Parent
+
+
+class Child(Parent[int]):
+    """A child class."""
+
+    widget = base_module.Base("widget")
+
+    def __init__(self, name, age=None):
+        pass
+
+    class Inner(base_module.Base):
+        pass
+'''
+
+
+@pytest.fixture
+def static_package(tmp_path, monkeypatch):
+    package = tmp_path / "static_package"
+    package.mkdir()
+    (package / "__init__.py").write_text("from .child import *\n")
+    (package / "base.py").write_text(BASE_SOURCE)
+    (package / "child.py").write_text(CHILD_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(ModuleBackend, "importer", ModuleBackend.importer)
+    yield package
+    assert not [name for name in sys.modules if name.startswith("static_package")]
+
+
+def test_classes_are_built_from_source(static_package):
+    importer = StaticImporter()
+    Child = importer.import_module("static_package").Child
+    Base = importer.import_module("static_package.base").Base
+
+    assert Child.__doc__ == "A child class."
+    assert Child.__qualname__ == "Child"
+    assert Child.__module__ == "static_package.child"
+    assert Child.__bases__[0] is Base
+    assert Child.Inner.__qualname__ == "Child.Inner"
+    assert Child.Inner.__bases__ == (Base,)
+    assert isinstance(Child.widget, Base)
+    assert Child.name == "base"
+    assert isinstance(Child.label, property)
+
+    assert Base.__init__.__doc__ == "Make a thing."
+    assert Base.__init__.__defaults__ == (3,)
+    assert Base.__init__.__kwdefaults__["color"] == "red"
+    assert isinstance(Base.__init__.__kwdefaults__["helper"], StaticValue)
+
+
+def test_static_builds_never_import_the_package(static_package):
+    build_session.start({"introspection": "static", "tree": []}, static_package)
+    classes = clearskies.di.Di(modules=[models, backends]).build_from_name("classes")
+
+    child = classes.find("import_path=static_package.child.Child")
+    assert child.source_file == str(static_package / "child.py")
+    assert child.init.all_args == ["self", "name", "age"]
+    assert child.init.kwargs == ["age"]
+    assert [base.name for base in child.base_classes] == ["Base"]
+    assert child.base_classes[0].source_file == str(static_package / "base.py")
+
+    base = classes.find("import_path=static_package.base.Base")
+    assert base.init.all_args == ["self", "name", "size"]
+    assert base.init.defaults == {"size": 3}
+
+    build_session.start({}, static_package)
+
+
+def test_unknown_introspection_modes_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        build_session.start({"introspection": "guess"}, tmp_path)
+    build_session.start({}, tmp_path)
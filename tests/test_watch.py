@@ -0,0 +1,133 @@
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent / "src"))
+
+import clearskies
+import pytest
+
+from clearskies_doc_builder import backends, models
+from clearskies_doc_builder.watch import InotifyWatcher, ModuleReloader, PollingWatcher, RestartRequired, Watch
+
+TREE = [
+    {
+        "title": "Things",
+        "source": "base.Base",
+        "builder": "clearskies_doc_builder.builders.Module",
+        "classes": ["things.Thing"],
+    },
+    {
+        "title": "Other",
+        "source": "other.Other",
+        "builder": "clearskies_doc_builder.builders.SingleClass",
+    },
+]
+
+
+def make_watch(docs_path: pathlib.Path) -> Watch:
+    di = clearskies.di.Di(modules=[models, backends])
+    return Watch(
+        di.build_from_name("modules"),
+        di.build_from_name("classes"),
+        docs_path / "python" / "config.json",
+        docs_path,
+        watcher=PollingWatcher(),
+        output=lambda message: None,
+    )
+
+
+def test_polling_watcher_reports_changed_files(tmp_path):
+    watched = tmp_path / "watched.py"
+    ignored = tmp_path / "ignored.py"
+    watched.write_text("a = 1\n")
+    ignored.write_text("a = 1\n")
+    watcher = PollingWatcher(interval=0.01)
+    watcher.watch([str(watched)])
+
+    assert watcher.wait(timeout=0.05) == set()
+    ignored.write_text("a = 2\n")
+    watched.write_text("a = 22\n")
+    assert watcher.wait(timeout=1) == {str(watched)}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on Linux")
+def test_inotify_watcher_follows_files_replaced_by_editors(tmp_path):
+    watched = tmp_path / "watched.py"
+    watched.write_text("a = 1\n")
+    watcher = InotifyWatcher()
+    watcher.watch([str(watched)])
+    try:
+        (tmp_path / "other.py").write_text("a = 1\n")
+        assert watcher.wait(timeout=0.05) == set()
+
+        swap_file = tmp_path / ".watched.py.swp"
+        swap_file.write_text("a = 2\n")
+        os.replace(swap_file, watched)
+        assert watcher.wait(timeout=1) == {str(watched)}
+
+        watched.write_text("a = 3\n")
+        assert watcher.wait(timeout=1) == {str(watched)}
+    finally:
+        watcher.close()
+
+
+def test_reloader_reloads_dependent_modules_in_order(tmp_project):
+    project = tmp_project("watch_reload", TREE, importable=True)
+    reloader = ModuleReloader()
+    from watch_reload import base, things
+
+    old_base = base.Base
+    base_file = project.source_file("base")
+    base_file.write_text(base_file.read_text().replace("A base class.", "A changed base class."))
+
+    assert reloader.reload({str(base_file)}) == ["watch_reload.base", "watch_reload.things"]
+    assert things.Thing.__bases__[0] is base.Base
+    assert base.Base is not old_base
+    assert base.Base.__doc__ == "A changed base class."
+
+
+def test_reloader_never_reloads_modules_the_build_depends_on(tmp_project):
+    tmp_project("watch_protected", TREE, importable=True)
+    from watch_protected import base
+
+    reloader = ModuleReloader()
+    with pytest.raises(RestartRequired):
+        reloader.reload({base.__file__})
+
+
+def test_watch_only_rebuilds_branches_that_depend_on_changed_files(tmp_project):
+    project = tmp_project("watch_build", TREE, importable=True)
+    watch = make_watch(project.docs_path)
+    first = watch.build()
+    assert first == {"pages_written": 3, "pages_unchanged": 0, "pages_removed": 0}
+    assert str(project.source_file("base")) in watch.watcher.signatures
+    assert str(project.docs_path / "python" / "config.json") in watch.watcher.signatures
+
+    things_file = project.source_file("things")
+    project.write_things("A renamed thing.")
+    changed = watch.watcher.wait(timeout=1)
+    assert changed == {str(things_file)}
+    assert "1 branch(es) with 2 page(s)" in watch.describe(changed)
+
+    # the Other branch doesn't depend on things.py, so it isn't built at all
+    assert watch.rebuild(changed) == {"pages_written": 1, "pages_unchanged": 1, "pages_removed": 0}
+    thing_page = next(project.doc_root.rglob("thing.md"))
+    assert "A renamed thing." in thing_page.read_text()
+
+
+def test_watch_waits_for_broken_modules_to_be_fixed(tmp_project):
+    project = tmp_project("watch_broken", TREE, importable=True)
+    watch = make_watch(project.docs_path)
+    watch.build()
+
+    things_file = project.source_file("things")
+    things_file.write_text("class Thing(:\n")
+    assert watch.rebuild({str(things_file)}) is None
+
+    # the broken file is picked up again along with the next change, even if that's a change to something else
+    project.write_things("A fixed thing.")
+    config_file = str(project.docs_path / "python" / "config.json")
+    assert watch.rebuild({config_file})["pages_written"] == 1
+    thing_page = next(project.doc_root.rglob("thing.md"))
+    assert "A fixed thing." in thing_page.read_text()